@@ -1,4 +1,5 @@
 # accounts/context_processors.py
+from accounts.profiles import user_profile
 
 
 def session_flags(request):
@@ -9,7 +10,8 @@ def session_flags(request):
     """
     role = None
     if request.user.is_authenticated:
-        role = getattr(getattr(request.user, "uprofile", None), "role", None)
+        # Loaded with request.user (accounts.profiles), so no extra query.
+        role = getattr(user_profile(request.user), "role", None)
     else:
         role = request.session.get("auth_role")
     return {"auth_role": role}
@@ -0,0 +1,123 @@
+# accounts/profiles.py
+"""
+Loading the signed-in user together with their profiles.
+
+Every page reads the user's UserProfile (the role, in the context
+processor) and OrganizerProfile (the nav photo), and many views read one
+of them again. ProfileModelBackend loads request.user with both in one
+joined query, and Django keeps request.user for the rest of the request,
+so `user.uprofile` / `user.organizerprofile` (or the helpers below) cost
+nothing after that.
+
+With PROFILE_CACHE_SECONDS > 0 the loaded user is also kept in the cache
+for that long, and dropped whenever the user or a profile is saved or
+deleted (accounts.signals). Only enable it with a cache shared by all
+workers (not the default per-process LocMemCache): invalidation only
+reaches the process that made the change.
+
+The cached copy holds the user's and profiles' fields (name, email, role,
+photo path, ...), readable by anyone with access to the cache, but not
+the password hash: `password` is left deferred, so it's only loaded (and
+saving the user only writes other fields) if something reads it, and the
+session hash Django checks on every request is cached in its place.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+
+PROFILES = ("uprofile", "organizerprofile")
+
+
+def _cache_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def _with_session_hash(user, session_hash):
+    # Set after caching (it isn't picklable), so checking the session
+    # doesn't load the deferred password.
+    def get_session_auth_hash():
+        if "password" in user.__dict__:
+            # Loaded or changed since (set_password() before
+            # update_session_auth_hash()): hash the actual password.
+            return AbstractBaseUser.get_session_auth_hash(user)
+        return session_hash
+
+    user.get_session_auth_hash = get_session_auth_hash
+    return user
+
+
+def load_user(user_id):
+    """The user with both profiles loaded, or None."""
+    ttl = getattr(settings, "PROFILE_CACHE_SECONDS", 0)
+    if ttl:
+        cached = cache.get(_cache_key(user_id))
+        if cached is not None:
+            return _with_session_hash(*cached)
+    user = (
+        get_user_model()
+        ._default_manager.select_related(*PROFILES)
+        .filter(pk=user_id)
+        .first()
+    )
+    if user is not None and ttl:
+        session_hash = user.get_session_auth_hash()
+        # Keep the password hash out of the cache (see module docstring).
+        del user.__dict__["password"]
+        cache.set(_cache_key(user_id), (user, session_hash), ttl)
+        _with_session_hash(user, session_hash)
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+def user_profile(user):
+    """The user's UserProfile, or None (also for anonymous users)."""
+    try:
+        return user.uprofile
+    except (AttributeError, ObjectDoesNotExist):
+        return None
+
+
+def organizer_profile(user):
+    """The user's OrganizerProfile, or None (also for anonymous users)."""
+    try:
+        return user.organizerprofile
+    except (AttributeError, ObjectDoesNotExist):
+        return None
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend, loading users through load_user()."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            # Loaded with the profiles, like get_user(): login reads the
+            # role right after authenticating.
+            user = UserModel._default_manager.select_related(*PROFILES).get(
+                **{UserModel.USERNAME_FIELD: username}
+            )
+        except UserModel.DoesNotExist:
+            # Hash anyway, so unknown usernames take as long as wrong
+            # passwords (as ModelBackend does).
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        # ModelBackend is only listed after us for sessions created before
+        # this backend existed; don't let it hash the password a second time.
+        raise PermissionDenied
+
+    def get_user(self, user_id):
+        user = load_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -1,10 +1,13 @@
 # accounts/signals.py
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import UserProfile
+from config.conditional import bump_viewer_version
+
+from .models import OrganizerProfile, UserProfile
+from .profiles import forget_user
 
 
 @receiver(user_logged_in)
@@ -12,12 +15,14 @@ def clear_guest_on_login(sender, user, request, **kwargs):
     """
     When a real user logs in, drop any anonymous/guest/session role hints
     that may have been set earlier in the same browser.
+
+    login() has already given the session a new key; cycling it again here
+    would only write (and delete) another session row.
     """
     if request is not None and hasattr(request, "session"):
         sess = request.session
         sess.pop("guest", None)
         sess.pop("desired_role", None)
-        sess.cycle_key()
 
 
 @receiver(user_logged_out)
@@ -37,9 +42,34 @@ def clear_guest_on_logout(sender, user, request, **kwargs):
 def ensure_user_profile(sender, instance, created, **kwargs):
     """
     Always make sure a UserProfile exists.
+
+    Skipped when only last_login changed: login saves the user that way,
+    and it shouldn't cost a profile lookup on every sign-in.
     """
     if created:
         UserProfile.objects.create(user=instance)
-    else:
+    elif kwargs.get("update_fields") != {"last_login"}:
         # in case something deleted it manually
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=OrganizerProfile)
+def bump_viewer_on_profile_change(sender, instance, **kwargs):
+    """
+    The nav bar shows the username, role and profile photo, so pages
+    validated by config.conditional must change when any of them do.
+    """
+    bump_viewer_version(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=OrganizerProfile)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=OrganizerProfile)
+def forget_cached_user(sender, instance, **kwargs):
+    """Drop the cached user + profiles (accounts.profiles.load_user)."""
+    forget_user(instance.pk if sender is User else instance.user_id)
@@ -1,5 +1,5 @@
 from django import template
-from accounts.models import OrganizerProfile
+from accounts.profiles import organizer_profile
 
 register = template.Library()
 
@@ -14,7 +14,4 @@ def get_profile(context):
     user = getattr(request, "user", None)
     if not (user and user.is_authenticated):
         return None
-    try:
-        return OrganizerProfile.objects.get(user=user)
-    except OrganizerProfile.DoesNotExist:
-        return None
+    return organizer_profile(user)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 APP = "accounts"
@@ -68,3 +70,113 @@ def test_attendee_signup_success_flow(client):
     )
     assert res.redirect_chain
     assert getattr(res.wsgi_request.user, "is_authenticated", False) is True
+
+
+def _writes(queries):
+    """(statement, table) of every INSERT/UPDATE/DELETE, in order."""
+    writes = []
+    for q in queries:
+        verb = q["sql"].split(" ", 1)[0]
+        if verb in ("INSERT", "UPDATE", "DELETE"):
+            writes.append((verb, q["sql"].split('"')[1]))
+    return writes
+
+
+def _profile_reads(queries):
+    return [
+        q["sql"]
+        for q in queries
+        if 'FROM "accounts_userprofile"' in q["sql"]
+        or 'FROM "accounts_organizerprofile"' in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_login_writes_are_minimal(client, django_user_model):
+    django_user_model.objects.create_user(username="lean", password="Passw0rd1!")
+    client.get(reverse(f"{APP}:pick_role", args=["organizer"]))
+    old_key = client.session.session_key
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.post(
+            reverse(f"{APP}:login") + "?role=organizer",
+            {"username": "lean", "password": "Passw0rd1!"},
+        )
+
+    assert res.status_code == 302
+    assert _writes(ctx.captured_queries) == [
+        ("INSERT", "django_session"),  # login() rotates the key, once
+        ("DELETE", "django_session"),  # ... dropping the pre-login row
+        ("UPDATE", "auth_user"),  # last_login
+        ("UPDATE", "django_session"),  # the request's changes, saved once
+    ]
+    # The profiles come with the user from authenticate().
+    assert _profile_reads(ctx.captured_queries) == []
+    assert len(ctx.captured_queries) <= 12
+    assert client.session.session_key != old_key
+    assert client.session["desired_role"] == "organizer"
+
+
+@pytest.mark.django_db
+def test_login_takes_role_from_profile_without_explicit_role(client, organizer_user):
+    organizer_user.uprofile.role = "organizer"
+    organizer_user.uprofile.save()
+    client.get(reverse(f"{APP}:pick_role", args=["attendee"]))
+    client.get(reverse(f"{APP}:guest_entry"))
+
+    res = client.post(
+        reverse(f"{APP}:login"), {"username": "orguser", "password": "Passw0rd1!"}
+    )
+
+    assert res.status_code == 302
+    assert client.session["desired_role"] == "organizer"
+    assert "guest" not in client.session
+
+
+@pytest.mark.django_db
+def test_signup_writes_are_minimal(client, django_user_model):
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.post(
+            reverse(f"{APP}:signup") + "?role=organizer",
+            {
+                "username": "leanorg",
+                "password1": "Passw0rd1!",
+                "password2": "Passw0rd1!",
+            },
+        )
+
+    assert res.status_code == 302
+    assert _writes(ctx.captured_queries) == [
+        ("INSERT", "auth_user"),
+        ("INSERT", "accounts_userprofile"),  # ensure_user_profile
+        ("UPDATE", "accounts_userprofile"),  # the chosen role
+        ("INSERT", "accounts_organizerprofile"),
+        ("INSERT", "django_session"),
+        ("UPDATE", "auth_user"),  # last_login
+        ("UPDATE", "django_session"),
+    ]
+    assert _profile_reads(ctx.captured_queries) == []
+    assert len(ctx.captured_queries) <= 18
+
+    user = django_user_model.objects.get(username="leanorg")
+    assert user.uprofile.role == "organizer"
+    assert user.organizerprofile is not None
+    assert client.session["desired_role"] == "organizer"
+
+
+@pytest.mark.django_db
+def test_attendee_signup_keeps_the_default_role(client, django_user_model):
+    with CaptureQueriesContext(connection) as ctx:
+        client.post(
+            reverse(f"{APP}:signup"),
+            {
+                "username": "leanatt",
+                "password1": "Passw0rd1!",
+                "password2": "Passw0rd1!",
+            },
+        )
+
+    assert ("UPDATE", "accounts_userprofile") not in _writes(ctx.captured_queries)
+    user = django_user_model.objects.get(username="leanatt")
+    assert user.uprofile.role == "attendee"
+    assert client.session["desired_role"] == "attendee"
@@ -0,0 +1,156 @@
+import pickle
+
+import pytest
+from django.contrib.auth import authenticate, update_session_auth_hash
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import OrganizerProfile
+from accounts.profiles import load_user, organizer_profile, user_profile
+from accounts.templatetags.accounts_extras import get_profile
+
+
+def _profile_queries(queries):
+    """Queries reading a profile table on its own (not joined to the user)."""
+    return [
+        q["sql"]
+        for q in queries
+        if 'FROM "accounts_userprofile"' in q["sql"]
+        or 'FROM "accounts_organizerprofile"' in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_load_user_joins_both_profiles(organizer_user, django_assert_num_queries):
+    OrganizerProfile.objects.create(user=organizer_user, full_name="Org")
+
+    with django_assert_num_queries(1):
+        user = load_user(organizer_user.pk)
+        assert user.uprofile.role == "attendee"
+        assert user.organizerprofile.full_name == "Org"
+
+
+@pytest.mark.django_db
+def test_helpers_return_none_without_a_profile(attendee_user):
+    user = load_user(attendee_user.pk)
+    assert organizer_profile(user) is None
+    assert get_profile({"user": user}) is None
+    assert user_profile(user) == attendee_user.uprofile
+
+
+def test_helpers_return_none_for_anonymous_users():
+    assert user_profile(AnonymousUser()) is None
+    assert organizer_profile(AnonymousUser()) is None
+
+
+@pytest.mark.django_db
+def test_signed_in_page_reads_profiles_from_the_session_user(client, organizer_user):
+    OrganizerProfile.objects.create(user=organizer_user, full_name="Org")
+    client.force_login(organizer_user, backend="accounts.profiles.ProfileModelBackend")
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(reverse("events:event_list"))
+
+    assert res.status_code == 200
+    # Loaded with the user; the context processor and nav add nothing.
+    assert _profile_queries(ctx.captured_queries) == []
+
+
+@pytest.mark.django_db
+def test_cached_user_is_dropped_when_a_profile_changes(
+    settings, organizer_user, django_assert_num_queries
+):
+    settings.PROFILE_CACHE_SECONDS = 60
+    profile = OrganizerProfile.objects.create(user=organizer_user, full_name="Old")
+
+    load_user(organizer_user.pk)
+    with django_assert_num_queries(0):
+        assert load_user(organizer_user.pk).organizerprofile.full_name == "Old"
+
+    profile.full_name = "New"
+    profile.save()
+    assert load_user(organizer_user.pk).organizerprofile.full_name == "New"
+
+
+@pytest.mark.django_db
+def test_cached_user_holds_no_password_hash(
+    settings, client, attendee_user, django_assert_num_queries
+):
+    settings.PROFILE_CACHE_SECONDS = 60
+    client.force_login(attendee_user)
+    load_user(attendee_user.pk)
+
+    user, _ = cache.get(f"accounts:user:{attendee_user.pk}")
+    assert "password" not in user.__dict__
+    assert attendee_user.password not in str(pickle.dumps(user))
+
+    # The session still checks out without loading the password ...
+    cached = load_user(attendee_user.pk)
+    with django_assert_num_queries(0):
+        assert cached.get_session_auth_hash() == (attendee_user.get_session_auth_hash())
+    response = client.get("/")
+    assert response.wsgi_request.user.pk == attendee_user.pk
+
+    # ... and saving the cached user leaves the password alone.
+    cached.first_name = "Renamed"
+    cached.save()
+    attendee_user.refresh_from_db()
+    assert attendee_user.first_name == "Renamed"
+    assert attendee_user.check_password("Passw0rd1!")
+
+
+@pytest.mark.django_db
+def test_password_change_keeps_the_session(settings, client, attendee_user):
+    settings.PROFILE_CACHE_SECONDS = 60
+    client.force_login(attendee_user)
+    request = client.get("/").wsgi_request
+    user = request.user
+    assert "password" not in user.__dict__
+
+    # What a password change view does with request.user.
+    user.set_password("N3wPassw0rd!")
+    user.save()
+    update_session_auth_hash(request, user)
+    request.session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = request.session.session_key
+
+    response = client.get("/")
+    assert response.wsgi_request.user.pk == attendee_user.pk
+    attendee_user.refresh_from_db()
+    assert attendee_user.check_password("N3wPassw0rd!")
+
+
+@pytest.mark.django_db
+def test_wrong_password_is_hashed_once(attendee_user, monkeypatch):
+    calls = []
+    original = User.check_password
+
+    def counting(self, raw_password):
+        calls.append(raw_password)
+        return original(self, raw_password)
+
+    monkeypatch.setattr(User, "check_password", counting)
+
+    # The fallback ModelBackend must not check it a second time.
+    assert authenticate(username="attuser", password="wrong") is None
+    assert calls == ["wrong"]
+    assert authenticate(username="attuser", password="Passw0rd1!") == attendee_user
+
+
+@pytest.mark.django_db
+def test_authenticate_loads_profiles_and_rejects_unknown_users(
+    attendee_user, django_assert_num_queries
+):
+    assert authenticate(username="nobody", password="Passw0rd1!") is None
+
+    user = authenticate(username="attuser", password="Passw0rd1!")
+    with django_assert_num_queries(0):
+        assert user_profile(user).role == "attendee"
+        assert organizer_profile(user) is None
+
+    attendee_user.is_active = False
+    attendee_user.save()
+    assert authenticate(username="attuser", password="Passw0rd1!") is None
@@ -5,13 +5,18 @@ from django.contrib.auth import login as auth_login
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import redirect, render
 from django.urls import NoReverseMatch, reverse
+from django.utils.decorators import method_decorator
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.generic import TemplateView
 
+from config.ratelimit import ratelimit
+
 from .forms import SignupForm, OrganizerProfileForm
-from .models import OrganizerProfile, UserProfile
+from .models import OrganizerProfile
+from .profiles import organizer_profile
 
 
 ALLOWED_ROLES = {"organizer", "attendee"}  # guest handled separately
@@ -50,6 +55,20 @@ def _role_default_redirect(request, role: str):
         return "/"
 
 
+def _login_username(request):
+    return (request.POST.get("username") or "").strip().lower()
+
+
+# Per client, and per account against guessing from many addresses.
+@method_decorator(
+    ratelimit("login", limit=20, period=300, methods=("POST",)), name="dispatch"
+)
+@method_decorator(
+    ratelimit(
+        "login_username", limit=10, period=900, key=_login_username, methods=("POST",)
+    ),
+    name="dispatch",
+)
 class RoleLoginView(auth_views.LoginView):
     template_name = "accounts/login.html"
 
@@ -71,8 +90,7 @@ class RoleLoginView(auth_views.LoginView):
             # 2) otherwise sync from DB
             _sync_session_role_from_user(self.request)
 
-        # rotate for safety
-        self.request.session.cycle_key()
+        # auth_login() has already rotated the session key.
         return resp
 
     def get_success_url(self):
@@ -119,11 +137,6 @@ def signup(request):
 
         form = SignupForm(request.POST)
         if form.is_valid():
-            user = form.save()
-
-            OrganizerProfile.objects.get_or_create(user=user)
-            uprof, _ = UserProfile.objects.get_or_create(user=user)
-
             selected_role = (
                 request.POST.get("role")
                 or request.GET.get("role")
@@ -134,15 +147,21 @@ def signup(request):
             if selected_role not in ALLOWED_ROLES:
                 selected_role = "attendee"
 
-            uprof.role = selected_role
-            uprof.save()
+            with transaction.atomic():
+                # The UserProfile is created (and cached on the user) by
+                # the post_save signal; a brand-new user has neither.
+                user = form.save()
+                uprof = user.uprofile
+                if uprof.role != selected_role:
+                    uprof.role = selected_role
+                    uprof.save(update_fields=["role"])
+                OrganizerProfile.objects.create(user=user)
 
-            auth_login(request, user)
+            auth_login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
 
-            # clean guest BUT keep role from DB
+            # clean guest BUT keep role from DB (auth_login rotated the key)
             request.session.pop("guest", None)
             _sync_session_role_from_user(request)
-            request.session.cycle_key()
 
             messages.success(request, "Account created. Welcome to SimpleTix!")
 
@@ -164,7 +183,9 @@ def signup(request):
 
 @login_required
 def profile_edit(request):
-    profile, _ = OrganizerProfile.objects.get_or_create(user=request.user)
+    profile = organizer_profile(request.user)
+    if profile is None:
+        profile = OrganizerProfile.objects.create(user=request.user)
 
     if request.method == "POST":
         form = OrganizerProfileForm(request.POST, request.FILES, instance=profile)
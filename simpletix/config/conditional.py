@@ -0,0 +1,158 @@
+# config/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for server-rendered pages.
+
+`conditional_page` wraps Django's `condition` decorator. A view supplies
+cheap validator functions, typically one small query plus cache lookups.
+When the client's copy is current, the response is a 304 built without
+calling the view, so no page queries and no template rendering happen.
+
+The pages also contain per-viewer bits (nav bar, role-dependent buttons,
+CSRF token) and signed media URLs that expire. Every ETag therefore
+also covers:
+
+- the viewer: user id plus a per-user version bumped when their profile
+  changes, and the session role flags;
+- the CSRF cookie;
+- the current signed-media-URL bucket (config.storage).
+
+Pages with pending flash messages are never short-circuited. Last-Modified
+is only sent to anonymous visitors without session flags, because a
+timestamp can't express a per-viewer difference.
+
+Responses that are the same for everyone (the JSON API) pass
+`per_viewer=False`: their ETag covers only the content and the media
+bucket, and they don't touch the session at all.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+SESSION_FLAGS = ("desired_role", "auth_role", "guest")
+
+
+def _viewer_key(user_id):
+    return f"viewer:version:{user_id}"
+
+
+def viewer_version(user_id):
+    """Version of everything about a user that the page chrome shows."""
+    key = _viewer_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.set(key, version, None)
+    return version
+
+
+def bump_viewer_version(user_id):
+    cache.set(_viewer_key(user_id), time.time_ns(), None)
+
+
+def request_cache(request, key, compute):
+    """
+    Compute `key` once per request. Lets validators and the view share a
+    lookup, e.g. the view renders the very rows the ETag was built from.
+    """
+    store = request.__dict__.setdefault("_conditional_cache", {})
+    if key not in store:
+        store[key] = compute()
+    return store[key]
+
+
+def _media_bucket():
+    period = getattr(settings, "MEDIA_URL_CACHE_BUCKET_SECONDS", 3600)
+    return int(time.time() // period), period
+
+
+def _is_public(request):
+    return not request.user.is_authenticated and not any(
+        request.session.get(flag) for flag in SESSION_FLAGS
+    )
+
+
+def _viewer_parts(request):
+    user = request.user
+    parts = [str(request.session.get(flag)) for flag in SESSION_FLAGS]
+    if user.is_authenticated:
+        parts += [str(user.pk), str(viewer_version(user.pk))]
+    parts.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""))
+    parts.append(str(_media_bucket()[0]))
+    return parts
+
+
+def conditional_page(etag_func, last_modified_func=None, per_viewer=True):
+    """
+    Decorator: `etag_func(request, *args, **kwargs)` returns a string that
+    changes whenever the page content does (None to skip validation, e.g.
+    when the object doesn't exist and the view should 404).
+    `last_modified_func` optionally returns an aware datetime.
+    """
+
+    def etag(request, *args, **kwargs):
+        if per_viewer and len(get_messages(request)):
+            return None
+        value = etag_func(request, *args, **kwargs)
+        if value is None:
+            return None
+        if per_viewer:
+            parts = _viewer_parts(request)
+        else:
+            parts = [str(_media_bucket()[0])]
+        raw = "|".join([value, *parts])
+        return hashlib.sha1(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if last_modified_func is None:
+            return None
+        if per_viewer and (not _is_public(request) or len(get_messages(request))):
+            return None
+        value = last_modified_func(request, *args, **kwargs)
+        if value is None:
+            return None
+        # Media URLs are re-signed every bucket, so the page changes too.
+        bucket, period = _media_bucket()
+        bucket_start = datetime.fromtimestamp(bucket * period, tz=timezone.utc)
+        return max(value, bucket_start)
+
+    # Browsers may keep the response but must revalidate before reuse;
+    # shared caches must not store per-viewer responses.
+    cache_control = {"private": True} if per_viewer else {"public": True}
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(
+            view_func
+        )
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True, **cache_control)
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+def versions_last_modified(*values):
+    """
+    Latest of the given datetimes and time.time_ns() versions (such as
+    events.cards availability versions), as an aware datetime.
+    """
+    latest = None
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, int):
+            value = datetime.fromtimestamp(value / 1e9, tz=timezone.utc)
+        latest = value if latest is None else max(latest, value)
+    return latest
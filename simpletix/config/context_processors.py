@@ -2,7 +2,13 @@ from django.conf import settings
 
 
 def algolia_settings(request):
+    # Fall back to the server-side Postgres search when Algolia is off.
+    use_algolia = bool(
+        getattr(settings, "ALGOLIA_ENABLED", True)
+        and settings.ALGOLIA.get("APPLICATION_ID")
+    )
     return {
+        "SEARCH_BACKEND": "algolia" if use_algolia else "server",
         "ALGOLIA_APP_ID": settings.ALGOLIA.get("APPLICATION_ID", ""),
         "ALGOLIA_SEARCH_KEY": settings.ALGOLIA.get("SEARCH_KEY", ""),
         "ALGOLIA_INDEX": f"{settings.ALGOLIA.get('INDEX_PREFIX', 'simpletix')}_events",
@@ -0,0 +1,105 @@
+# config/db_router.py
+"""
+Primary/replica database routing with read-your-writes stickiness.
+
+Reads go to one of settings.DB_REPLICAS only inside a request that
+ReplicaRoutingMiddleware has cleared for it: a safe (GET/HEAD/OPTIONS)
+request from a client that hasn't written in the last
+DB_REPLICA_STICKY_SECONDS. Everything else uses the primary:
+
+- writes, and every read in the same request after one;
+- reads inside a transaction on the primary;
+- code outside requests (management commands, background threads), since
+  it can't tell whether it depends on a write that hasn't replicated yet.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Holds the time (epoch seconds) until which the client reads the primary.
+STICKY_COOKIE = "db_primary_until"
+
+
+class _RequestRouting:
+    def __init__(self, replicas_allowed):
+        self.replicas_allowed = replicas_allowed
+        self.wrote = False
+
+
+_current = ContextVar("db_request_routing", default=None)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        replicas = getattr(settings, "DB_REPLICAS", [])
+        if (
+            routing is None
+            or not routing.replicas_allowed
+            or routing.wrote
+            or not replicas
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decides per request whether reads may use a replica (see module
+    docstring), and after any write pins the client to the primary for
+    DB_REPLICA_STICKY_SECONDS with a cookie, long enough for the replicas
+    to catch up. Not used unless DB_REPLICAS is configured.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "DB_REPLICAS", None):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "DB_REPLICA_STICKY_SECONDS", 10)
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        routing = _RequestRouting(
+            replicas_allowed=request.method in SAFE_METHODS
+            and pinned_until <= time.time()
+        )
+
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        if routing.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                secure=not settings.DEBUG,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,128 @@
+# config/gunicorn.py
+"""
+Gunicorn configuration (Procfile: `gunicorn -c python:config.gunicorn`).
+
+Everything can be overridden from the environment:
+
+GUNICORN_WORKER_CLASS
+    "gthread" (default), "sync" or "uvicorn". Requests make synchronous
+    Stripe, SMTP and S3 calls, so gthread's threads keep a worker busy
+    while one of them waits on the network. "uvicorn" serves
+    config.asgi:application and needs the uvicorn package installed.
+GUNICORN_WORKERS, GUNICORN_THREADS
+    Default: 2 * CPUs + 1 sync workers, or CPUs + 1 gthread workers with
+    4 threads each.
+GUNICORN_TIMEOUT
+    Default 60s: a checkout can make several Stripe calls in a row and
+    render a PDF.
+GUNICORN_MAX_REQUESTS, GUNICORN_MAX_RSS_MB
+    Workers are recycled after about 1000 requests (with jitter, so they
+    don't all restart at once), or once their resident memory passes the
+    limit (default 512 MB; 0 disables).
+
+The app is preloaded in the master, and the heavy libraries the request
+path needs are imported there too. Workers fork with them already in
+(copy-on-write shared) memory, so the first requests after a boot or
+recycle don't pay for the imports.
+
+`manage.py benchmark_workers` compares worker classes under load.
+"""
+
+import importlib
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger("gunicorn.error")
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+# Imported in the master before forking (see module docstring).
+WARM_IMPORTS = (
+    "stripe",
+    "qrcode",
+    "reportlab.pdfgen.canvas",
+    "reportlab.lib.pagesizes",
+    "PIL.Image",
+    "boto3",
+    "storages.backends.s3",
+)
+# Check memory every this many requests; reading it is cheap, but not free.
+RSS_CHECK_EVERY = 50
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+_cpus = multiprocessing.cpu_count()
+_worker_kind = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = WORKER_CLASSES[_worker_kind]
+wsgi_app = (
+    "config.asgi:application"
+    if _worker_kind == "uvicorn"
+    else "config.wsgi:application"
+)
+if _worker_kind == "gthread":
+    workers = _env_int("GUNICORN_WORKERS", _cpus + 1)
+    threads = _env_int("GUNICORN_THREADS", 4)
+else:
+    workers = _env_int("GUNICORN_WORKERS", 2 * _cpus + 1)
+    threads = 1
+
+preload_app = True
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = 30
+# Behind nginx/the load balancer; keep idle upstream connections briefly.
+keepalive = 5
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = max(max_requests // 10, 1) if max_requests else 0
+max_rss_mb = _env_int("GUNICORN_MAX_RSS_MB", 512)
+
+
+def when_ready(server):
+    for module in WARM_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            logger.warning("Warm import of %s failed", module)
+
+
+def pre_fork(server, worker):
+    # Connections opened in the master must not be shared with workers.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    # Threads don't survive fork(): restart the secrets refresher per worker.
+    from config.secrets import apply_rotated_secrets, start_refresh
+
+    start_refresh(apply_rotated_secrets)
+    worker.handled_requests = 0
+
+
+def post_request(worker, req, environ, resp):
+    from config.metrics import WORKER_REQUESTS, process_rss_bytes
+
+    WORKER_REQUESTS.inc()
+    worker.handled_requests = getattr(worker, "handled_requests", 0) + 1
+    if not max_rss_mb or worker.handled_requests % RSS_CHECK_EVERY:
+        return
+    rss = process_rss_bytes()
+    if rss is not None and rss > max_rss_mb * 1024 * 1024:
+        logger.info(
+            "Recycling worker %s: RSS %.0f MB > %s MB",
+            worker.pid,
+            rss / 1024 / 1024,
+            max_rss_mb,
+        )
+        # Finish in-flight requests, then exit; the master forks a new one.
+        worker.alive = False
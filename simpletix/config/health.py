@@ -1,6 +1,149 @@
-from django.http import HttpResponse
+# config/health.py
+"""
+Health checks for the load balancer.
+
+health_check (/health/)
+    Liveness: the process answers. Touches nothing.
+
+deep_health_check (/health/deep/)
+    Readiness: probes the database (every alias), media storage and the
+    SMTP server, in parallel, each given HEALTH_PROBE_TIMEOUT seconds.
+    The result is reused for HEALTH_DEEP_CACHE_SECONDS, and concurrent
+    requests in a worker wait for the one probe in flight, so load
+    balancer probes can't stampede Postgres. Returns 503 when a probe in
+    HEALTH_CRITICAL_PROBES fails (by default only the database: every
+    instance shares storage and SMTP, so pulling instances out for them
+    would only turn a degraded site into an outage). Other failures show
+    up as "degraded" with a 200.
+
+HealthCheckMiddleware serves both first thing, skipping sessions, auth,
+messages and the rest of the middleware stack.
+"""
+
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail.backends import smtp
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from django.utils.module_loading import import_string
+
+_lock = threading.Lock()
+_cached = {"expires": 0.0, "result": None}
 
 
 def health_check(request):
     """Health check response for Elastic Beanstalk."""
     return HttpResponse("OK")
+
+
+def probe_database():
+    for alias in connections:
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        finally:
+            # Probe threads are short-lived; don't leave connections behind.
+            connection.close()
+
+
+def probe_storage():
+    default_storage.exists("health-check")
+
+
+def probe_smtp():
+    if not issubclass(import_string(settings.EMAIL_BACKEND), smtp.EmailBackend):
+        return "skipped"
+    # Reachability only: logging in on every probe would get us throttled.
+    server = smtplib.SMTP(
+        settings.EMAIL_HOST,
+        settings.EMAIL_PORT,
+        timeout=getattr(settings, "HEALTH_PROBE_TIMEOUT", 2),
+    )
+    try:
+        server.noop()
+    finally:
+        server.quit()
+
+
+PROBES = {
+    "database": probe_database,
+    "storage": probe_storage,
+    "smtp": probe_smtp,
+}
+
+
+def _timed(probe):
+    started = time.perf_counter()
+    try:
+        status = probe() or "ok"
+    except Exception as exc:
+        status = f"error: {exc.__class__.__name__}"
+    return {"status": status, "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def run_probes():
+    timeout = getattr(settings, "HEALTH_PROBE_TIMEOUT", 2)
+    pool = ThreadPoolExecutor(max_workers=len(PROBES), thread_name_prefix="health")
+    futures = {name: pool.submit(_timed, probe) for name, probe in PROBES.items()}
+    wait(futures.values(), timeout=timeout)
+    # A probe stuck past the timeout is abandoned, not waited for.
+    pool.shutdown(wait=False)
+
+    checks = {}
+    for name, future in futures.items():
+        if future.done():
+            checks[name] = future.result()
+        else:
+            checks[name] = {"status": "error: timeout", "ms": timeout * 1000}
+    critical = getattr(settings, "HEALTH_CRITICAL_PROBES", ("database",))
+    failed = [
+        name
+        for name, check in checks.items()
+        if check["status"] not in ("ok", "skipped")
+    ]
+    if any(name in critical for name in failed):
+        status = "error"
+    else:
+        status = "degraded" if failed else "ok"
+    return {"status": status, "checks": checks}
+
+
+def deep_health_result():
+    """The latest probe result, re-probing once it is too old."""
+    with _lock:
+        if time.monotonic() >= _cached["expires"]:
+            _cached["result"] = run_probes()
+            _cached["expires"] = time.monotonic() + getattr(
+                settings, "HEALTH_DEEP_CACHE_SECONDS", 5
+            )
+        return _cached["result"]
+
+
+def deep_health_check(request):
+    result = deep_health_result()
+    response = JsonResponse(result, status=503 if result["status"] == "error" else 200)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+class HealthCheckMiddleware:
+    """Answers the health endpoints before any other middleware runs."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = {
+            "/health": health_check,
+            "/health/deep": deep_health_check,
+        }
+
+    def __call__(self, request):
+        view = self.views.get(request.path_info.rstrip("/"))
+        if view is not None:
+            return view(request)
+        return self.get_response(request)
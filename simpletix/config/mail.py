@@ -0,0 +1,14 @@
+# config/mail.py
+"""Email backends."""
+
+from django.core.mail.backends import smtp
+
+from config.timing import external_call
+
+
+class SMTPEmailBackend(smtp.EmailBackend):
+    """Django's SMTP backend, timed as external_call_seconds{service="smtp"}."""
+
+    def send_messages(self, email_messages):
+        with external_call("smtp"):
+            return super().send_messages(email_messages)
@@ -0,0 +1,188 @@
+# config/metrics.py
+"""
+In-process metrics, served in the Prometheus text format on /metrics.
+
+Each process (gunicorn worker) keeps its own counters and histograms, so
+Prometheus should scrape workers individually or sum across them. Label
+values must come from small, fixed sets, such as database aliases or URL
+names, never from user input, so the number of series stays bounded.
+
+The endpoint requires `Authorization: Bearer <METRICS_TOKEN>` or a staff
+session.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+# Seconds; suits DB connects, queries and outbound HTTP calls alike.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(pairs):
+    """`{name="value",...}` for (name, value) pairs; empty without any."""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, *extra):
+        return format_labels([*zip(self.labelnames, key), *extra])
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self, key, value):
+        return [f"{self.name}{self._labels(key)} {value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Per-bucket (not cumulative) counts, with a final +Inf slot.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(self._key(labels), ([], 0))
+        return sum(counts)
+
+    def _samples(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += bucket_count
+            lines.append(
+                f"{self.name}_bucket{self._labels(key, ('le', bound))} {cumulative}"
+            )
+        lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+        lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+def register_collector(collect):
+    """
+    `collect()` is called on every scrape and returns lines of exposition
+    text, for values that are read rather than counted (e.g. pool sizes).
+    """
+    _collectors.append(collect)
+    return collect
+
+
+WORKER_REQUESTS = Counter(
+    "gunicorn_worker_requests_total", "Requests handled by this worker process."
+)
+_started = time.time()
+
+
+def process_rss_bytes():
+    """Current resident set size of this process (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@register_collector
+def process_metrics():
+    lines = [
+        "# TYPE process_start_time_seconds gauge",
+        f"process_start_time_seconds {_started}",
+    ]
+    rss = process_rss_bytes()
+    if rss is not None:
+        lines += [
+            "# TYPE process_resident_memory_bytes gauge",
+            f"process_resident_memory_bytes {rss}",
+        ]
+    return lines
+
+
+def render_metrics():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+def _authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    header = request.headers.get("Authorization", "")
+    if token and constant_time_compare(header, f"Bearer {token}"):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (see module docstring for access)."""
+    if not _authorized(request):
+        return HttpResponse("Unauthorized", status=401)
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,101 @@
+# config/middleware/cdn_cookies.py
+import base64
+import json
+import time
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import cc_delim_re
+
+# Our own (readable) record of when the CloudFront cookies run out.
+EXPIRY_COOKIE = "media_cdn_expires"
+# Re-issue the cookies once less than this fraction of their lifetime is left.
+REFRESH_FRACTION = 0.25
+
+
+def _cloudfront_b64(data):
+    encoded = base64.b64encode(data).decode()
+    return encoded.replace("+", "-").replace("=", "_").replace("/", "~")
+
+
+class CloudFrontCookieMiddleware:
+    """
+    Sets CloudFront signed cookies granting access to everything on
+    MEDIA_CDN_DOMAIN (config.storage.CDNMediaStorage), so media URLs can
+    be plain and cacheable. The cookies are only re-signed when they're
+    close to expiring, not on every response, and only set on HTML pages:
+    a Set-Cookie on a publicly cacheable response (the JSON API) would be
+    cached and handed to everyone, and media is only loaded from pages.
+
+    Not used unless MEDIA_CDN_DOMAIN is configured.
+    """
+
+    def __init__(self, get_response):
+        self.domain = getattr(settings, "MEDIA_CDN_DOMAIN", "")
+        if not self.domain:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.key_id = settings.MEDIA_CDN_KEY_ID
+        self.private_key = serialization.load_pem_private_key(
+            settings.MEDIA_CDN_PRIVATE_KEY.encode(), password=None
+        )
+        self.lifetime = getattr(settings, "MEDIA_CDN_COOKIE_SECONDS", 12 * 3600)
+        self.cookie_domain = getattr(settings, "MEDIA_CDN_COOKIE_DOMAIN", None)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_private_page(response):
+            return response
+        try:
+            expires = int(request.COOKIES.get(EXPIRY_COOKIE, 0))
+        except ValueError:
+            expires = 0
+        if expires - time.time() > self.lifetime * REFRESH_FRACTION:
+            return response
+        for name, value in self.signed_cookies(int(time.time()) + self.lifetime):
+            response.set_cookie(
+                name,
+                value,
+                max_age=self.lifetime,
+                domain=self.cookie_domain,
+                secure=not settings.DEBUG,
+                httponly=name != EXPIRY_COOKIE,
+                samesite="Lax",
+            )
+        return response
+
+    @staticmethod
+    def is_private_page(response):
+        """A 200 HTML response that shared caches won't store."""
+        if response.status_code != 200:
+            return False
+        if not response.get("Content-Type", "").startswith("text/html"):
+            return False
+        directives = {
+            directive.split("=", 1)[0].strip().lower()
+            for directive in cc_delim_re.split(response.get("Cache-Control", ""))
+        }
+        return "public" not in directives and "s-maxage" not in directives
+
+    def signed_cookies(self, expires):
+        policy = json.dumps(
+            {
+                "Statement": [
+                    {
+                        "Resource": f"https://{self.domain}/*",
+                        "Condition": {"DateLessThan": {"AWS:EpochTime": expires}},
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        ).encode()
+        # CloudFront only accepts RSA-SHA1 signatures for signed cookies.
+        signature = self.private_key.sign(policy, padding.PKCS1v15(), hashes.SHA1())
+        return [
+            ("CloudFront-Policy", _cloudfront_b64(policy)),
+            ("CloudFront-Signature", _cloudfront_b64(signature)),
+            ("CloudFront-Key-Pair-Id", self.key_id),
+            (EXPIRY_COOKIE, str(expires)),
+        ]
@@ -1,6 +1,11 @@
-# simpletix/simpletix/middleware/multi_session_middleware.py
+# config/middleware/multi_session_middleware.py
+import re
+
 from django.conf import settings
 
+# Slot names end up in a cookie name.
+SLOT_NAME = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
 
 class MultiSessionMiddleware:
     """
@@ -11,6 +16,10 @@ class MultiSessionMiddleware:
       - /events/?sid=org   → uses cookie "sessionid_org"
       - /events/?sid=att   → uses cookie "sessionid_att"
     If no sid is given → falls back to normal SESSION_COOKIE_NAME.
+
+    Only the cookie changes, so this works with any SESSION_ENGINE. It must
+    come before SessionMiddleware, which reads the cookie on the way in
+    and sets it on the way out.
     """
 
     def __init__(self, get_response):
@@ -19,32 +28,25 @@ class MultiSessionMiddleware:
 
     def __call__(self, request):
         sid = request.GET.get("sid") or request.headers.get("X-Session-Slot")
-        if sid:
+        if sid and SLOT_NAME.fullmatch(sid):
             # stash it so later middleware & views can see it
             request._session_slot = sid
-            # temporarily tell Django to read from a different cookie
-            request.COOKIES[self.base_cookie] = request.COOKIES.get(
-                f"{self.base_cookie}_{sid}", ""
-            )
+            # tell SessionMiddleware to read the slot's cookie instead
+            slot_value = request.COOKIES.get(f"{self.base_cookie}_{sid}")
+            if slot_value:
+                request.COOKIES[self.base_cookie] = slot_value
+            else:
+                request.COOKIES.pop(self.base_cookie, None)
 
         response = self.get_response(request)
 
-        # if we had a slot, write back to the slot-cookie
+        # if we had a slot, move the session cookie to the slot-cookie
         if hasattr(request, "_session_slot"):
-            slot = request._session_slot
-            normal_val = response.cookies.get(self.base_cookie)
-            if normal_val:
-                # copy the regular session cookie to a slot-specific one
-                response.set_cookie(
-                    key=f"{self.base_cookie}_{slot}",
-                    value=normal_val.value,
-                    max_age=normal_val["max-age"],
-                    expires=normal_val["expires"],
-                    path=normal_val["path"],
-                    domain=normal_val["domain"],
-                    secure=normal_val["secure"],
-                    httponly=normal_val["httponly"],
-                    samesite=normal_val["samesite"],
-                )
+            morsel = response.cookies.pop(self.base_cookie, None)
+            if morsel is not None:
+                # same value, expiry and flags (a deletion stays a deletion),
                 # and DON'T overwrite the global one
+                name = f"{self.base_cookie}_{request._session_slot}"
+                response.cookies[name] = morsel.value
+                response.cookies[name].update(morsel)
         return response
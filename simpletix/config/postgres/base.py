@@ -0,0 +1,96 @@
+# config/postgres/base.py
+"""
+The stock PostgreSQL backend, plus connection metrics.
+
+Set as ENGINE "config.postgres". It records, per database alias:
+
+- db_connection_checkout_seconds: time spent getting a connection. That is
+  a pool checkout when OPTIONS["pool"] is set, otherwise a new TCP/TLS
+  connection. Its _count is the number of checkouts.
+- db_connections_reused_total: requests served by a persistent connection
+  (CONN_MAX_AGE) instead of a new one. Counted by the health check, so
+  only when CONN_HEALTH_CHECKS is on.
+- db_connection_health_check_failures_total: persistent connections found
+  dead by CONN_HEALTH_CHECKS and replaced.
+
+With a psycopg pool, its own statistics are exported as
+db_pool_<stat>{alias=...} gauges too.
+"""
+
+import time
+
+from django.db.backends.postgresql import base
+
+from config.metrics import Counter, Histogram, format_labels, register_collector
+
+CHECKOUT_SECONDS = Histogram(
+    "db_connection_checkout_seconds",
+    "Time spent opening (or checking out from the pool) a DB connection.",
+    ["alias"],
+)
+REUSED = Counter(
+    "db_connections_reused_total",
+    "Requests that reused a persistent DB connection.",
+    ["alias"],
+)
+HEALTH_CHECK_FAILURES = Counter(
+    "db_connection_health_check_failures_total",
+    "Persistent DB connections that failed their health check.",
+    ["alias"],
+)
+
+# psycopg_pool.ConnectionPool.get_stats() keys worth graphing.
+POOL_STATS = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+    "connections_num",
+    "connections_errors",
+)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            CHECKOUT_SECONDS.observe(time.perf_counter() - started, alias=self.alias)
+
+    def close_if_health_check_failed(self):
+        # Runs on the first use of a connection in each request; a
+        # connection that's already open at that point is being reused.
+        first_use = (
+            self.connection is not None
+            and self.health_check_enabled
+            and not self.health_check_done
+        )
+        super().close_if_health_check_failed()
+        if not first_use or self.pool:
+            return
+        if self.connection is None:
+            HEALTH_CHECK_FAILURES.inc(alias=self.alias)
+        else:
+            REUSED.inc(alias=self.alias)
+
+
+@register_collector
+def pool_stats():
+    pools = sorted(DatabaseWrapper._connection_pools.items())
+    if not pools:
+        return []
+    stats = {alias: pool.get_stats() for alias, pool in pools}
+    lines = []
+    for stat in POOL_STATS:
+        lines.append(f"# TYPE db_pool_{stat} gauge")
+        for alias, values in stats.items():
+            if stat in values:
+                labels = format_labels([("alias", alias)])
+                lines.append(f"db_pool_{stat}{labels} {values[stat]}")
+    return lines
@@ -0,0 +1,165 @@
+# config/querycheck.py
+"""
+Query checks for tests and staging: N+1 patterns, query budgets and
+EXPLAIN plans of slow statements.
+
+QueryCheckMiddleware records every SQL statement a request runs and
+reports:
+
+- N+1 patterns: the same SELECT shape run QUERY_REPEAT_THRESHOLD or more
+  times. A shape is the SQL with its parameters left out and IN lists
+  collapsed, so `WHERE id = %s` run once per row counts as one shape.
+- Budget overruns: more statements than the view's @query_budget(n).
+- Slow statements: SELECTs slower than SLOW_QUERY_EXPLAIN_MS are logged
+  with their EXPLAIN plan.
+
+QUERY_CHECKS selects what happens:
+
+"off" (default)
+    The middleware isn't loaded.
+"log"
+    Problems are logged as warnings (meant for staging).
+"raise"
+    N+1 patterns and budget overruns raise QueryCheckFailed, which fails
+    the test that made the request. conftest.py turns this on for every
+    test.
+"""
+
+import logging
+import re
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryCheckFailed(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Declare the most SQL statements a view may run, middleware included."""
+
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+
+    return decorator
+
+
+def query_shape(sql):
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", sql.strip()))
+
+
+def _is_select(sql):
+    return sql.lstrip()[:6].upper() in ("SELECT", "WITH")
+
+
+class QueryRecorder:
+    """An execute_wrapper recording statements for one request."""
+
+    def __init__(self, slow_seconds=None):
+        self.count = 0
+        self.shapes = {}
+        self.slow = []
+        self.slow_seconds = slow_seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.count += 1
+            if _is_select(sql):
+                shape = query_shape(sql)
+                self.shapes[shape] = self.shapes.get(shape, 0) + 1
+                if (
+                    self.slow_seconds is not None
+                    and elapsed >= self.slow_seconds
+                    and not many
+                ):
+                    self.slow.append(
+                        (context["connection"].alias, sql, params, elapsed)
+                    )
+
+    def repeated(self, threshold):
+        """[(count, shape)] for shapes run at least `threshold` times."""
+        return sorted(
+            (
+                (count, shape)
+                for shape, count in self.shapes.items()
+                if count >= threshold
+            ),
+            reverse=True,
+        )
+
+
+def explain(alias, sql, params):
+    """The EXPLAIN plan of a statement, or None if it can't be had."""
+    connection = connections[alias]
+    if connection.connection is None:
+        return None
+    # A raw driver cursor: the plan must not be counted or recorded as
+    # one of the request's queries.
+    try:
+        with connection.connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(str(row[0]) for row in cursor.fetchall())
+    except connection.Database.Error:
+        return None
+
+
+class QueryCheckMiddleware:
+    """See the module docstring. Goes right after RequestTimingMiddleware."""
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, "QUERY_CHECKS", "off")
+        if self.mode not in ("log", "raise"):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.threshold = getattr(settings, "QUERY_REPEAT_THRESHOLD", 5)
+        slow_ms = getattr(settings, "SLOW_QUERY_EXPLAIN_MS", 100)
+        self.slow_seconds = slow_ms / 1000 if slow_ms else None
+
+    def __call__(self, request):
+        recorder = QueryRecorder(self.slow_seconds)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        for alias, sql, params, elapsed in recorder.slow:
+            logger.warning(
+                "Slow query (%.0f ms) on %s %s:\n%s\n%s",
+                elapsed * 1000,
+                request.method,
+                request.path,
+                sql,
+                explain(alias, sql, params) or "(no plan)",
+            )
+
+        problems = [
+            f"{count} x {shape}" for count, shape in recorder.repeated(self.threshold)
+        ]
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and recorder.count > budget:
+            problems.insert(0, f"{recorder.count} queries, budget is {budget}")
+        if problems:
+            message = f"Query check failed for {request.method} {request.path}:\n" + (
+                "\n".join(problems)
+            )
+            if self.mode == "raise":
+                raise QueryCheckFailed(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, "query_budget", None)
@@ -0,0 +1,177 @@
+# config/ratelimit.py
+"""
+Rate limits for views that are expensive or easy to abuse.
+
+    @ratelimit("login", limit=10, period=300, key=("ip", login_username),
+               methods=("POST",))
+
+A request over any of its limits gets a 429 with Retry-After before the
+view runs, so it costs a couple of cache operations and nothing else.
+
+Limits are sliding windows: the count for the current fixed window plus
+the previous window's, weighted by how much of it still falls within the
+last `period` seconds. Counters are created with cache.add() and bumped
+with cache.incr(), which are atomic in the shared cache (REDIS_URL), so
+all workers and instances count together. With the default per-process
+cache each worker counts on its own.
+
+key is "ip" (client_ip()), "user" (the user id, or the IP for anonymous
+requests), a callable(request) returning a string (None or "" skips that
+key), or a tuple of these, each counted separately.
+
+RATELIMITS = {"login": (limit, period)} overrides a policy's numbers,
+and RATELIMIT_ENABLED = False turns all of them off. A deployed
+environment without the shared cache gets a system check warning
+(ratelimit.W001), since its limits are effectively multiplied by the
+number of workers.
+"""
+
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+from config.metrics import Counter
+
+REJECTED = Counter(
+    "ratelimit_rejections_total", "Requests refused with a 429, by policy.", ["policy"]
+)
+
+
+def client_ip(request):
+    """
+    The client's address. Behind the Elastic Beanstalk load balancer and
+    nginx, each proxy appends to X-Forwarded-For, so the entry
+    FORWARDED_PROXY_COUNT from the end is the one the client can't forge.
+    """
+    forwarded = [
+        part.strip()
+        for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+        if part.strip()
+    ]
+    if forwarded:
+        proxies = getattr(settings, "FORWARDED_PROXY_COUNT", 2)
+        return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _count(key, ttl):
+    if cache.add(key, 1, ttl):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr(); start again.
+        cache.set(key, 1, ttl)
+        return 1
+
+
+def hit(key, limit, period):
+    """
+    Count one request against `key`. Returns 0 while at most `limit`
+    requests were made in the last `period` seconds, otherwise the number
+    of seconds until one would be allowed again.
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    # Kept for two periods: it's still "the previous window" in the next.
+    current = _count(f"ratelimit:{key}:{int(window)}", period * 2)
+    previous = cache.get(f"ratelimit:{key}:{int(window) - 1}", 0)
+    if previous * (1 - elapsed / period) + current <= limit:
+        return 0
+    # When would one more request (the retry itself) fit?
+    room = limit - 1
+    if current <= room:
+        # Later in this window, once enough of the previous one slid out.
+        wait = period * (1 - (room - current) / previous) - elapsed
+    else:
+        # In the next window, once enough of this one slid out.
+        wait = (period - elapsed) + period * max(0, 1 - room / current)
+    return max(1, math.ceil(round(wait, 6)))
+
+
+def _key_value(kind, request):
+    if kind == "ip":
+        return client_ip(request)
+    if kind == "user":
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return client_ip(request)
+    return kind(request)
+
+
+def check(request, name, limit, period, key="ip"):
+    """
+    Count `request` against policy `name`: 0 if it's within the limits,
+    otherwise the seconds to wait (the longest of its keys).
+    """
+    if not getattr(settings, "RATELIMIT_ENABLED", True):
+        return 0
+    limit, period = getattr(settings, "RATELIMITS", {}).get(name, (limit, period))
+    retry_after = 0
+    for index, kind in enumerate(key if isinstance(key, tuple) else (key,)):
+        value = _key_value(kind, request)
+        if value:
+            # Hashed: the value may be anything the client sent.
+            digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+            retry_after = max(
+                retry_after, hit(f"{name}:{index}:{digest}", limit, period)
+            )
+    return retry_after
+
+
+def ratelimit(name, limit, period, key="ip", methods=None, json=False):
+    """
+    Refuse requests (with `methods`, default all) over `limit` per
+    `period` seconds with a 429; see the module docstring.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                retry_after = check(request, name, limit, period, key)
+                if retry_after:
+                    REJECTED.inc(policy=name)
+                    return too_many_requests(retry_after, json)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def too_many_requests(retry_after, json=False):
+    message = "Too many requests. Please try again later."
+    if json:
+        response = JsonResponse({"error": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def shared_cache_check(app_configs, **kwargs):
+    """Warn when deployed limits are counted in a per-process cache."""
+    if not getattr(settings, "RATELIMIT_ENABLED", True):
+        return []
+    if getattr(settings, "ENVIRONMENT", "local") not in ("production", "development"):
+        return []
+    backend = settings.CACHES["default"]["BACKEND"]
+    if not backend.endswith("LocMemCache"):
+        return []
+    return [
+        checks.Warning(
+            "Rate limits and the ticket resend throttle are counted in a "
+            "per-process cache, so each worker on each instance allows the "
+            "full limit.",
+            hint="Set REDIS_URL to share the cache between workers.",
+            id="ratelimit.W001",
+        )
+    ]
@@ -1,8 +1,63 @@
-import boto3
+# config/secrets.py
+"""
+AWS Secrets Manager access for settings.py.
+
+`load_secrets` fetches every secret the settings need in one round trip:
+one BatchGetSecretValue call for up to 20 names. Where the batch API
+isn't allowed, it falls back to GetSecretValue calls made in parallel.
+All calls share one client per region.
+
+Settings aren't loaded yet when this runs, so it is configured through the
+environment:
+
+SECRETS_CACHE_FILE, SECRETS_CACHE_KEY
+    Keep fetched secrets in this file, encrypted with this Fernet key,
+    for SECRETS_CACHE_TTL seconds (default 300). Workers that boot
+    together, and `manage.py` runs, then make no network calls at all.
+    Without both, nothing is written to disk.
+
+`start_refresh` re-fetches in a daemon thread every SECRETS_REFRESH_SECONDS
+and hands rotated secrets to `apply_rotated_secrets`. A rotated database
+password, SMTP login or Stripe key is therefore picked up without a
+restart. The Django SECRET_KEY still needs a deploy: workers rotating at
+different moments would reject each other's signatures.
+"""
+
 import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import boto3
+from botocore.exceptions import ClientError
+from cryptography.fernet import Fernet, InvalidToken
 
+logger = logging.getLogger(__name__)
 
-def get_secret(secret_name: str, region_name: str = "us-east-1") -> dict:
+DEFAULT_REGION = "us-east-1"
+# BatchGetSecretValue accepts at most 20 ids per call.
+BATCH_SIZE = 20
+MAX_PARALLEL_FETCHES = 8
+
+# {secret name: region} and the latest values of everything loaded, for
+# the refresh thread.
+_loaded = {}
+_current = {}
+_refresher = {"pid": None, "thread": None, "stop": None}
+_refresher_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_client(region_name: str = DEFAULT_REGION):
+    """One shared Secrets Manager client per region (clients are thread-safe)."""
+    session = boto3.session.Session()
+    return session.client(service_name="secretsmanager", region_name=region_name)
+
+
+def get_secret(secret_name: str, region_name: str = DEFAULT_REGION) -> dict:
     """
     Retrieves the given secret from AWS Secrets Manager
 
@@ -10,7 +65,201 @@ def get_secret(secret_name: str, region_name: str = "us-east-1") -> dict:
     :param region_name: the name of the AWS region, defaults to us-east-1
     :return dict: {secret_name: secret}
     """
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=region_name)
-    response = client.get_secret_value(SecretId=secret_name)
+    response = get_client(region_name).get_secret_value(SecretId=secret_name)
     return json.loads(response["SecretString"])
+
+
+def _batch_fetch(client, names):
+    found = {}
+    for start in range(0, len(names), BATCH_SIZE):
+        chunk = names[start : start + BATCH_SIZE]
+        response = client.batch_get_secret_value(SecretIdList=chunk)
+        for value in response.get("SecretValues", []):
+            # Callers may have asked by name or by ARN.
+            for name in chunk:
+                if name in (value.get("Name"), value.get("ARN")):
+                    found[name] = json.loads(value["SecretString"])
+    return found
+
+
+def fetch_secrets(names, region_name: str = DEFAULT_REGION) -> dict:
+    """
+    {name: secret} for all `names`, straight from Secrets Manager.
+
+    Names the batch call couldn't return (including when the batch API
+    is denied altogether) are fetched one by one, in parallel, so their
+    real errors surface.
+    """
+    names = list(dict.fromkeys(names))
+    found = {}
+    try:
+        found.update(_batch_fetch(get_client(region_name), names))
+    except ClientError as exc:
+        logger.info("Batch secret fetch failed, fetching one by one: %s", exc)
+
+    missing = [name for name in names if name not in found]
+    if missing:
+        workers = min(len(missing), MAX_PARALLEL_FETCHES)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            values = pool.map(lambda name: get_secret(name, region_name), missing)
+            found.update(zip(missing, values))
+    return found
+
+
+def _cache_config():
+    path = os.getenv("SECRETS_CACHE_FILE")
+    key = os.getenv("SECRETS_CACHE_KEY")
+    if not path or not key:
+        return None
+    return path, Fernet(key), int(os.getenv("SECRETS_CACHE_TTL", "300"))
+
+
+def _read_cache(config, names):
+    path, fernet, ttl = config
+    try:
+        with open(path, "rb") as fh:
+            cached = json.loads(fernet.decrypt(fh.read(), ttl=ttl))
+    except (OSError, InvalidToken, ValueError):
+        return None
+    if not all(name in cached for name in names):
+        return None
+    return {name: cached[name] for name in names}
+
+
+def _write_cache(config, secrets):
+    path, fernet, _ = config
+    token = fernet.encrypt(json.dumps(secrets).encode())
+    # mkstemp creates the file readable by this user only; the rename makes
+    # the update atomic for processes reading concurrently.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".secrets-"
+    )
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(token)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Could not write the secrets cache %s", path, exc_info=True)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def load_secrets(names, region_name: str = DEFAULT_REGION) -> dict:
+    """
+    {name: secret} for all (non-empty) `names`, from the encrypted local
+    cache when it's configured and fresh, otherwise from Secrets Manager.
+    """
+    names = [name for name in dict.fromkeys(names) if name]
+    if not names:
+        return {}
+
+    config = _cache_config()
+    secrets = _read_cache(config, names) if config else None
+    if secrets is None:
+        secrets = fetch_secrets(names, region_name)
+        if config:
+            _write_cache(config, secrets)
+
+    for name in names:
+        _loaded[name] = region_name
+    _current.update(secrets)
+    return secrets
+
+
+def refresh_secrets() -> dict:
+    """
+    Re-fetch everything load_secrets() has returned so far and return
+    {name: secret} for the secrets whose value changed.
+    """
+    by_region = {}
+    for name, region_name in _loaded.items():
+        by_region.setdefault(region_name, []).append(name)
+
+    fresh = {}
+    for region_name, names in by_region.items():
+        fresh.update(fetch_secrets(names, region_name))
+
+    config = _cache_config()
+    if config:
+        _write_cache(config, fresh)
+
+    changed = {
+        name: value for name, value in fresh.items() if _current.get(name) != value
+    }
+    _current.update(changed)
+    return changed
+
+
+def _refresh_loop(stop, interval, on_change):
+    while not stop.wait(interval):
+        try:
+            changed = refresh_secrets()
+            if changed:
+                logger.info("Picked up rotated secrets: %s", ", ".join(changed))
+                on_change(changed)
+        except Exception:
+            logger.exception("Refreshing secrets failed")
+
+
+def start_refresh(on_change, interval=None):
+    """
+    Call `on_change({name: secret})` whenever a loaded secret rotates,
+    checking every `interval` seconds (default SECRETS_REFRESH_SECONDS or
+    300; 0 disables). Safe to call repeatedly: one thread per process, so
+    call it again in forked workers (threads don't survive a fork).
+    """
+    if interval is None:
+        interval = int(os.getenv("SECRETS_REFRESH_SECONDS", "300"))
+    if interval <= 0 or not _loaded:
+        return None
+
+    with _refresher_lock:
+        if _refresher["pid"] == os.getpid() and _refresher["thread"].is_alive():
+            return _refresher["thread"]
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=_refresh_loop,
+            args=(stop, interval, on_change),
+            name="secrets-refresh",
+            daemon=True,
+        )
+        thread.start()
+        _refresher.update(pid=os.getpid(), thread=thread, stop=stop)
+        return thread
+
+
+def stop_refresh():
+    with _refresher_lock:
+        if _refresher["stop"] is not None:
+            _refresher["stop"].set()
+        _refresher.update(pid=None, thread=None, stop=None)
+
+
+def apply_rotated_secrets(changed):
+    """
+    Update the running settings from rotated secrets (see
+    settings.AWS_SECRET_NAMES). New database connections use the new
+    password; Stripe and SMTP read their settings on every use.
+    """
+    from django.conf import settings
+
+    names = getattr(settings, "AWS_SECRET_NAMES", {})
+
+    db = changed.get(names.get("db"))
+    if db:
+        # The connection handler shares these dicts, so no copy is stale.
+        for alias in ["default", *getattr(settings, "DB_REPLICAS", [])]:
+            settings.DATABASES[alias].update(
+                USER=db["username"], PASSWORD=db["password"]
+            )
+
+    email = changed.get(names.get("email"))
+    if email:
+        settings.EMAIL_HOST_USER = email.get("SMTP_USER", "")
+        settings.EMAIL_HOST_PASSWORD = email.get("SMTP_PASSWORD", "")
+
+    stripe = changed.get(names.get("stripe"))
+    if stripe:
+        settings.STRIPE.update({key: stripe.get(key, "") for key in settings.STRIPE})
@@ -10,10 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import copy
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from config.secrets import get_secret
+from config.secrets import load_secrets
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -32,15 +34,34 @@ if ENVIRONMENT == "local":
 
 # # --- Media files ---
 
+# Media behind a CloudFront distribution, authorized by signed cookies
+# (config.middleware.cdn_cookies), gets stable, browser-cacheable URLs.
+MEDIA_CDN_DOMAIN = os.getenv("MEDIA_CDN_DOMAIN", "")
+MEDIA_CDN_KEY_ID = os.getenv("MEDIA_CDN_KEY_ID", "")
+MEDIA_CDN_PRIVATE_KEY = os.getenv("MEDIA_CDN_PRIVATE_KEY", "")
+MEDIA_CDN_COOKIE_DOMAIN = os.getenv("MEDIA_CDN_COOKIE_DOMAIN") or None
+MEDIA_CDN_COOKIE_SECONDS = 12 * 3600
+# Signed S3 URLs are reused for one bucket and stay valid for one more.
+MEDIA_URL_CACHE_BUCKET_SECONDS = 3600
+
 if ENVIRONMENT in ["production", "development"]:
-    STORAGES = {
-        "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+    if MEDIA_CDN_DOMAIN:
+        # Unsigned URLs on the CDN domain; CDNMediaStorage sets its own
+        # custom_domain and querystring_auth, so don't override them here.
+        media_storage = {
+            "BACKEND": "config.storage.CDNMediaStorage",
+            "OPTIONS": {"bucket_name": os.getenv("AWS_MEDIA_BUCKET_NAME")},
+        }
+    else:
+        media_storage = {
+            "BACKEND": "config.storage.CachedSignedURLS3Storage",
             "OPTIONS": {
                 "bucket_name": os.getenv("AWS_MEDIA_BUCKET_NAME"),
                 "querystring_auth": True,
             },
-        },
+        }
+    STORAGES = {
+        "default": media_storage,
         "staticfiles": {
             "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
         },
@@ -64,12 +85,25 @@ else:
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 
+# Names of the AWS Secrets Manager secrets used below. They're all fetched
+# up front in a single round trip (config.secrets), possibly from an
+# encrypted local cache, and refreshed in the background so rotations are
+# picked up (config.wsgi).
+AWS_SECRET_NAMES = {}
 if ENVIRONMENT in ["production", "development"]:
-    DJANGO_SECRET_KEY_NAME = os.getenv("DJANGO_SECRET_KEY_NAME")
-    DB_SECRETS_NAME = os.getenv("DB_SECRETS_NAME")
+    AWS_SECRET_NAMES = {
+        "django": os.getenv("DJANGO_SECRET_KEY_NAME"),
+        "db": os.getenv("DB_SECRETS_NAME"),
+        "email": os.getenv("EMAIL_SECRETS_NAME"),
+        "stripe": os.getenv("STRIPE_SECRETS_NAME"),
+    }
+    if os.getenv("CI", "false").lower() != "true":
+        AWS_SECRET_NAMES["algolia"] = os.getenv("ALGOLIA_SECRETS_NAME")
+        AWS_SECRET_NAMES["google_maps"] = os.getenv("GOOGLE_MAPS_SECRETS_NAME")
+    aws_secrets = load_secrets(AWS_SECRET_NAMES.values())
 
-    SECRET_KEY = get_secret(DJANGO_SECRET_KEY_NAME)["SECRET_KEY"]
-    secrets = get_secret(DB_SECRETS_NAME)
+    SECRET_KEY = aws_secrets[AWS_SECRET_NAMES["django"]]["SECRET_KEY"]
+    secrets = aws_secrets[AWS_SECRET_NAMES["db"]]
 else:
     SECRET_KEY = "local-secret"
     secrets = {
@@ -80,16 +114,62 @@ else:
         "dbInstanceIdentifier": os.getenv("POSTGRES_DB", "simpletix-local-db"),
         "dbname": os.getenv("POSTGRES_DB_NAME", "simpletix"),
     }
+
+# Connections are kept open for DB_CONN_MAX_AGE seconds instead of paying
+# for a new (TLS) connection per request, and are health-checked before
+# each request reuses them. Behind PgBouncer in transaction mode, set
+# DB_PGBOUNCER so no server-side cursors are used. DB_POOL switches to
+# psycopg's connection pool instead, where psycopg 3 and psycopg_pool
+# are installed. The config.postgres backend records checkout metrics
+# (served on /metrics).
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+DB_POOL = (
+    os.getenv("DB_POOL", "false").lower() == "true"
+    and not DB_PGBOUNCER
+    and importlib.util.find_spec("psycopg_pool") is not None
+)
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "config.postgres",
         "NAME": secrets["dbname"],
         "USER": secrets["username"],
         "PASSWORD": secrets["password"],
         "HOST": secrets["host"],
         "PORT": secrets["port"],
+        # A pool can't be combined with persistent connections.
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_PGBOUNCER,
+        "OPTIONS": {},
     }
 }
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        # Seconds a request may wait for a free connection.
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+# Read replicas ("host[:port],..."), same credentials as the primary.
+# config.db_router sends safe requests' reads there, except for clients
+# that wrote in the last DB_REPLICA_STICKY_SECONDS. Tests use the
+# primary for them (TEST MIRROR).
+DB_REPLICAS = []
+for replica_index, replica in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    replica_host, _, replica_port = replica.strip().partition(":")
+    replica_alias = f"replica{replica_index}"
+    DATABASES[replica_alias] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DB_REPLICAS.append(replica_alias)
+DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 if ENVIRONMENT == "production":
@@ -117,6 +197,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "events",
     "simpletix",
     "ebhealthcheck.apps.EBHealthCheckConfig",
@@ -127,14 +208,28 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.health.HealthCheckMiddleware",
+    "config.timing.RequestTimingMiddleware",
+    "config.querycheck.QueryCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "config.db_router.ReplicaRoutingMiddleware",
+    # Before SessionMiddleware: it picks the cookie the session is read from.
+    "config.middleware.multi_session_middleware.MultiSessionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "config.middleware.multi_session_middleware.MultiSessionMiddleware",
+    "config.middleware.cdn_cookies.CloudFrontCookieMiddleware",
+]
+
+# accounts.profiles.ProfileModelBackend loads users with their profiles.
+# ModelBackend stays listed only so sessions logged in through it before
+# keep working; it can go once they have expired (SESSION_COOKIE_AGE).
+AUTHENTICATION_BACKENDS = [
+    "accounts.profiles.ProfileModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -210,6 +305,25 @@ LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/accounts/start/"
 
 
+# --- Cache and sessions ---
+# Without REDIS_URL each worker has its own in-memory cache. With it, all
+# workers and instances share one, through the `redis` package.
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+# "db", "cached_db" (written to the database, read from the cache) or
+# "cache" (cache only; sessions go when the cache evicts them). The cache
+# backed stores need the shared cache: a per-worker one would serve stale
+# sessions. Expired database rows are deleted by `manage.py purge_sessions`.
+SESSION_STORE = os.getenv("SESSION_STORE", "cached_db" if REDIS_URL else "db")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_STORE}"
+
+
 # --- Algoila Settings ---
 
 if os.getenv("CI", "false").lower() == "true":
@@ -219,15 +333,20 @@ if os.getenv("CI", "false").lower() == "true":
         "API_KEY": "",
         "SEARCH_KEY": "",
         "INDEX_PREFIX": "ci-skip",
+        "AUTO_INDEXING": False,
     }
     ALGOLIA_ENABLED = False
 elif ENVIRONMENT in ["production", "development"]:
-    secrets = get_secret(os.getenv("ALGOLIA_SECRETS_NAME"))
+    secrets = aws_secrets[AWS_SECRET_NAMES["algolia"]]
     ALGOLIA = {
         "APPLICATION_ID": secrets.get("ALGOLIA_APP_ID", ""),
         "API_KEY": secrets.get("ALGOLIA_API_KEY", ""),
         "SEARCH_KEY": secrets.get("ALGOLIA_SEARCH_KEY", ""),
         "INDEX_PREFIX": secrets.get("ALGOLIA_INDEX_PREFIX", "simpletix"),
+        # Index updates go through the outbox (events.signals queues them,
+        # events.search_sync pushes them) instead of algoliasearch_django's
+        # synchronous post_save/pre_delete hooks.
+        "AUTO_INDEXING": False,
     }
     ALGOLIA_ENABLED = True
 else:
@@ -236,8 +355,13 @@ else:
         "API_KEY": os.getenv("ALGOLIA_API_KEY", ""),
         "SEARCH_KEY": os.getenv("ALGOLIA_SEARCH_KEY", ""),
         "INDEX_PREFIX": os.getenv("ALGOLIA_INDEX_PREFIX", "simpletix"),
+        "AUTO_INDEXING": False,
     }
-    ALGOLIA_ENABLED = os.getenv("ALGOLIA_ENABLED", True)
+    ALGOLIA_ENABLED = os.getenv("ALGOLIA_ENABLED", "true").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
 
 
 # --- GOOGLE MAPS SETTINGS ---
@@ -245,8 +369,7 @@ else:
 if os.getenv("CI", "false").lower() == "true":
     GOOGLE_MAPS_API_KEY = ""
 elif ENVIRONMENT in ["production", "development"]:
-    google_secrets_name = os.getenv("GOOGLE_MAPS_SECRETS_NAME")
-    google_secrets = get_secret(google_secrets_name)
+    google_secrets = aws_secrets[AWS_SECRET_NAMES["google_maps"]]
     GOOGLE_MAPS_API_KEY = google_secrets.get("GOOGLE_MAPS_API_KEY", "")
 else:
     GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
@@ -254,13 +377,13 @@ else:
 
 # --- Email / SMTP configuration ---
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = "config.mail.SMTPEmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 
 if ENVIRONMENT in ["production", "development"]:
-    email_secrets = get_secret(os.getenv("EMAIL_SECRETS_NAME"))
+    email_secrets = aws_secrets[AWS_SECRET_NAMES["email"]]
     EMAIL_HOST_USER = email_secrets.get("SMTP_USER", "")
     EMAIL_HOST_PASSWORD = email_secrets.get("SMTP_PASSWORD", "")
 else:
@@ -273,7 +396,7 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER or "noreply@example.com"
 
 # STRIPE CONFIGURATION
 if ENVIRONMENT in ["production", "development"]:
-    secrets = get_secret(os.getenv("STRIPE_SECRETS_NAME"))
+    secrets = aws_secrets[AWS_SECRET_NAMES["stripe"]]
     STRIPE = {
         "STRIPE_PUBLISHABLE_KEY": secrets.get("STRIPE_PUBLISHABLE_KEY", ""),
         "STRIPE_SECRET_KEY": secrets.get("STRIPE_SECRET_KEY", ""),
@@ -285,3 +408,77 @@ else:
         "STRIPE_SECRET_KEY": os.getenv("STRIPE_SECRET_KEY", ""),
         "STRIPE_WEBHOOK_SECRET": os.getenv("STRIPE_WEBHOOK_SECRET", ""),
     }
+# orders.payments: seconds to connect / to wait for an answer, and retries.
+STRIPE_CONNECT_TIMEOUT = 3
+STRIPE_READ_TIMEOUT = 15
+STRIPE_MAX_RETRIES = 2
+# Another Stripe API server, e.g. the local stub: "http://127.0.0.1:12111".
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE", "")
+
+
+# --- Ticket re-send throttling ---
+# Clicks on "re-send tickets" for the same order inside the window are
+# coalesced into one email; the per-order / per-IP caps apply per period.
+TICKET_RESEND_WINDOW_SECONDS = 60
+TICKET_RESEND_THROTTLE_SECONDS = 3600
+TICKET_RESEND_MAX_PER_ORDER = 3
+TICKET_RESEND_MAX_PER_IP = 10
+TICKET_RESEND_PDF_CACHE_SECONDS = 86400
+# Send from a background thread in deployed environments so the request
+# returns immediately; locally and in tests, send inline.
+TICKET_RESEND_ASYNC = ENVIRONMENT in ["production", "development"]
+
+# --- Rate limits (config.ratelimit) ---
+RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+# Override a view's policy by name, e.g. {"login": (limit, period_seconds)}.
+RATELIMITS = {}
+# Proxies appending to X-Forwarded-For: the load balancer and nginx.
+FORWARDED_PROXY_COUNT = int(os.getenv("FORWARDED_PROXY_COUNT", "2"))
+
+# --- Direct uploads (events.uploads) ---
+# Banners/videos are uploaded by the browser straight to S3 with presigned
+# multipart URLs (the bucket's CORS rules must allow PUT and expose ETag).
+# Elsewhere a filesystem stand-in under media/.uploads plays S3's part.
+DIRECT_UPLOAD_BACKEND = (
+    "s3" if ENVIRONMENT in ["production", "development"] else "local"
+)
+DIRECT_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+DIRECT_UPLOAD_MAX_SIZE = {"banner": 20 * 1024 * 1024, "video": 2 * 1024**3}
+DIRECT_UPLOAD_URL_EXPIRY_SECONDS = 3600
+
+# --- Metrics (config.metrics) ---
+# Bearer token for Prometheus scrapes of /metrics (staff sessions work too).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Add a Server-Timing header (total, db, stripe, ...) to every response.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+# --- Health checks (config.health) ---
+# /health/deep/ reuses its probe results this long, and gives each probe
+# this long to answer.
+HEALTH_DEEP_CACHE_SECONDS = 5
+HEALTH_PROBE_TIMEOUT = 2
+# Probes whose failure makes /health/deep/ return 503.
+HEALTH_CRITICAL_PROBES = ("database",)
+
+# --- Signed-in user cache (accounts.profiles) ---
+# Seconds to cache users with their profiles; 0 disables. Needs the
+# shared cache (REDIS_URL).
+PROFILE_CACHE_SECONDS = int(os.getenv("PROFILE_CACHE_SECONDS", "0"))
+
+# --- Query checks (config.querycheck) ---
+# "off", "log" (staging) or "raise" (the test suite, see conftest.py).
+QUERY_CHECKS = os.getenv("QUERY_CHECKS", "off")
+# The same SELECT run this many times in one request is an N+1.
+QUERY_REPEAT_THRESHOLD = 5
+# SELECTs slower than this are logged with their EXPLAIN plan (0: never).
+SLOW_QUERY_EXPLAIN_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_MS", "100"))
+
+# --- JSON API (events.api) ---
+# Lifetime of cached API pages. Changes invalidate them explicitly; this
+# only bounds how long just-started events and signed banner URLs linger.
+EVENT_API_CACHE_SECONDS = 60
+
+# --- Event banner derivatives (events.images) ---
+# Resize uploaded banners on a background thread in deployed environments;
+# locally and in tests, inline after the transaction commits.
+BANNER_DERIVATIVES_ASYNC = ENVIRONMENT in ["production", "development"]
@@ -0,0 +1,88 @@
+# config/storage.py
+"""
+Media storage backends.
+
+CachedSignedURLS3Storage
+    S3 with querystring auth, but `url()` reuses signed URLs. Time is cut
+    into buckets of MEDIA_URL_CACHE_BUCKET_SECONDS. All URLs signed during
+    bucket N expire together at the end of bucket N + 1. A URL is cached
+    under (storage key, bucket) and handed out until bucket N ends, so it
+    is never served with less than one bucket of validity left. Templates
+    stop paying for a SigV4 signature per render, and browsers see the same
+    URL for a whole bucket, so they can cache the image.
+
+CDNMediaStorage
+    Media served through a CloudFront distribution as plain, stable URLs.
+    Access is authorized by CloudFront signed cookies, which
+    config.middleware.cdn_cookies sets, instead of a signature per URL.
+
+Both time their S3 API calls as external_call_seconds{service="s3"}
+(config.timing).
+"""
+
+import hashlib
+import time
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from storages.backends.s3 import S3Storage
+
+from config.timing import record_external
+
+
+def _bucket_seconds():
+    return getattr(settings, "MEDIA_URL_CACHE_BUCKET_SECONDS", 3600)
+
+
+def _s3_call_started(context, **kwargs):
+    context["timing_started"] = perf_counter()
+
+
+def _s3_call_finished(context, **kwargs):
+    started = context.pop("timing_started", None)
+    if started is not None:
+        record_external("s3", perf_counter() - started)
+
+
+class TimedS3Storage(S3Storage):
+    def _create_session(self):
+        session = super()._create_session()
+        # botocore events, first and last of each API call; "after-call-error"
+        # replaces "after-call" when the request itself fails (timeouts,
+        # connection errors).
+        session.events.register("before-parameter-build.s3", _s3_call_started)
+        session.events.register("after-call.s3", _s3_call_finished)
+        session.events.register("after-call-error.s3", _s3_call_finished)
+        return session
+
+
+class CachedSignedURLS3Storage(TimedS3Storage):
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if not self.querystring_auth or parameters or expire or http_method:
+            return super().url(name, parameters, expire, http_method)
+
+        period = _bucket_seconds()
+        now = time.time()
+        bucket = int(now // period)
+        key = "media:url:{}:{}:{}".format(
+            self.bucket_name,
+            bucket,
+            hashlib.md5(name.encode(), usedforsecurity=False).hexdigest(),
+        )
+        url = cache.get(key)
+        if url is None:
+            expires_at = (bucket + 2) * period
+            url = super().url(name, expire=int(expires_at - now))
+            cache.set(key, url, max(int((bucket + 1) * period - now), 1))
+        return url
+
+
+class CDNMediaStorage(TimedS3Storage):
+    """Unsigned, stable URLs on MEDIA_CDN_DOMAIN (see module docstring)."""
+
+    def get_default_settings(self):
+        defaults = super().get_default_settings()
+        defaults["custom_domain"] = settings.MEDIA_CDN_DOMAIN
+        defaults["querystring_auth"] = False
+        return defaults
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from config.postgres.base import CHECKOUT_SECONDS, HEALTH_CHECK_FAILURES, REUSED
+
+
+def _query():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def _next_request():
+    # What Django does between requests (close_old_connections).
+    connection.close_if_unusable_or_obsolete()
+
+
+class ConnectionMetricsTests(TransactionTestCase):
+    def test_settings_keep_connections_and_health_check_them(self):
+        self.assertEqual(connection.vendor, "postgresql")
+        self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+        self.assertTrue(connection.settings_dict["CONN_HEALTH_CHECKS"])
+
+    def test_new_connections_are_timed(self):
+        connection.close()
+        checkouts = CHECKOUT_SECONDS.count(alias="default")
+        _query()
+        _query()
+        self.assertEqual(CHECKOUT_SECONDS.count(alias="default"), checkouts + 1)
+
+    def test_persistent_connection_reuse_is_counted_once_per_request(self):
+        _query()
+        reused = REUSED.value(alias="default")
+        checkouts = CHECKOUT_SECONDS.count(alias="default")
+
+        _next_request()
+        _query()
+        _query()
+
+        self.assertEqual(REUSED.value(alias="default"), reused + 1)
+        self.assertEqual(CHECKOUT_SECONDS.count(alias="default"), checkouts)
+
+    def test_dead_connections_are_replaced(self):
+        _query()
+        failures = HEALTH_CHECK_FAILURES.value(alias="default")
+        checkouts = CHECKOUT_SECONDS.count(alias="default")
+
+        _next_request()
+        with patch.object(connection, "is_usable", return_value=False):
+            _query()
+
+        self.assertEqual(HEALTH_CHECK_FAILURES.value(alias="default"), failures + 1)
+        self.assertEqual(CHECKOUT_SECONDS.count(alias="default"), checkouts + 1)
+
+    @override_settings(METRICS_TOKEN="scrape-me")
+    def test_metrics_endpoint_exports_connection_metrics(self):
+        connection.close()
+        _query()
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.assertEqual(
+            self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong"
+            ).status_code,
+            401,
+        )
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-me"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'db_connection_checkout_seconds_count{alias="default"}',
+            response.content.decode(),
+        )
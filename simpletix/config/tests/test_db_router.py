@@ -0,0 +1,73 @@
+import time
+from unittest.mock import patch
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from config.db_router import STICKY_COOKIE, ReplicaRoutingMiddleware
+from events.models import Event
+
+
+@override_settings(DB_REPLICAS=["replica1"], DB_REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    def run_request(self, method="get", cookies=None, write=False):
+        """Route a read (after a write, optionally) inside a request."""
+        seen = {}
+
+        def view(request):
+            if write:
+                seen["write"] = router.db_for_write(Event)
+            seen["read"] = router.db_for_read(Event)
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies or {})
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_safe_requests_read_from_replicas(self):
+        seen, response = self.run_request()
+        self.assertEqual(seen["read"], "replica1")
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_writes_pin_the_rest_of_the_request_and_the_client(self):
+        seen, response = self.run_request(write=True)
+        self.assertEqual(seen, {"write": "default", "read": "default"})
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 10)
+
+        seen, _ = self.run_request(
+            cookies={STICKY_COOKIE: response.cookies[STICKY_COOKIE].value}
+        )
+        self.assertEqual(seen["read"], "default")
+
+    def test_stickiness_expires(self):
+        seen, _ = self.run_request(cookies={STICKY_COOKIE: str(int(time.time()) - 1)})
+        self.assertEqual(seen["read"], "replica1")
+        seen, _ = self.run_request(cookies={STICKY_COOKIE: "garbage"})
+        self.assertEqual(seen["read"], "replica1")
+
+    def test_unsafe_requests_use_the_primary(self):
+        seen, response = self.run_request(method="post")
+        self.assertEqual(seen["read"], "default")
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_reads_in_transactions_use_the_primary(self):
+        with patch("config.db_router.connections") as fake_connections:
+            fake_connections.__getitem__.return_value.in_atomic_block = True
+            seen, _ = self.run_request()
+        self.assertEqual(seen["read"], "default")
+
+    def test_outside_requests_everything_uses_the_primary(self):
+        self.assertEqual(router.db_for_read(Event), "default")
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(router.allow_migrate("default", "events"))
+        self.assertFalse(router.allow_migrate("replica1", "events"))
+
+    @override_settings(DB_REPLICAS=[])
+    def test_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(lambda request: HttpResponse())
+        self.assertEqual(router.db_for_read(Event), "default")
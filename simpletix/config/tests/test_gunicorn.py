@@ -0,0 +1,81 @@
+import importlib
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from config import gunicorn as gunicorn_config
+from config.metrics import WORKER_REQUESTS, process_rss_bytes, render_metrics
+
+
+class GunicornSettingsTests(SimpleTestCase):
+    def load(self, **env):
+        with patch.dict(os.environ, env), patch(
+            "multiprocessing.cpu_count", return_value=2
+        ):
+            module = importlib.reload(gunicorn_config)
+        self.addCleanup(importlib.reload, gunicorn_config)
+        return module
+
+    def test_defaults(self):
+        config = self.load()
+        self.assertTrue(config.preload_app)
+        self.assertEqual(config.worker_class, "gthread")
+        self.assertEqual((config.workers, config.threads), (3, 4))
+        self.assertEqual(config.wsgi_app, "config.wsgi:application")
+        self.assertEqual(config.max_requests_jitter, 100)
+
+    def test_sync_workers(self):
+        config = self.load(GUNICORN_WORKER_CLASS="sync", GUNICORN_WORKERS="")
+        self.assertEqual((config.worker_class, config.workers), ("sync", 5))
+        self.assertEqual(config.threads, 1)
+
+    def test_uvicorn_serves_asgi(self):
+        config = self.load(GUNICORN_WORKER_CLASS="uvicorn", GUNICORN_WORKERS="2")
+        self.assertEqual(config.worker_class, "uvicorn.workers.UvicornWorker")
+        self.assertEqual(config.wsgi_app, "config.asgi:application")
+        self.assertEqual(config.workers, 2)
+
+
+class GunicornHookTests(SimpleTestCase):
+    def worker(self):
+        return SimpleNamespace(pid=123, alive=True, handled_requests=0)
+
+    def test_warm_imports(self):
+        with patch.object(gunicorn_config.importlib, "import_module") as imported:
+            imported.side_effect = lambda name: None
+            gunicorn_config.when_ready(server=None)
+        imported.assert_any_call("stripe")
+        imported.assert_any_call("qrcode")
+
+    def test_pre_fork_closes_connections(self):
+        with patch("django.db.connections.close_all") as close_all:
+            gunicorn_config.pre_fork(server=None, worker=self.worker())
+        close_all.assert_called_once()
+
+    def test_post_request_counts_and_recycles_on_rss(self):
+        worker = self.worker()
+        before = WORKER_REQUESTS.value()
+        limit = gunicorn_config.max_rss_mb * 1024 * 1024
+        with patch("config.metrics.process_rss_bytes", return_value=limit + 1):
+            for _ in range(gunicorn_config.RSS_CHECK_EVERY - 1):
+                gunicorn_config.post_request(worker, None, {}, None)
+            self.assertTrue(worker.alive)
+            gunicorn_config.post_request(worker, None, {}, None)
+
+        self.assertFalse(worker.alive)
+        self.assertEqual(
+            WORKER_REQUESTS.value() - before, gunicorn_config.RSS_CHECK_EVERY
+        )
+
+    def test_worker_under_the_limit_keeps_running(self):
+        worker = self.worker()
+        worker.handled_requests = gunicorn_config.RSS_CHECK_EVERY - 1
+        with patch("config.metrics.process_rss_bytes", return_value=1024):
+            gunicorn_config.post_request(worker, None, {}, None)
+        self.assertTrue(worker.alive)
+
+    def test_process_metrics(self):
+        self.assertGreater(process_rss_bytes(), 0)
+        self.assertIn("process_resident_memory_bytes ", render_metrics())
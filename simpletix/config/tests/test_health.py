@@ -1,9 +1,92 @@
-from django.test import TestCase
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
+from config import health
+
 
 class HealthCheckTests(TestCase):
     def test_health_check_returns_ok(self):
         response = self.client.get(reverse("health_check"))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content.decode(), "OK")
+
+    def test_fast_path_skips_the_middleware_stack(self):
+        self.client.cookies["sessionid"] = "anything"
+        with self.assertNumQueries(0):
+            response = self.client.get("/health")
+        self.assertEqual(response.status_code, 200)
+        # No session, CSRF or timing middleware ran.
+        self.assertNotIn("Vary", response)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(dict(response.cookies), {})
+
+
+class DeepHealthCheckTests(TestCase):
+    def setUp(self):
+        health._cached.update(expires=0.0, result=None)
+        self.addCleanup(health._cached.update, expires=0.0, result=None)
+
+    def probes(self, **overrides):
+        patcher = patch.dict(health.PROBES, overrides)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_all_probes_pass(self):
+        response = self.client.get(reverse("health_deep"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        data = response.json()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["checks"]["database"]["status"], "ok")
+        self.assertEqual(data["checks"]["storage"]["status"], "ok")
+        # The test email backend isn't SMTP.
+        self.assertEqual(data["checks"]["smtp"]["status"], "skipped")
+
+    def test_results_are_reused(self):
+        with patch.object(health, "run_probes", wraps=health.run_probes) as run:
+            self.client.get("/health/deep")
+            self.client.get("/health/deep/")
+        run.assert_called_once()
+
+    def test_database_failure_is_critical(self):
+        def broken():
+            raise OSError("connection refused")
+
+        self.probes(database=broken)
+        response = self.client.get(reverse("health_deep"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json()["checks"]["database"]["status"], "error: OSError"
+        )
+
+    def test_other_failures_only_degrade(self):
+        def broken():
+            raise OSError("bucket unreachable")
+
+        self.probes(storage=broken)
+        response = self.client.get(reverse("health_deep"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "degraded")
+
+    @override_settings(HEALTH_PROBE_TIMEOUT=0.05)
+    def test_slow_probes_time_out(self):
+        self.probes(database=lambda: time.sleep(0.5))
+        started = time.monotonic()
+        response = self.client.get(reverse("health_deep"))
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json()["checks"]["database"]["status"], "error: timeout"
+        )
+
+    @override_settings(EMAIL_BACKEND="config.mail.SMTPEmailBackend")
+    def test_smtp_probe_connects_without_logging_in(self):
+        with patch("config.health.smtplib.SMTP") as smtp:
+            self.assertEqual(health.probe_smtp(), None)
+        server = smtp.return_value
+        server.noop.assert_called_once()
+        server.login.assert_not_called()
+        server.quit.assert_called_once()
@@ -0,0 +1,158 @@
+import base64
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from config.middleware.cdn_cookies import EXPIRY_COOKIE, CloudFrontCookieMiddleware
+from config.storage import CachedSignedURLS3Storage, CDNMediaStorage
+
+S3_OPTIONS = {
+    "bucket_name": "media-bucket",
+    "access_key": "AKIATEST",
+    "secret_key": "secret",
+    "region_name": "us-east-1",
+    "signature_version": "s3v4",
+    "querystring_auth": True,
+}
+
+
+@override_settings(MEDIA_URL_CACHE_BUCKET_SECONDS=3600)
+class CachedSignedURLTests(SimpleTestCase):
+    def setUp(self):
+        self.storage = CachedSignedURLS3Storage(**S3_OPTIONS)
+
+    def test_url_is_reused_within_a_bucket(self):
+        with patch("config.storage.time.time", return_value=7200 * 1000 + 10):
+            first = self.storage.url("banners/a.jpg")
+        with patch("config.storage.time.time", return_value=7200 * 1000 + 3000):
+            again = self.storage.url("banners/a.jpg")
+            other = self.storage.url("banners/b.jpg")
+
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+        self.assertIn("X-Amz-Signature", first)
+
+    def test_url_keeps_at_least_one_bucket_of_validity(self):
+        now = 3600 * 2000 + 600
+        with patch("config.storage.time.time", return_value=now):
+            url = self.storage.url("banners/a.jpg")
+        expires = int(parse_qs(urlparse(url).query)["X-Amz-Expires"][0])
+        # Signed 10 minutes into a bucket, valid to the end of the next one.
+        self.assertEqual(expires, 2 * 3600 - 600)
+
+    def test_new_bucket_gets_a_fresh_url(self):
+        with patch("config.storage.time.time", return_value=3600 * 2000):
+            first = self.storage.url("banners/a.jpg")
+        with patch("config.storage.time.time", return_value=3600 * 2001 + 100):
+            second = self.storage.url("banners/a.jpg")
+        self.assertNotEqual(first, second)
+
+    def test_explicit_expiry_bypasses_the_cache(self):
+        url = self.storage.url("banners/a.jpg", expire=60)
+        self.assertEqual(parse_qs(urlparse(url).query)["X-Amz-Expires"], ["60"])
+
+
+@override_settings(MEDIA_CDN_DOMAIN="media.example.com")
+class CDNMediaStorageTests(SimpleTestCase):
+    def test_urls_are_plain_and_stable(self):
+        storage = CDNMediaStorage(bucket_name="media-bucket")
+        self.assertEqual(
+            storage.url("banners/a b.jpg"),
+            "https://media.example.com/banners/a%20b.jpg",
+        )
+
+    def test_urls_are_unsigned_even_with_credentials(self):
+        options = {k: v for k, v in S3_OPTIONS.items() if k != "querystring_auth"}
+        url = CDNMediaStorage(**options).url("banners/a.jpg")
+        self.assertEqual(url, "https://media.example.com/banners/a.jpg")
+
+
+def _pem_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return key, pem
+
+
+def _cloudfront_b64decode(value):
+    return base64.b64decode(value.replace("-", "+").replace("_", "=").replace("~", "/"))
+
+
+class CloudFrontCookieMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.key, pem = _pem_key()
+        override = override_settings(
+            MEDIA_CDN_DOMAIN="media.example.com",
+            MEDIA_CDN_KEY_ID="K2JCJMDEHXQW5F",
+            MEDIA_CDN_PRIVATE_KEY=pem,
+            MEDIA_CDN_COOKIE_DOMAIN=".example.com",
+            MEDIA_CDN_COOKIE_SECONDS=3600,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.middleware = CloudFrontCookieMiddleware(lambda request: HttpResponse())
+
+    def test_sets_verifiable_signed_cookies(self):
+        response = self.middleware(RequestFactory().get("/"))
+
+        policy = _cloudfront_b64decode(response.cookies["CloudFront-Policy"].value)
+        signature = _cloudfront_b64decode(
+            response.cookies["CloudFront-Signature"].value
+        )
+        self.key.public_key().verify(
+            signature, policy, padding.PKCS1v15(), hashes.SHA1()
+        )
+        statement = json.loads(policy)["Statement"][0]
+        self.assertEqual(statement["Resource"], "https://media.example.com/*")
+        self.assertEqual(
+            response.cookies["CloudFront-Key-Pair-Id"].value, "K2JCJMDEHXQW5F"
+        )
+        self.assertEqual(
+            response.cookies["CloudFront-Policy"]["domain"], ".example.com"
+        )
+        self.assertTrue(response.cookies["CloudFront-Policy"]["httponly"])
+
+    def test_fresh_cookies_are_not_resigned(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[EXPIRY_COOKIE] = str(int(time.time()) + 3000)
+        response = self.middleware(request)
+        self.assertNotIn("CloudFront-Policy", response.cookies)
+
+    def test_cookies_close_to_expiry_are_refreshed(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[EXPIRY_COOKIE] = str(int(time.time()) + 300)
+        response = self.middleware(request)
+        self.assertIn("CloudFront-Policy", response.cookies)
+
+    def test_only_private_html_pages_get_cookies(self):
+        def respond(**kwargs):
+            middleware = CloudFrontCookieMiddleware(
+                lambda request: HttpResponse(**kwargs)
+            )
+            return middleware(RequestFactory().get("/"))
+
+        page = respond(headers={"Cache-Control": "private, no-cache"})
+        self.assertIn("CloudFront-Policy", page.cookies)
+        for response in (
+            respond(content_type="application/json"),
+            respond(headers={"Cache-Control": "public, max-age=60"}),
+            respond(headers={"Cache-Control": "max-age=0, s-maxage=300"}),
+            respond(status=304),
+            respond(status=302),
+        ):
+            self.assertNotIn("CloudFront-Policy", response.cookies)
+
+    @override_settings(MEDIA_CDN_DOMAIN="")
+    def test_unused_without_a_cdn(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            CloudFrontCookieMiddleware(lambda request: HttpResponse())
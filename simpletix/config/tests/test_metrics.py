@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from config import metrics
+from config.metrics import Counter, Histogram, render_metrics
+
+
+class MetricTypesTests(SimpleTestCase):
+    def make(self, cls, *args, **kwargs):
+        metric = cls(*args, **kwargs)
+        self.addCleanup(metrics._registry.remove, metric)
+        return metric
+
+    def test_counter(self):
+        counter = self.make(Counter, "test_things_total", "Things.", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind='b"x')
+
+        self.assertEqual(counter.value(kind="a"), 1)
+        self.assertEqual(
+            counter.render(),
+            [
+                "# HELP test_things_total Things.",
+                "# TYPE test_things_total counter",
+                'test_things_total{kind="a"} 1',
+                'test_things_total{kind="b\\"x"} 2',
+            ],
+        )
+        with self.assertRaises(ValueError):
+            counter.inc(other="a")
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.make(
+            Histogram, "test_latency_seconds", "Latency.", buckets=(0.1, 1)
+        )
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count(), 4)
+        lines = histogram.render()
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("test_latency_seconds_sum 3.65", lines)
+        self.assertIn("test_latency_seconds_count 4", lines)
+
+    def test_collectors_are_rendered(self):
+        metrics.register_collector(lambda: ["test_gauge 7"])
+        self.addCleanup(metrics._collectors.pop)
+        self.assertIn("test_gauge 7\n", render_metrics())
+
+
+class MetricsViewTests(TestCase):
+    def test_staff_sessions_may_scrape(self):
+        User.objects.create_user(username="ops", password="pass123", is_staff=True)
+        self.client.login(username="ops", password="pass123")
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    def test_other_users_may_not(self):
+        User.objects.create_user(username="someone", password="pass123")
+        self.client.login(username="someone", password="pass123")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
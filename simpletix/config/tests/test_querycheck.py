@@ -0,0 +1,76 @@
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+
+from config.querycheck import QueryCheckFailed, query_budget, query_shape
+from events.models import Event
+
+
+def n_plus_one(request):
+    for event_id in range(6):
+        Event.objects.filter(id=event_id).first()
+    return HttpResponse("OK")
+
+
+@query_budget(1)
+def over_budget(request):
+    Event.objects.count()
+    Event.objects.exists()
+    return HttpResponse("OK")
+
+
+@query_budget(1)
+def within_budget(request):
+    Event.objects.count()
+    return HttpResponse("OK")
+
+
+urlpatterns = [
+    path("n-plus-one/", n_plus_one),
+    path("over-budget/", over_budget),
+    path("within-budget/", within_budget),
+]
+
+
+class QueryShapeTests(SimpleTestCase):
+    def test_in_lists_and_whitespace_are_collapsed(self):
+        self.assertEqual(
+            query_shape('SELECT *\n  FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            'SELECT * FROM "t" WHERE "id" IN (...)',
+        )
+        self.assertEqual(
+            query_shape('SELECT * FROM "t" WHERE "id" IN (%s)'),
+            'SELECT * FROM "t" WHERE "id" IN (...)',
+        )
+
+
+@override_settings(ROOT_URLCONF=__name__, QUERY_CHECKS="raise")
+class QueryCheckMiddlewareTests(TestCase):
+    def test_repeated_queries_fail(self):
+        with self.assertRaisesMessage(QueryCheckFailed, '6 x SELECT "events_event"'):
+            self.client.get("/n-plus-one/")
+
+    def test_budget_overrun_fails(self):
+        with self.assertRaisesMessage(QueryCheckFailed, "2 queries, budget is 1"):
+            self.client.get("/over-budget/")
+
+    def test_within_budget(self):
+        self.assertEqual(self.client.get("/within-budget/").status_code, 200)
+
+    @override_settings(QUERY_CHECKS="log")
+    def test_log_mode_only_warns(self):
+        with self.assertLogs("config.querycheck", "WARNING") as logs:
+            response = self.client.get("/over-budget/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("budget is 1", logs.output[0])
+
+    @override_settings(SLOW_QUERY_EXPLAIN_MS=0.001)
+    def test_slow_queries_are_explained(self):
+        with self.assertLogs("config.querycheck", "WARNING") as logs:
+            self.client.get("/within-budget/")
+        self.assertIn("Slow query", logs.output[0])
+        self.assertIn("cost=", logs.output[0])
+
+    @override_settings(QUERY_CHECKS="off")
+    def test_off(self):
+        self.assertEqual(self.client.get("/n-plus-one/").status_code, 200)
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.checks import run_checks
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from config import ratelimit
+from config.ratelimit import REJECTED, client_ip, hit
+
+
+class HitTests(SimpleTestCase):
+    def hit_at(self, now, key="k", limit=3, period=60):
+        with patch("config.ratelimit.time.time", return_value=now):
+            return hit(key, limit, period)
+
+    def test_allows_up_to_the_limit(self):
+        self.assertEqual([self.hit_at(6000 + i) for i in range(4)], [0, 0, 0, 87])
+        self.assertEqual(self.hit_at(6001, key="other"), 0)
+
+    def test_previous_window_slides_out(self):
+        for _ in range(3):
+            self.hit_at(6030)
+        # Next window, 15s in: 3 * 0.75 + 1 > 3; retry in 25s ...
+        self.assertEqual(self.hit_at(6075), 25)
+        # ... when 3 * (20/60) + 2 <= 3.
+        self.assertEqual(self.hit_at(6100), 0)
+
+    def test_client_ip_skips_forged_forwarded_entries(self):
+        factory = RequestFactory()
+        request = factory.get(
+            "/", HTTP_X_FORWARDED_FOR="1.1.1.1, 203.0.113.7, 10.0.0.1"
+        )
+        self.assertEqual(client_ip(request), "203.0.113.7")
+        with self.settings(FORWARDED_PROXY_COUNT=1):
+            self.assertEqual(client_ip(request), "10.0.0.1")
+        request = factory.get("/", HTTP_X_FORWARDED_FOR="203.0.113.7")
+        self.assertEqual(client_ip(request), "203.0.113.7")
+        self.assertEqual(client_ip(factory.get("/")), "127.0.0.1")
+
+
+class RateLimitedViewTests(TestCase):
+    def test_login_is_limited_per_username_across_addresses(self):
+        User.objects.create_user(username="target", password="Passw0rd1!")
+        url = reverse("accounts:login")
+        with self.settings(RATELIMITS={"login_username": (2, 900)}):
+            for index in range(2):
+                response = self.client.post(
+                    url,
+                    {"username": "Target", "password": "wrong"},
+                    REMOTE_ADDR=f"198.51.100.{index}",
+                )
+                self.assertEqual(response.status_code, 200)
+            before = REJECTED.value(policy="login_username")
+            with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.encode") as h:
+                response = self.client.post(
+                    url,
+                    {"username": "target", "password": "Passw0rd1!"},
+                    REMOTE_ADDR="198.51.100.9",
+                )
+            h.assert_not_called()
+            self.assertEqual(response.status_code, 429)
+            self.assertGreater(int(response["Retry-After"]), 0)
+            self.assertEqual(REJECTED.value(policy="login_username"), before + 1)
+            # Showing the form isn't counted.
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(RATELIMITS={"order": (1, 600)})
+    def test_order_is_refused_before_any_query(self):
+        url = reverse("orders:order", args=[1])
+        self.client.post(url, {})
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Content-Type"], "text/plain")
+
+    @override_settings(RATELIMITS={"payment_confirm": (1, 600)})
+    def test_payment_confirm_answers_in_json(self):
+        url = reverse("tickets:payment_confirm")
+        self.client.post(url, "{}", content_type="application/json")
+        response = self.client.post(url, "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("error", response.json())
+
+    @override_settings(RATELIMITS={"public_json": (2, 60)})
+    def test_public_json_endpoints_share_a_policy(self):
+        self.client.get(reverse("api_v1:event_list"))
+        self.client.get(reverse("events:event_search"), {"q": "x"})
+        response = self.client.get(reverse("events:event_nearby"))
+        self.assertEqual(response.status_code, 429)
+        # Limits are per client.
+        response = self.client.get(
+            reverse("api_v1:event_list"), REMOTE_ADDR="198.51.100.1"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATELIMITS={"ticket_resend": (0, 60)})
+    def test_resend_and_kill_switch(self):
+        url = reverse("tickets:ticket_resend", args=["order-x"])
+        self.assertEqual(self.client.post(url).status_code, 429)
+        with self.settings(RATELIMIT_ENABLED=False):
+            self.assertEqual(self.client.post(url).status_code, 302)
+
+    def test_user_key_counts_signed_in_users_by_id(self):
+        request = RequestFactory().get("/")
+        request.user = User(pk=7)
+        self.assertEqual(ratelimit._key_value("user", request), "user:7")
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_deployed_limits_need_the_shared_cache(self):
+        locmem = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with self.settings(ENVIRONMENT="production", CACHES=locmem):
+            [warning] = run_checks(tags=["caches"])
+            self.assertEqual(warning.id, "ratelimit.W001")
+            with self.settings(RATELIMIT_ENABLED=False):
+                self.assertEqual(run_checks(tags=["caches"]), [])
+        with self.settings(ENVIRONMENT="production", CACHES=redis):
+            self.assertEqual(run_checks(tags=["caches"]), [])
+        with self.settings(ENVIRONMENT="local", CACHES=locmem):
+            self.assertEqual(run_checks(tags=["caches"]), [])
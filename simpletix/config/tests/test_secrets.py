@@ -1,10 +1,60 @@
 import json
-from django.test import SimpleTestCase
+import os
+import tempfile
+import threading
+import time
+from django.test import SimpleTestCase, override_settings
 from unittest.mock import patch, MagicMock
-from config.secrets import get_secret
 
+from botocore.exceptions import ClientError
+from cryptography.fernet import Fernet
 
-class GetSecretTests(SimpleTestCase):
+from config import secrets as secrets_module
+from config.secrets import (
+    apply_rotated_secrets,
+    get_secret,
+    load_secrets,
+    refresh_secrets,
+    start_refresh,
+    stop_refresh,
+)
+
+
+class SecretsTestCase(SimpleTestCase):
+    def setUp(self):
+        secrets_module.get_client.cache_clear()
+        secrets_module._loaded.clear()
+        secrets_module._current.clear()
+        self.addCleanup(secrets_module.get_client.cache_clear)
+        self.addCleanup(secrets_module._loaded.clear)
+        self.addCleanup(secrets_module._current.clear)
+        self.addCleanup(stop_refresh)
+
+    def fake_client(self, values):
+        """A client whose batch call returns `values` ({name: dict})."""
+        client = MagicMock()
+        client.batch_get_secret_value.side_effect = lambda SecretIdList: {
+            "SecretValues": [
+                {
+                    "Name": name,
+                    "ARN": f"arn:aws:secretsmanager:us-east-1:1:secret:{name}",
+                    "SecretString": json.dumps(values[name]),
+                }
+                for name in SecretIdList
+                if name in values
+            ],
+            "Errors": [],
+        }
+        client.get_secret_value.side_effect = lambda SecretId: {
+            "SecretString": json.dumps(values[SecretId])
+        }
+        patcher = patch.object(secrets_module, "get_client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client
+
+
+class GetSecretTests(SecretsTestCase):
     @patch("config.secrets.boto3.session.Session")
     def test_get_secret_returns_parsed_secret(self, fake_boto3_session):
         mock_client = MagicMock()
@@ -23,3 +73,143 @@ class GetSecretTests(SimpleTestCase):
             service_name="secretsmanager", region_name="us-east-1"
         )
         mock_client.get_secret_value.assert_called_once_with(SecretId="fake-secret")
+
+    @patch("config.secrets.boto3.session.Session")
+    def test_client_is_shared(self, fake_boto3_session):
+        client = fake_boto3_session.return_value.client.return_value
+        client.get_secret_value.return_value = {"SecretString": "{}"}
+        get_secret("a")
+        get_secret("b")
+        fake_boto3_session.assert_called_once()
+
+
+class LoadSecretsTests(SecretsTestCase):
+    def test_one_batch_call_for_all_names(self):
+        client = self.fake_client({"db": {"password": "p"}, "stripe": {"k": "s"}})
+
+        result = load_secrets(["db", "stripe", None, "db"])
+
+        self.assertEqual(result, {"db": {"password": "p"}, "stripe": {"k": "s"}})
+        client.batch_get_secret_value.assert_called_once_with(
+            SecretIdList=["db", "stripe"]
+        )
+        client.get_secret_value.assert_not_called()
+
+    def test_arns_are_matched(self):
+        arn = "arn:aws:secretsmanager:us-east-1:1:secret:db"
+        client = self.fake_client({"db": {"password": "p"}})
+        client.batch_get_secret_value.side_effect = None
+        client.batch_get_secret_value.return_value = {
+            "SecretValues": [{"Name": "db", "ARN": arn, "SecretString": "{}"}]
+        }
+        self.assertEqual(load_secrets([arn]), {arn: {}})
+
+    def test_falls_back_to_parallel_single_fetches(self):
+        client = self.fake_client({"db": {"password": "p"}, "stripe": {"k": "s"}})
+        client.batch_get_secret_value.side_effect = ClientError(
+            {"Error": {"Code": "AccessDeniedException"}}, "BatchGetSecretValue"
+        )
+
+        result = load_secrets(["db", "stripe"])
+
+        self.assertEqual(result, {"db": {"password": "p"}, "stripe": {"k": "s"}})
+        self.assertEqual(client.get_secret_value.call_count, 2)
+
+    def test_names_missing_from_the_batch_are_fetched_singly(self):
+        client = self.fake_client({"db": {"password": "p"}})
+        client.get_secret_value.side_effect = ClientError(
+            {"Error": {"Code": "ResourceNotFoundException"}}, "GetSecretValue"
+        )
+        with self.assertRaises(ClientError):
+            load_secrets(["db", "missing"])
+        client.get_secret_value.assert_called_once_with(SecretId="missing")
+
+
+class EncryptedCacheTests(SecretsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "secrets.bin")
+        self.key = Fernet.generate_key()
+        env = patch.dict(
+            os.environ,
+            {
+                "SECRETS_CACHE_FILE": self.path,
+                "SECRETS_CACHE_KEY": self.key.decode(),
+                "SECRETS_CACHE_TTL": "300",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_second_load_reads_the_encrypted_file(self):
+        client = self.fake_client({"db": {"password": "hunter2"}})
+        load_secrets(["db"])
+
+        with open(self.path, "rb") as fh:
+            self.assertNotIn(b"hunter2", fh.read())
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+        self.assertEqual(load_secrets(["db"]), {"db": {"password": "hunter2"}})
+        client.batch_get_secret_value.assert_called_once()
+
+    def test_expired_or_incomplete_cache_is_refetched(self):
+        client = self.fake_client({"db": {"password": "new"}, "stripe": {}})
+        token = Fernet(self.key).encrypt_at_time(
+            json.dumps({"db": {"password": "old"}}).encode(), int(time.time()) - 600
+        )
+        with open(self.path, "wb") as fh:
+            fh.write(token)
+
+        self.assertEqual(load_secrets(["db"]), {"db": {"password": "new"}})
+        load_secrets(["db", "stripe"])
+        self.assertEqual(client.batch_get_secret_value.call_count, 2)
+
+
+class RefreshTests(SecretsTestCase):
+    def test_refresh_reports_only_rotated_secrets(self):
+        values = {"db": {"password": "one"}, "stripe": {"k": "s"}}
+        self.fake_client(values)
+        load_secrets(["db", "stripe"])
+        self.assertEqual(refresh_secrets(), {})
+
+        values["db"] = {"password": "two"}
+        self.assertEqual(refresh_secrets(), {"db": {"password": "two"}})
+        self.assertEqual(refresh_secrets(), {})
+
+    def test_background_thread_delivers_rotations(self):
+        values = {"db": {"password": "one"}}
+        self.fake_client(values)
+        load_secrets(["db"])
+        values["db"] = {"password": "two"}
+
+        received = threading.Event()
+        thread = start_refresh(lambda changed: received.set(), interval=0.01)
+        self.assertIs(start_refresh(lambda changed: None, interval=0.01), thread)
+        self.assertTrue(received.wait(5))
+
+    def test_disabled_without_loaded_secrets(self):
+        self.assertIsNone(start_refresh(lambda changed: None, interval=1))
+
+    @override_settings(
+        AWS_SECRET_NAMES={"email": "email-secret", "stripe": "stripe-secret"},
+        EMAIL_HOST_USER="old@example.com",
+        EMAIL_HOST_PASSWORD="old",
+        STRIPE={"STRIPE_SECRET_KEY": "sk_old", "STRIPE_PUBLISHABLE_KEY": "pk"},
+    )
+    def test_apply_rotated_secrets(self):
+        from django.conf import settings
+
+        apply_rotated_secrets(
+            {
+                "email-secret": {"SMTP_USER": "new@example.com", "SMTP_PASSWORD": "x"},
+                "stripe-secret": {
+                    "STRIPE_SECRET_KEY": "sk_new",
+                    "STRIPE_PUBLISHABLE_KEY": "pk",
+                },
+            }
+        )
+        self.assertEqual(settings.EMAIL_HOST_USER, "new@example.com")
+        self.assertEqual(settings.EMAIL_HOST_PASSWORD, "x")
+        self.assertEqual(settings.STRIPE["STRIPE_SECRET_KEY"], "sk_new")
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+STORES = ("db", "cached_db", "cache")
+
+
+class SessionSlotTests(TestCase):
+    def pick(self, role, slot=None):
+        url = reverse("accounts:pick_role", args=[role])
+        return self.client.get(url, {"sid": slot} if slot else {})
+
+    def test_slots_keep_separate_sessions_in_every_store(self):
+        for store in STORES:
+            engine = f"django.contrib.sessions.backends.{store}"
+            with self.subTest(store=store), override_settings(SESSION_ENGINE=engine):
+                self.client.cookies.clear()
+                self.pick("organizer", slot="org")
+                self.pick("attendee", slot="att")
+
+                cookies = self.client.cookies
+                self.assertIn("sessionid_org", cookies)
+                self.assertIn("sessionid_att", cookies)
+                # The slots never touch the browser's own session cookie.
+                self.assertNotIn("sessionid", cookies)
+                self.assertNotEqual(
+                    cookies["sessionid_org"].value, cookies["sessionid_att"].value
+                )
+
+                # Each slot reads its own session back.
+                url = reverse("events:event_list")
+                for slot, role in (("org", "organizer"), ("att", "attendee")):
+                    response = self.client.get(url, {"sid": slot})
+                    self.assertEqual(
+                        response.wsgi_request.session["desired_role"], role
+                    )
+
+    def test_slot_login_is_kept_apart_from_the_main_session(self):
+        User.objects.create_user(username="slotted", password="Passw0rd1!")
+        self.client.post(
+            reverse("accounts:login") + "?sid=org",
+            {"username": "slotted", "password": "Passw0rd1!"},
+        )
+        self.assertIn("sessionid_org", self.client.cookies)
+        self.assertNotIn("sessionid", self.client.cookies)
+
+        main = self.client.get(reverse("events:event_list"))
+        self.assertFalse(main.wsgi_request.user.is_authenticated)
+        slotted = self.client.get(reverse("events:event_list"), {"sid": "org"})
+        self.assertTrue(slotted.wsgi_request.user.is_authenticated)
+        slotted = self.client.get(
+            reverse("events:event_list"), HTTP_X_SESSION_SLOT="org"
+        )
+        self.assertTrue(slotted.wsgi_request.user.is_authenticated)
+
+    def test_slot_logout_only_ends_the_slot_session(self):
+        User.objects.create_user(username="slotted", password="Passw0rd1!")
+        for slot in ("org", "att"):
+            self.client.post(
+                reverse("accounts:login") + f"?sid={slot}",
+                {"username": "slotted", "password": "Passw0rd1!"},
+            )
+
+        response = self.client.get(reverse("accounts:logout"), {"sid": "org"})
+        self.assertNotIn("sessionid", response.cookies)
+
+        url = reverse("events:event_list")
+        org = self.client.get(url, {"sid": "org"})
+        self.assertFalse(org.wsgi_request.user.is_authenticated)
+        att = self.client.get(url, {"sid": "att"})
+        self.assertTrue(att.wsgi_request.user.is_authenticated)
+
+    def test_unusable_slot_names_are_ignored(self):
+        self.pick("organizer", slot="a b;c")
+        self.assertIn("sessionid", self.client.cookies)
+        self.assertEqual(
+            [name for name in self.client.cookies if name.startswith("sessionid_")],
+            [],
+        )
+
+
+class SessionCommandTests(TestCase):
+    def make_sessions(self, count, expire_date):
+        Session.objects.bulk_create(
+            Session(
+                session_key=f"{expire_date:%s}{i:08d}",
+                session_data="",
+                expire_date=expire_date,
+            )
+            for i in range(count)
+        )
+
+    def test_purge_deletes_only_expired_sessions_in_batches(self):
+        self.make_sessions(5, timezone.now() - timedelta(days=1))
+        self.make_sessions(2, timezone.now() + timedelta(days=1))
+
+        out = StringIO()
+        with self.assertNumQueries(6):  # 3 batches of SELECT + DELETE
+            call_command("purge_sessions", batch_size=2, pause=0, stdout=out)
+
+        self.assertIn("deleted 5 expired sessions", out.getvalue())
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertFalse(
+            Session.objects.filter(expire_date__lt=timezone.now()).exists()
+        )
+
+    def test_benchmark_command_runs(self):
+        out = StringIO()
+        call_command("benchmark_sessions", clients=2, requests=3, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split(":")[0] for line in lines], list(STORES))
+        self.assertIn("0.00 reads, 0.00 writes", lines[-1])
+        self.assertEqual(Session.objects.count(), 0)
@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+from botocore.stub import Stubber
+from django.core import mail
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from config import timing
+from config.mail import SMTPEmailBackend
+from config.metrics import render_metrics
+from config.storage import CachedSignedURLS3Storage
+from config.timing import (
+    EXTERNAL_SECONDS,
+    REQUEST_DB_QUERIES,
+    REQUEST_SECONDS,
+    RESPONSES,
+    external_call,
+)
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    def test_records_view_metrics_and_server_timing(self):
+        before = REQUEST_SECONDS.count(view="events:event_list")
+
+        response = self.client.get(reverse("events:event_list"))
+
+        self.assertEqual(REQUEST_SECONDS.count(view="events:event_list"), before + 1)
+        self.assertGreaterEqual(
+            RESPONSES.value(view="events:event_list", status="2xx"), 1
+        )
+        header = response["Server-Timing"]
+        self.assertRegex(
+            header, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$'
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="events:event_list"',
+            render_metrics(),
+        )
+
+    def test_counts_queries(self):
+        before = REQUEST_DB_QUERIES.count(view="events:event_list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("events:event_list"))
+
+        self.assertIn(f'desc="{len(queries)} queries"', response["Server-Timing"])
+        self.assertEqual(REQUEST_DB_QUERIES.count(view="events:event_list"), before + 1)
+
+    def test_unmatched_urls_share_one_label(self):
+        before = REQUEST_SECONDS.count(view="unmatched")
+        self.client.get("/no/such/page/12345/")
+        self.client.get("/no/such/page/67890/")
+        self.assertEqual(REQUEST_SECONDS.count(view="unmatched"), before + 2)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_can_be_disabled(self):
+        response = self.client.get(reverse("health_check"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class ExternalCallTests(SimpleTestCase):
+    def test_external_calls_are_timed(self):
+        before = EXTERNAL_SECONDS.count(service="stripe")
+        with self.assertRaises(RuntimeError):
+            with external_call("stripe"):
+                raise RuntimeError("timed even when it fails")
+        self.assertEqual(EXTERNAL_SECONDS.count(service="stripe"), before + 1)
+
+    def test_included_in_server_timing(self):
+        timings = timing.RequestTimings()
+        timings.external = {"stripe": 0.25, "s3": 0.01}
+        self.assertEqual(
+            timing.server_timing(0.5, timings),
+            'total;dur=500.0, db;dur=0.0;desc="0 queries", s3;dur=10.0, '
+            "stripe;dur=250.0",
+        )
+
+    def test_smtp_backend(self):
+        before = EXTERNAL_SECONDS.count(service="smtp")
+        with patch(
+            "django.core.mail.backends.smtp.EmailBackend.send_messages",
+            return_value=1,
+        ) as send:
+            sent = SMTPEmailBackend().send_messages([mail.EmailMessage("Hi")])
+        self.assertEqual(sent, 1)
+        send.assert_called_once()
+        self.assertEqual(EXTERNAL_SECONDS.count(service="smtp"), before + 1)
+
+    def test_s3_calls(self):
+        storage = CachedSignedURLS3Storage(
+            bucket_name="media",
+            access_key="key",
+            secret_key="secret",
+            region_name="us-east-1",
+        )
+        client = storage.connection.meta.client
+        before = EXTERNAL_SECONDS.count(service="s3")
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "head_object", {}, {"Bucket": "media", "Key": "photo.jpg"}
+            )
+            self.assertTrue(storage.exists("photo.jpg"))
+        self.assertEqual(EXTERNAL_SECONDS.count(service="s3"), before + 1)
@@ -20,17 +20,21 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
-from config.health import health_check
+from config.health import deep_health_check, health_check
+from config.metrics import metrics_view
 from simpletix.views import permission_denied_view
 
 urlpatterns = [
     path("", include("simpletix.urls")),
     path("health/", health_check, name="health_check"),
+    path("health/deep/", deep_health_check, name="health_deep"),
+    path("metrics", metrics_view, name="metrics"),
     path("admin/", admin.site.urls),
     path("events/", include(("events.urls", "events"), namespace="events")),
     path("accounts/", include(("accounts.urls", "accounts"), namespace="accounts")),
     path("tickets/", include(("tickets.urls", "tickets"), namespace="tickets")),
     path("orders/", include(("orders.urls", "orders"), namespace="orders")),
+    path("api/v1/", include(("events.api_urls", "api_v1"), namespace="api_v1")),
 ]
 
 handler403 = permission_denied_view
@@ -10,6 +10,12 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 import os
 from django.core.wsgi import get_wsgi_application
 
+from config.secrets import apply_rotated_secrets, start_refresh
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Pick up rotated credentials without a restart (no-op unless settings
+# loaded secrets from AWS).
+start_refresh(apply_rotated_secrets)
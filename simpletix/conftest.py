@@ -3,9 +3,26 @@ import os
 import sys
 from unittest import mock
 
+import pytest
+
 # make sure tests never try to talk to real Algolia
 os.environ.setdefault("DJANGO_DISABLE_ALGOLIA", "1")
 
 # in case something still imports these, mock them
 sys.modules.setdefault("algoliasearch", mock.MagicMock())
 sys.modules.setdefault("algoliasearch_django", mock.MagicMock())
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Throttle counters and cached PDFs must not leak between tests."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _query_checks(settings):
+    """Fail tests on N+1 queries and blown @query_budget()s (config.querycheck)."""
+    settings.QUERY_CHECKS = "raise"
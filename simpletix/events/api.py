@@ -0,0 +1,180 @@
+# events/api.py
+"""
+Read-only JSON API (v1) for events and their ticket types.
+
+Rows are read with `.values()` projections of just the requested fields,
+so no model instances are built. Related data costs one query per page,
+not one per event: the organizer name is a join, and ticket types are a
+single `event_id__in` query.
+
+Responses are cached per page, meaning per query string, as encoded JSON
+together with their ETag. Detail pages are keyed by a per-event version,
+which any save or delete of the Event or one of its TicketInfo rows bumps
+(see events.signals). List pages are keyed by a global list generation,
+which is only bumped when a column shown on lists changes (LIST_COLUMNS).
+Ticket availability isn't one of those: a sale would otherwise retire
+every cached list page, so lists show it up to EVENT_API_CACHE_SECONDS
+late. All entries also expire after EVENT_API_CACHE_SECONDS, which keeps
+the signed banner URLs in them fresh and lets events drop off the list
+once they have started.
+"""
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from tickets.models import TicketInfo
+from .models import Event
+
+API_PAGE_SIZE = 24
+API_MAX_PAGE_SIZE = 100
+
+# Public field name -> `.values()` lookup.
+EVENT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "date": "date",
+    "time": "time",
+    "starts_at": "starts_at",
+    "location": "location",
+    "formatted_address": "formatted_address",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "banner": "banner",
+    "organizer": "organizer__full_name",
+    "updated_at": "updated_at",
+}
+TICKET_INFO_FIELDS = ("id", "category", "price", "availability")
+# "tickets" isn't a column: it nests the event's TicketInfo rows.
+ALL_FIELDS = (*EVENT_FIELDS, "tickets")
+# Descriptions can be long, so lists leave them out unless asked for.
+LIST_DEFAULT_FIELDS = tuple(name for name in ALL_FIELDS if name != "description")
+DETAIL_DEFAULT_FIELDS = ALL_FIELDS
+
+# Model label -> columns whose changes must retire cached list pages.
+LIST_COLUMNS = {
+    "events.Event": frozenset(
+        lookup.split("__")[0] for lookup in EVENT_FIELDS.values()
+    ),
+    "tickets.TicketInfo": frozenset({"event", "category", "price"}),
+}
+
+_GENERATION_KEY = "events:api:generation"
+
+
+def parse_fields(value, default):
+    """
+    The `fields=` parameter (comma separated) as a tuple of field names,
+    or `default` if it's missing. Raises ValueError for unknown names.
+    """
+    if not value:
+        return default
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = [name for name in fields if name not in ALL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields or default
+
+
+def event_rows(queryset, fields):
+    """
+    `queryset` as a `.values()` projection of `fields`. `id` and
+    `starts_at` are always selected, since cursors need them.
+    """
+    lookups = {"id", "starts_at"}
+    lookups.update(EVENT_FIELDS[name] for name in fields if name in EVENT_FIELDS)
+    return queryset.values(*sorted(lookups))
+
+
+def serialize_events(rows, fields):
+    """JSON-ready dicts with exactly `fields` for the given event rows."""
+    rows = list(rows)
+    tickets = defaultdict(list)
+    if "tickets" in fields and rows:
+        for ticket in (
+            TicketInfo.objects.filter(event_id__in=[row["id"] for row in rows])
+            .order_by("event_id", "id")
+            .values("event_id", *TICKET_INFO_FIELDS)
+        ):
+            tickets[ticket.pop("event_id")].append(ticket)
+
+    storage = Event._meta.get_field("banner").storage
+    results = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == "tickets":
+                item[name] = tickets[row["id"]]
+            elif name == "banner":
+                item[name] = storage.url(row["banner"]) if row["banner"] else None
+            else:
+                item[name] = row[EVENT_FIELDS[name]]
+        results.append(item)
+    return results
+
+
+def api_generation():
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(_GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_api_cache():
+    """Retire every cached list page."""
+    cache.set(_GENERATION_KEY, time.time_ns(), None)
+
+
+def _event_version_key(event_id):
+    return f"events:api:event:{event_id}"
+
+
+def event_version(event_id):
+    version = cache.get(_event_version_key(event_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_event_version_key(event_id), version, None)
+    return version
+
+
+def invalidate_api_event(event_id):
+    """Retire the cached detail pages of `event_id`."""
+    cache.set(_event_version_key(event_id), time.time_ns(), None)
+
+
+def error_response(status, message):
+    """An (uncached) error, shaped like the entries of cached_response()."""
+    body = json.dumps({"error": message}).encode()
+    return {"body": body, "etag": None, "status": status}
+
+
+def cached_response(key, compute, event_id=None):
+    """
+    {"body": bytes, "etag": str, "status": 200} for the page identified by
+    `key`. On a miss, `compute()` returns the payload (or raises) and the
+    encoded result is cached for the current list generation, or for the
+    current version of `event_id` if it's a detail page.
+    """
+    digest = hashlib.md5(repr(key).encode(), usedforsecurity=False).hexdigest()
+    if event_id is None:
+        version = f"list:{api_generation()}"
+    else:
+        version = f"event:{event_id}:{event_version(event_id)}"
+    cache_key = f"events:api:page:{version}:{digest}"
+    entry = cache.get(cache_key)
+    if entry is None:
+        body = DjangoJSONEncoder(separators=(",", ":")).encode(compute()).encode()
+        entry = {
+            "body": body,
+            "etag": hashlib.sha1(body, usedforsecurity=False).hexdigest(),
+            "status": 200,
+        }
+        cache.set(cache_key, entry, getattr(settings, "EVENT_API_CACHE_SECONDS", 60))
+    return entry
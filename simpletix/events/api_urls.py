@@ -0,0 +1,11 @@
+# events/api_urls.py
+"""Versioned JSON API routes, mounted at /api/v1/ (see events.api)."""
+
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("events/", views.api_event_list, name="event_list"),
+    path("events/<int:event_id>/", views.api_event_detail, name="event_detail"),
+]
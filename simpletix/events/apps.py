@@ -20,7 +20,10 @@ class EventsConfig(AppConfig):
             * DJANGO_DISABLE_ALGOLIA is NOT set, and
             * ALGOLIA_APP_ID is set.
         - Never block app startup if Algolia import fails.
+
+        Signal handlers (card cache invalidation) are always connected.
         """
+        from . import signals  # noqa: F401
 
         # 1) Skip in CI (GitHub Actions / pipelines usually set CI=true)
         if os.getenv("CI", "").lower() == "true":
@@ -0,0 +1,108 @@
+# events/cards.py
+"""
+Cached rendering of the event cards shown on the event list.
+
+A card looks the same for every visitor, so each one is rendered once and
+cached. The cache key carries `Event.updated_at` and the event's
+availability version, which means:
+
+- saving the event (e.g. through edit_event) bumps `updated_at`, and
+- any TicketInfo save/delete (orders, restocks, formset edits) bumps the
+  availability version (see events.signals),
+
+and the stale fragment is simply never looked up again.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from tickets.models import TicketInfo
+
+CARD_TEMPLATE = "events/event_card.html"
+
+# Fields the event cards actually render (plus `updated_at` for the cache
+# key); everything else, notably the potentially large `description`, is
+# left out of the list query.
+EVENT_CARD_FIELDS = (
+    "id",
+    "title",
+    "date",
+    "time",
+    "location",
+    "banner",
+    "banner_derivatives",
+    "updated_at",
+)
+
+
+def _availability_key(event_id):
+    return f"events:availability:{event_id}"
+
+
+def _new_version():
+    # Any fresh value works; a timestamp also survives cache eviction, since
+    # a re-created version can never match a fragment cached under an old one.
+    return time.time_ns()
+
+
+def availability_versions(event_ids):
+    """Return {event_id: availability version} for the given events."""
+    keys = {_availability_key(event_id): event_id for event_id in event_ids}
+    found = cache.get_many(keys)
+
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_availability_version(event_id):
+    """Mark the ticket availability of `event_id` as changed."""
+    cache.set(_availability_key(event_id), _new_version(), None)
+
+
+def card_cache_key(event, version):
+    return f"events:card:{event.id}:{event.updated_at.timestamp()}:{version}"
+
+
+def render_event_cards(events):
+    """
+    Return the rendered card HTML for each event, in order.
+
+    Cached fragments are fetched with a single get_many; only the misses
+    load their ticket badges (one query for all of them) and get rendered.
+    """
+    if not events:
+        return []
+
+    versions = availability_versions([event.id for event in events])
+    keys = {event.id: card_cache_key(event, versions[event.id]) for event in events}
+    fragments = cache.get_many(keys.values())
+
+    missing = [event for event in events if keys[event.id] not in fragments]
+    if missing:
+        prefetch_related_objects(
+            missing,
+            Prefetch(
+                "ticketInfo",
+                queryset=TicketInfo.objects.only(
+                    "id", "event_id", "category", "availability"
+                ).order_by("id"),
+            ),
+        )
+        rendered = {
+            keys[event.id]: render_to_string(CARD_TEMPLATE, {"event": event})
+            for event in missing
+        }
+        # Keep this below the lifetime of signed media URLs in the markup.
+        cache.set_many(rendered, getattr(settings, "EVENT_CARD_CACHE_SECONDS", 300))
+        fragments.update(rendered)
+
+    return [mark_safe(fragments[keys[event.id]]) for event in events]
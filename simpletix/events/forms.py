@@ -1,8 +1,15 @@
 from django import forms
+from django.core.files.storage import default_storage
 from .models import Event
+from .uploads import UploadError, check_banner_image, resolve_upload
 
 
 class EventForm(forms.ModelForm):
+    # Signed references to files uploaded straight to storage (see
+    # events.uploads); when set, they take the place of the file fields.
+    banner_upload = forms.CharField(required=False, widget=forms.HiddenInput())
+    video_upload = forms.CharField(required=False, widget=forms.HiddenInput())
+
     class Meta:
         model = Event
         fields = [
@@ -23,4 +30,36 @@ class EventForm(forms.ModelForm):
             "formatted_address": forms.HiddenInput(),
             "latitude": forms.HiddenInput(),
             "longitude": forms.HiddenInput(),
+            "banner": forms.ClearableFileInput(
+                attrs={"data-direct-upload": "banner", "accept": "image/*"}
+            ),
+            "video": forms.ClearableFileInput(
+                attrs={"data-direct-upload": "video", "accept": "video/*"}
+            ),
         }
+
+    def __init__(self, *args, user=None, **kwargs):
+        self.user = user
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field in ("banner", "video"):
+            reference = cleaned_data.get(f"{field}_upload")
+            if not reference:
+                continue
+            try:
+                key = resolve_upload(reference, field, self.user)
+                if field == "banner":
+                    # A raw key skips ImageField's checks; do them here, and
+                    # don't keep a rejected upload around.
+                    try:
+                        check_banner_image(key)
+                    except UploadError:
+                        default_storage.delete(key)
+                        raise
+                # A committed storage key: saving the event won't re-upload.
+                cleaned_data[field] = key
+            except UploadError as exc:
+                self.add_error(field, str(exc))
+        return cleaned_data
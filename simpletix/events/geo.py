@@ -0,0 +1,202 @@
+# events/geo.py
+"""
+Geo helpers for "events near me".
+
+Search runs in two steps:
+
+1. Candidate pruning in Postgres: the query box is covered by up to
+   MAX_COVER_CELLS geohash cells, `Event.geohash` (B-tree indexed) is
+   matched by prefix, and rows outside the box itself are dropped there
+   too. Only id/latitude/longitude of the candidates are fetched.
+2. Exact filtering in NumPy: vectorized haversine distances over the
+   candidate arrays, then a sort by distance.
+
+A circle crossing the antimeridian is searched as two boxes, one on each
+side of it.
+"""
+
+import math
+
+import numpy as np
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~5m cells; stored on Event
+MAX_COVER_CELLS = 32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def _cell_size(precision):
+    """(height, width) in degrees of a geohash cell at `precision`."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lat, min_lng, max_lat, max_lng) enclosing a circle. Near the
+    antimeridian the longitudes run past +-180; see split_antimeridian().
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if dlng >= 180.0:
+        min_lng, max_lng = -180.0, 180.0
+    else:
+        min_lng, max_lng = longitude - dlng, longitude + dlng
+    return (
+        max(latitude - dlat, -90.0),
+        min_lng,
+        min(latitude + dlat, 90.0),
+        max_lng,
+    )
+
+
+def split_antimeridian(box):
+    """`box` as one or two boxes with longitudes within -180..180."""
+    min_lat, min_lng, max_lat, max_lng = box
+    if min_lng < -180.0:
+        return [
+            (min_lat, min_lng + 360.0, max_lat, 180.0),
+            (min_lat, -180.0, max_lat, max_lng),
+        ]
+    if max_lng > 180.0:
+        return [
+            (min_lat, min_lng, max_lat, 180.0),
+            (min_lat, -180.0, max_lat, max_lng - 360.0),
+        ]
+    return [box]
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """
+    Geohash prefixes whose cells together cover the box, using the finest
+    precision that needs at most `max_cells` cells.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = _cell_size(precision)
+        rows = range(math.floor(min_lat / height), math.floor(max_lat / height) + 1)
+        cols = range(math.floor(min_lng / width), math.floor(max_lng / width) + 1)
+        if len(rows) * len(cols) <= max_cells:
+            break
+    else:
+        return [""]  # the whole world
+
+    # Encode the center of every grid cell the box touches (clamped so the
+    # +90 / +180 edges map onto the last real cell).
+    return sorted(
+        {
+            encode_geohash(
+                min((row + 0.5) * height, 90.0 - height / 2),
+                min((col + 0.5) * width, 180.0 - width / 2),
+                precision,
+            )
+            for row in rows
+            for col in cols
+        }
+    )
+
+
+def geohash_filter(cells):
+    """Q matching events whose geohash falls in any of `cells`."""
+    query = Q()
+    for cell in cells:
+        query |= Q(geohash__startswith=cell)
+    return query & ~Q(geohash="")
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Vectorized great-circle distance from one point to many, in km."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlng = np.radians(longitudes) - math.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def find_nearby(queryset, latitude, longitude, radius_km=None, bbox=None, limit=50):
+    """
+    Return [(event_id, distance_km)] sorted by distance from the point.
+
+    Filters by `radius_km` around the point, by `bbox`
+    (min_lat, min_lng, max_lat, max_lng), or both.
+    """
+    if radius_km is None:
+        boxes = [bbox]
+    else:
+        boxes = split_antimeridian(bounding_box(latitude, longitude, radius_km))
+        if bbox is not None:
+            boxes = [
+                (
+                    max(bbox[0], box[0]),
+                    max(bbox[1], box[1]),
+                    min(bbox[2], box[2]),
+                    min(bbox[3], box[3]),
+                )
+                for box in boxes
+            ]
+    boxes = [box for box in boxes if box[0] <= box[2] and box[1] <= box[3]]
+    if not boxes:
+        return []
+
+    query = Q(pk__in=[])
+    for min_lat, min_lng, max_lat, max_lng in boxes:
+        # The cells prune through the geohash index; the ranges drop the
+        # rows in them that are outside the box before they're fetched.
+        query |= geohash_filter(covering_cells(min_lat, min_lng, max_lat, max_lng)) & Q(
+            latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng)
+        )
+    rows = list(queryset.filter(query).values_list("id", "latitude", "longitude"))
+    if not rows:
+        return []
+
+    candidates = np.array(rows, dtype=np.float64)
+    ids, lats, lngs = candidates[:, 0], candidates[:, 1], candidates[:, 2]
+
+    distances = haversine_km(latitude, longitude, lats, lngs)
+    if radius_km is not None:
+        keep = distances <= radius_km
+        ids, distances = ids[keep], distances[keep]
+    if len(ids) > limit:
+        nearest = np.argpartition(distances, limit)[:limit]
+        ids, distances = ids[nearest], distances[nearest]
+    order = np.argsort(distances, kind="stable")
+    return [(int(ids[i]), float(distances[i])) for i in order]
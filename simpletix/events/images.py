@@ -0,0 +1,173 @@
+# events/images.py
+"""
+Responsive derivatives of event banners.
+
+Uploaded banners are often multi-megabyte photos, while a card is a few
+hundred pixels wide. After a banner is saved, resized WebP and JPEG copies
+are generated at BANNER_WIDTHS with Pillow and stored next to the original
+through the default storage (S3 in production):
+
+    banners/party.jpg
+    banners/derivatives/party-jpg-320w.webp, party-jpg-320w.jpg, ...
+
+`Event.banner_derivatives` records what was generated, for which original,
+and the cards render them as a <picture> with `srcset`. Generation runs on
+a background worker after the transaction commits (BANNER_DERIVATIVES_ASYNC),
+so uploads don't wait for it; until it's done the original is shown.
+"""
+
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+BANNER_WIDTHS = (320, 640, 960, 1280)
+# (key in Event.banner_derivatives, Pillow format, extension, save options)
+BANNER_FORMATS = (
+    ("webp", "WEBP", "webp", {"quality": 80, "method": 4}),
+    ("jpeg", "JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+)
+
+_executor = None
+
+
+def derivative_name(name, width, extension):
+    # The source extension is kept so "a.png" and "a.jpg" can't collide.
+    directory, filename = posixpath.split(name)
+    stem = filename.replace(".", "-")
+    return posixpath.join(directory, "derivatives", f"{stem}-{width}w.{extension}")
+
+
+def _target_widths(original_width):
+    """Widths to generate; never upscale, but always produce at least one."""
+    widths = [width for width in BANNER_WIDTHS if width < original_width]
+    return widths or [min(original_width, BANNER_WIDTHS[0])]
+
+
+def _load(banner):
+    with banner.storage.open(banner.name, "rb") as fh:
+        image = Image.open(fh)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        # Flatten transparency onto white so JPEG output looks like the source.
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    return image
+
+
+def render_derivatives(image):
+    """Yield (width, key, extension, bytes) for every derivative of `image`."""
+    for width in _target_widths(image.width):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for key, fmt, extension, options in BANNER_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **options)
+            yield width, key, extension, buffer.getvalue()
+
+
+def build_banner_derivatives(event_id):
+    """
+    Generate and store the derivatives of an event's current banner, then
+    record them on the event. Returns the new `banner_derivatives` value,
+    or None if there was nothing (or nothing current) to do.
+    """
+    from .models import Event
+
+    try:
+        event = Event.objects.only("id", "banner", "banner_derivatives").get(
+            pk=event_id
+        )
+        if not event.banner:
+            return None
+        source = event.banner.name
+        storage = event.banner.storage
+
+        image = _load(event.banner)
+        derivatives = {"source": source, "width": image.width, "height": image.height}
+        for width, key, extension, data in render_derivatives(image):
+            name = derivative_name(source, width, extension)
+            storage.delete(name)
+            saved = storage.save(name, ContentFile(data))
+            derivatives.setdefault(key, []).append([width, saved])
+
+        # Only record them if the banner wasn't replaced in the meantime.
+        # Bumping updated_at retires the cached card markup.
+        updated = Event.objects.filter(pk=event_id, banner=source).update(
+            banner_derivatives=derivatives, updated_at=timezone.now()
+        )
+        if not updated:
+            return None
+
+        # Clean up what was generated for the banner this one replaced.
+        current = {name for key, *_ in BANNER_FORMATS for _, name in derivatives[key]}
+        previous = event.banner_derivatives or {}
+        for key, *_ in BANNER_FORMATS:
+            for _, name in previous.get(key, []):
+                if name not in current:
+                    storage.delete(name)
+        return derivatives
+    except Exception:
+        logger.exception("Building banner derivatives failed for event %s", event_id)
+        return None
+    finally:
+        if getattr(settings, "BANNER_DERIVATIVES_ASYNC", False):
+            close_old_connections()
+
+
+def schedule_banner_derivatives(event_id):
+    """
+    Build the derivatives once the current transaction commits: on a
+    background worker when BANNER_DERIVATIVES_ASYNC is on, inline otherwise.
+    """
+
+    def dispatch():
+        if getattr(settings, "BANNER_DERIVATIVES_ASYNC", False):
+            global _executor
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="banner-derivatives"
+                )
+            _executor.submit(build_banner_derivatives, event_id)
+        else:
+            build_banner_derivatives(event_id)
+
+    transaction.on_commit(dispatch)
+
+
+def banner_srcset(event):
+    """
+    Template data for a responsive banner, or None if the event has no
+    derivatives for its current banner yet.
+    """
+    derivatives = event.banner_derivatives or {}
+    if not event.banner or derivatives.get("source") != event.banner.name:
+        return None
+    storage = event.banner.storage
+    sources = {}
+    for key, *_ in BANNER_FORMATS:
+        entries = derivatives.get(key) or []
+        sources[key] = ", ".join(
+            f"{storage.url(name)} {width}w" for width, name in entries
+        )
+    if not sources.get("jpeg"):
+        return None
+    fallback = derivatives["jpeg"][min(1, len(derivatives["jpeg"]) - 1)][1]
+    return {
+        "webp": sources.get("webp", ""),
+        "jpeg": sources["jpeg"],
+        "src": storage.url(fallback),
+        "width": derivatives.get("width"),
+        "height": derivatives.get("height"),
+    }
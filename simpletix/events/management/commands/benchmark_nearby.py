@@ -0,0 +1,112 @@
+import statistics
+import time
+from datetime import date, datetime, time as time_, timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from events.geo import encode_geohash, find_nearby, haversine_km
+from events.models import Event
+
+# (lat, lng) of a few metro areas; synthetic events cluster around them.
+METROS = [
+    (40.7128, -74.0060),
+    (34.0522, -118.2437),
+    (41.8781, -87.6298),
+    (51.5074, -0.1278),
+    (35.6762, 139.6503),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the events-near-me search on synthetic data. Everything "
+        "runs in a transaction that is rolled back, so no rows are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--radius-km", type=float, default=10.0)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--compare-naive",
+            action="store_true",
+            help="Also time a full scan + haversine over every event.",
+        )
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        with transaction.atomic():
+            started = time.perf_counter()
+            self._populate(rng, options["events"])
+            self.stdout.write(
+                f"inserted {options['events']} events in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+
+            points = self._points(rng, options["queries"])
+            radius = options["radius_km"]
+            timings, sizes = [], []
+            for lat, lng in points:
+                started = time.perf_counter()
+                found = find_nearby(
+                    Event.objects.all(), lat, lng, radius_km=radius, limit=50
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(found))
+            self._report("geohash + numpy", timings, sizes)
+
+            if options["compare_naive"]:
+                timings = []
+                for lat, lng in points[:10]:
+                    started = time.perf_counter()
+                    rows = np.array(
+                        list(Event.objects.values_list("id", "latitude", "longitude")),
+                        dtype=np.float64,
+                    )
+                    distances = haversine_km(lat, lng, rows[:, 1], rows[:, 2])
+                    np.sort(distances[distances <= radius])
+                    timings.append((time.perf_counter() - started) * 1000)
+                self._report("full scan", timings, None)
+
+            transaction.set_rollback(True)
+
+    def _points(self, rng, count):
+        centers = np.array(METROS)[rng.integers(len(METROS), size=count)]
+        return centers + rng.normal(0, 0.2, size=(count, 2))
+
+    def _populate(self, rng, count, batch_size=10_000):
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            coords = self._points(rng, size)
+            Event.objects.bulk_create(
+                [
+                    Event(
+                        title=f"Bench {start + i}",
+                        date=date(2030, 1, 1),
+                        time=time_(12, 0),
+                        # bulk_create skips Event.save(), so set derived fields
+                        starts_at=datetime(2030, 1, 1, 12, tzinfo=timezone.utc),
+                        location="Bench",
+                        latitude=float(lat),
+                        longitude=float(lng),
+                        geohash=encode_geohash(lat, lng),
+                    )
+                    for i, (lat, lng) in enumerate(coords)
+                ]
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE events_event")
+
+    def _report(self, label, timings, sizes):
+        timings = sorted(timings)
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        line = (
+            f"{label}: p50={statistics.median(timings):.1f}ms "
+            f"p95={p95:.1f}ms max={timings[-1]:.1f}ms"
+        )
+        if sizes:
+            line += f" avg_results={statistics.mean(sizes):.1f}"
+        self.stdout.write(line)
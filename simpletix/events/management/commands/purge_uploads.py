@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from events.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Abort direct uploads (S3 multipart uploads, or local staging "
+        "directories) that were started but never completed or aborted. "
+        "Meant to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=None,
+            help="Seconds; default: DIRECT_UPLOAD_SESSION_MAX_AGE (a day).",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads(options["max_age"])
+        self.stdout.write(f"aborted {purged} stale uploads")
@@ -0,0 +1,206 @@
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from events import search_sync
+from events.models import Event, SearchIndexOutbox
+
+SAVE_RETRIES = 3
+# What the live index has beyond its records (dashboard settings, query
+# rules, synonyms), copied onto the rebuilt index before it replaces it.
+COPY_SCOPE = ["settings", "rules", "synonyms"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the Algolia events index: stream all events into the temporary "
+        "index with concurrent batch pushes, then atomically move it into place "
+        "and replay the changes made meanwhile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched per round trip while streaming events.",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--max-batches-per-second",
+            type=float,
+            default=0,
+            help="Throttle pushes to stay under Algolia rate limits (0 = off).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=".reindex_algolia.checkpoint.json",
+            help="File recording progress, so an interrupted run can resume.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the checkpoint instead of starting over.",
+        )
+
+    def handle(self, *args, **options):
+        index = search_sync._get_index()
+        if index is None:
+            raise CommandError("Algolia is not configured; nothing to reindex.")
+        self.client, self.adapter = index
+        self.checkpoint = Path(options["checkpoint"])
+        tmp_index = self.adapter.tmp_index_name
+
+        state = self._load_checkpoint(tmp_index) if options["resume"] else None
+        if state is None:
+            last_id, self.started = 0, timezone.now()
+            self._prepare_tmp_index(tmp_index)
+        else:
+            last_id, self.started = state
+            self.stdout.write(f"Resuming after event {last_id}")
+        # Changes synced from now on are kept in the outbox (see
+        # events.search_sync), since the stream may already be past them.
+        search_sync.start_reindex(self.started)
+
+        pushed = self._stream(tmp_index, last_id, options)
+
+        self._copy_live_config(tmp_index)
+        resp = self.client.operation_index(
+            tmp_index, {"operation": "move", "destination": self.adapter.index_name}
+        )
+        self.client.wait_for_task(tmp_index, resp.task_id)
+        search_sync.finish_reindex()
+        replayed = self._replay(options["batch_size"])
+        self.checkpoint.unlink(missing_ok=True)
+        self.stdout.write(
+            f"Reindexed {pushed} events into {self.adapter.index_name}, "
+            f"then replayed {replayed} changes"
+        )
+
+    def _prepare_tmp_index(self, tmp_index):
+        if self.adapter.settings:
+            resp = self.client.set_settings(tmp_index, self.adapter.settings)
+            self.client.wait_for_task(tmp_index, resp.task_id)
+        resp = self.client.clear_objects(tmp_index)
+        self.client.wait_for_task(tmp_index, resp.task_id)
+
+    def _copy_live_config(self, tmp_index):
+        live_index = self.adapter.index_name
+        if not self.client.index_exists(live_index):
+            return
+        resp = self.client.operation_index(
+            live_index,
+            {"operation": "copy", "destination": tmp_index, "scope": COPY_SCOPE},
+        )
+        self.client.wait_for_task(live_index, resp.task_id)
+        # Settings declared in code still take precedence.
+        if self.adapter.settings:
+            resp = self.client.set_settings(tmp_index, self.adapter.settings)
+            self.client.wait_for_task(tmp_index, resp.task_id)
+
+    def _replay(self, batch_size):
+        """Push the changes queued since the start again, into the new index."""
+        SearchIndexOutbox.objects.filter(queued_at__gte=self.started).update(
+            next_attempt_at=timezone.now()
+        )
+        index = (self.client, self.adapter)
+        total = 0
+        while True:
+            pushed = search_sync.flush_outbox(batch_size=batch_size, index=index)
+            total += pushed
+            if pushed < batch_size:
+                return total
+
+    def _load_checkpoint(self, tmp_index):
+        try:
+            state = json.loads(self.checkpoint.read_text())
+            started = parse_datetime(state["started"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if state.get("tmp_index") != tmp_index or started is None:
+            return None
+        return int(state["last_id"]), started
+
+    def _save_checkpoint(self, tmp_index, last_id):
+        self.checkpoint.write_text(
+            json.dumps(
+                {
+                    "tmp_index": tmp_index,
+                    "last_id": last_id,
+                    "started": self.started.isoformat(),
+                }
+            )
+        )
+
+    def _save_batch(self, tmp_index, records):
+        for attempt in range(1, SAVE_RETRIES + 1):
+            try:
+                self.client.save_objects(index_name=tmp_index, objects=records)
+                return len(records)
+            except Exception:
+                if attempt == SAVE_RETRIES:
+                    raise
+                time.sleep(2**attempt)
+
+    def _stream(self, tmp_index, last_id, options):
+        """
+        Serialize events in id order and push batches concurrently.
+
+        Batches complete out of order, so the checkpoint only advances past
+        a batch once every batch before it has been saved too. The number of
+        batches in flight is bounded, which keeps memory flat however large
+        the table is.
+        """
+        queryset = Event.objects.filter(id__gt=last_id).order_by("id")
+        batch_size = options["batch_size"]
+        min_interval = (
+            1.0 / options["max_batches_per_second"]
+            if options["max_batches_per_second"] > 0
+            else 0
+        )
+        max_in_flight = max(options["workers"], 1) * 2
+        in_flight = deque()
+        pushed = 0
+        last_submit = 0.0
+
+        def complete_oldest():
+            nonlocal pushed
+            future, batch_last_id = in_flight.popleft()
+            pushed += future.result()
+            self._save_checkpoint(tmp_index, batch_last_id)
+
+        def submit(records, batch_last_id):
+            nonlocal last_submit
+            if min_interval:
+                wait = last_submit + min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                last_submit = time.monotonic()
+            while len(in_flight) >= max_in_flight:
+                complete_oldest()
+            in_flight.append(
+                (executor.submit(self._save_batch, tmp_index, records), batch_last_id)
+            )
+            while in_flight and in_flight[0][0].done():
+                complete_oldest()
+
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as executor:
+            batch = []
+            for event in queryset.iterator(chunk_size=options["chunk_size"]):
+                batch.append(self.adapter.get_raw_record(event))
+                if len(batch) >= batch_size:
+                    submit(batch, event.id)
+                    batch = []
+            if batch:
+                submit(batch, event.id)
+            while in_flight:
+                complete_oldest()
+
+        return pushed
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from events.search_sync import flush_outbox, outbox_lag_seconds
+
+
+class Command(BaseCommand):
+    help = "Flush queued event index changes to Algolia in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling the outbox (background worker mode).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty (with --loop).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            pushed = self._drain(options["batch_size"])
+            lag = outbox_lag_seconds()
+            if pushed or lag:
+                self.stdout.write(f"algolia_sync pushed={pushed} lag_seconds={lag:.1f}")
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def _drain(self, batch_size):
+        total = 0
+        while True:
+            pushed = flush_outbox(batch_size=batch_size)
+            total += pushed
+            if pushed < batch_size:
+                return total
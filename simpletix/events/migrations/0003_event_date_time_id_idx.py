@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_userprofile"),
+        ("events", "0002_event_formatted_address_event_latitude_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["date", "time", "id"], name="event_date_time_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_event_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_id", models.BigIntegerField(unique=True)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("save", "Save"), ("delete", "Delete")], max_length=10
+                    ),
+                ),
+                (
+                    "queued_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("last_error", models.TextField(blank=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:21
+
+from django.db import migrations, models
+
+from events.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    located = Event.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only("id", "latitude", "longitude")
+    batch = []
+    for event in located.iterator(chunk_size=2000):
+        event.geohash = encode_geohash(event.latitude, event.longitude)
+        batch.append(event)
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    Event.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_searchindexoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geohash",
+            field=models.CharField(blank=True, db_index=True, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
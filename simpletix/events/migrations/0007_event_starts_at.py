@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="starts_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        # One set-based UPDATE; date + time is interpreted in TIME_ZONE,
+        # exactly like Event.compute_starts_at().
+        migrations.RunSQL(
+            [
+                (
+                    "UPDATE events_event "
+                    "SET starts_at = (date + time) AT TIME ZONE %s",
+                    [settings.TIME_ZONE],
+                )
+            ],
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="starts_at",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name="event",
+            name="event_date_time_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["starts_at", "id"], name="event_starts_at_id_idx"
+            ),
+        ),
+    ]
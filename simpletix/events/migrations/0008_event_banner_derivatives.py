@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_event_starts_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="banner_derivatives",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
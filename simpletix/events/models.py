@@ -1,5 +1,12 @@
+from datetime import datetime
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.utils import timezone
 from accounts.models import OrganizerProfile
+from .geo import encode_geohash
+from .images import banner_srcset, schedule_banner_derivatives
 
 
 class Event(models.Model):
@@ -10,20 +17,96 @@ class Event(models.Model):
     description = models.TextField(blank=True)
     date = models.DateField()
     time = models.TimeField()
+    # `date` + `time` as one instant (in settings.TIME_ZONE), set on save.
+    # Listings filter and sort on it, so past events are never scanned.
+    starts_at = models.DateTimeField(editable=False)
     location = models.CharField(max_length=255)
 
     formatted_address = models.CharField(max_length=255, blank=True)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude on save; prunes "events near me"
+    # candidates by prefix (see events.geo). Empty when there's no location.
+    geohash = models.CharField(max_length=12, blank=True, db_index=True)
 
     banner = models.ImageField(upload_to="banners/", blank=True, null=True)
+    # Resized WebP/JPEG copies of `banner`, built off the request path
+    # (see events.images); empty until they've been generated.
+    banner_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     video = models.FileField(upload_to="event_videos/", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Server-side search (used when Algolia is disabled): a stored tsvector
+    # kept up to date by Postgres itself, weighted title > location > text.
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config="english")
+        + SearchVector("location", weight="B", config="english")
+        + SearchVector("description", weight="C", config="english"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Backs the upcoming-events keyset pagination (events.pagination).
+            models.Index(fields=["starts_at", "id"], name="event_starts_at_id_idx"),
+            GinIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            # Typo-tolerant matching on titles (pg_trgm).
+            GinIndex(
+                fields=["title"],
+                name="event_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+        self.starts_at = self.compute_starts_at()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            derived = set()
+            if {"latitude", "longitude"} & set(update_fields):
+                derived.add("geohash")
+            if {"date", "time"} & set(update_fields):
+                derived.add("starts_at")
+            if derived:
+                kwargs["update_fields"] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+
+        # The banner file is stored (and its final name known) by now.
+        banner_saved = update_fields is None or "banner" in update_fields
+        if (
+            banner_saved
+            and self.banner
+            and (self.banner_derivatives or {}).get("source") != self.banner.name
+        ):
+            schedule_banner_derivatives(self.pk)
+
+    @property
+    def banner_srcset(self):
+        return banner_srcset(self)
+
+    def compute_starts_at(self):
+        """
+        Aware datetime for `date` + `time` in the default time zone.
+        Accepts the ISO strings some callers (and tests) pass in too.
+        """
+        day = self._meta.get_field("date").to_python(self.date)
+        at = self._meta.get_field("time").to_python(self.time)
+        if day is None or at is None:
+            return None
+        return timezone.make_aware(
+            datetime.combine(day, at), timezone.get_default_timezone()
+        )
+
     @property
     def date_str(self):
         """
@@ -55,3 +138,31 @@ class Event(models.Model):
             return value.strftime("%H:%M:%S")
         # Fallback: already a string or something string-like
         return str(value)
+
+
+class SearchIndexOutbox(models.Model):
+    """
+    Pending Algolia index changes, flushed by the `sync_algolia` worker.
+
+    One row per event: queueing another change for the same event just
+    overwrites the action/timestamp, so bursts of edits coalesce into a
+    single push.
+    """
+
+    ACTION_SAVE = "save"
+    ACTION_DELETE = "delete"
+    ACTION_CHOICES = [
+        (ACTION_SAVE, "Save"),
+        (ACTION_DELETE, "Delete"),
+    ]
+
+    # Not a ForeignKey: delete entries must outlive the event row.
+    event_id = models.BigIntegerField(unique=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    queued_at = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.action} event {self.event_id}"
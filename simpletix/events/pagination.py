@@ -0,0 +1,74 @@
+# events/pagination.py
+"""
+Keyset (cursor) pagination for event listings.
+
+Events are ordered by (starts_at, id). A cursor encodes the sort key of
+the last event on a page, so fetching the next page is an index range scan
+no matter how deep the client has paged (unlike OFFSET, which has to walk
+and discard every earlier row).
+
+Pages can be model instances or `.values()` rows; either way they must
+include `starts_at` and `id`.
+"""
+
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+EVENT_ORDERING = ("starts_at", "id")
+
+
+def _position(event):
+    if isinstance(event, dict):
+        return event["starts_at"], event["id"]
+    return event.starts_at, event.id
+
+
+def encode_cursor(event):
+    """Opaque, URL-safe cursor pointing just past `event`."""
+    starts_at, event_id = _position(event)
+    raw = f"{starts_at.isoformat()}|{event_id}"
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(cursor):
+    """
+    Return (starts_at, id) for a cursor, or None if it is missing or
+    malformed (a bad cursor just restarts from the first page).
+    """
+    if not cursor:
+        return None
+    try:
+        raw_start, raw_id = force_str(urlsafe_base64_decode(cursor)).split("|")
+        starts_at = datetime.fromisoformat(raw_start)
+    except (TypeError, ValueError):
+        return None
+    if starts_at.tzinfo is None or not raw_id.isdigit():
+        return None
+    return starts_at, int(raw_id)
+
+
+def keyset_page(queryset, cursor=None, page_size=24):
+    """
+    Return (events, next_cursor) for the page after `cursor`.
+
+    `next_cursor` is None on the last page. One extra row is fetched to
+    detect whether another page exists, so no COUNT(*) is needed.
+    """
+    queryset = queryset.order_by(*EVENT_ORDERING)
+
+    position = decode_cursor(cursor)
+    if position is not None:
+        after_start, after_id = position
+        # The redundant `>=` bound keeps this a single index range scan.
+        queryset = queryset.filter(starts_at__gte=after_start).filter(
+            Q(starts_at__gt=after_start) | Q(starts_at=after_start, id__gt=after_id)
+        )
+
+    events = list(queryset[: page_size + 1])
+    if len(events) > page_size:
+        events = events[:page_size]
+        return events, encode_cursor(events[-1])
+    return events, None
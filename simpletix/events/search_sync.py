@@ -0,0 +1,201 @@
+# events/search_sync.py
+"""
+Out-of-band Algolia synchronization.
+
+Request handlers never talk to Algolia directly. Every Event save or delete
+records the change in the SearchIndexOutbox table (events.signals, in the
+same transaction as the event write), and the
+`sync_algolia` management command flushes the outbox in batches using
+Algolia's save_objects / delete_objects. An Algolia outage therefore only
+delays indexing; it can't fail an organizer's save.
+
+While `reindex_algolia` rebuilds the index into a temporary one, pushed
+entries queued since the rebuild started are kept (held) instead of being
+removed: the rebuild may have copied those events before the change. Once
+the rebuilt index is moved into place, the command replays them.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from config.metrics import register_collector
+from config.timing import external_call
+
+from .models import Event, SearchIndexOutbox
+
+logger = logging.getLogger(__name__)
+
+# Back off 30s, 60s, 120s, ... capped at 30 minutes between retries.
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 1800
+
+# Held entries are pushed to the live index again at this interval until
+# the rebuild finishes; the mark expires so a crashed rebuild can't hold
+# entries forever.
+_REINDEX_KEY = "events:search:reindex_started"
+REINDEX_HOLD_SECONDS = 1800
+REINDEX_MAX_SECONDS = 24 * 3600
+
+
+def queue_index_update(event_id, action):
+    """
+    Record that `event_id` needs to be saved to / deleted from the index.
+    A single upsert, so repeated updates to one event coalesce in place.
+    """
+    now = timezone.now()
+    SearchIndexOutbox.objects.bulk_create(
+        [
+            SearchIndexOutbox(
+                event_id=event_id, action=action, queued_at=now, next_attempt_at=now
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["event_id"],
+        update_fields=[
+            "action",
+            "queued_at",
+            "attempts",
+            "next_attempt_at",
+            "last_error",
+        ],
+    )
+
+
+def reindex_started():
+    """When the running `reindex_algolia` started, or None."""
+    return cache.get(_REINDEX_KEY)
+
+
+def start_reindex(started):
+    cache.set(_REINDEX_KEY, started, REINDEX_MAX_SECONDS)
+
+
+def finish_reindex():
+    cache.delete(_REINDEX_KEY)
+
+
+def outbox_lag_seconds():
+    """Age of the oldest pending change, in seconds (0 when caught up)."""
+    # Held entries (pushed, never failed, not yet due) aren't pending.
+    oldest = SearchIndexOutbox.objects.exclude(
+        attempts=0, next_attempt_at__gt=timezone.now()
+    ).aggregate(oldest=Min("queued_at"))["oldest"]
+    if oldest is None:
+        return 0.0
+    return max((timezone.now() - oldest).total_seconds(), 0.0)
+
+
+@register_collector
+def outbox_metrics():
+    """algolia_outbox_lag_seconds on /metrics, for alerting on a stuck sync."""
+    # Nothing is synced without an Algolia app, so there's no lag to report.
+    if not getattr(settings, "ALGOLIA_ENABLED", True) or not settings.ALGOLIA.get(
+        "APPLICATION_ID"
+    ):
+        return []
+    try:
+        lag = outbox_lag_seconds()
+    except DatabaseError:
+        return []
+    return [
+        "# HELP algolia_outbox_lag_seconds Age of the oldest pending index change.",
+        "# TYPE algolia_outbox_lag_seconds gauge",
+        f"algolia_outbox_lag_seconds {lag}",
+    ]
+
+
+def _get_index():
+    """(client, index adapter) for Event, or None if Algolia is unavailable."""
+    try:
+        from algoliasearch_django import algolia_engine, get_adapter
+    except Exception:
+        return None
+    try:
+        return algolia_engine.client, get_adapter(Event)
+    except Exception:
+        # Event isn't registered (e.g. Algolia disabled at startup).
+        return None
+
+
+def _push(client, adapter, entries):
+    save_ids = {
+        e.event_id for e in entries if e.action == SearchIndexOutbox.ACTION_SAVE
+    }
+    events = list(Event.objects.filter(id__in=save_ids))
+    # Events deleted since they were queued for a save are deleted instead.
+    delete_ids = {
+        e.event_id for e in entries if e.action == SearchIndexOutbox.ACTION_DELETE
+    } | (save_ids - {event.id for event in events})
+
+    records = [adapter.get_raw_record(event) for event in events]
+    with external_call("algolia"):
+        if records:
+            client.save_objects(index_name=adapter.index_name, objects=records)
+        if delete_ids:
+            client.delete_objects(
+                index_name=adapter.index_name,
+                object_ids=[str(event_id) for event_id in sorted(delete_ids)],
+            )
+
+
+def flush_outbox(batch_size=500, index=None):
+    """
+    Push one batch of due outbox entries to Algolia.
+    Returns the number of entries successfully pushed.
+
+    Rows aren't locked while the push is in flight; instead an entry is
+    only removed if it wasn't re-queued meanwhile (same queued_at), so an
+    edit that lands mid-flush is picked up by the next batch.
+    """
+    if not getattr(settings, "ALGOLIA_ENABLED", True):
+        return 0
+    index = index or _get_index()
+    if index is None:
+        return 0
+    client, adapter = index
+
+    now = timezone.now()
+    entries = list(
+        SearchIndexOutbox.objects.filter(next_attempt_at__lte=now).order_by(
+            "queued_at"
+        )[:batch_size]
+    )
+    if not entries:
+        return 0
+
+    try:
+        _push(client, adapter, entries)
+    except Exception as exc:
+        for entry in entries:
+            entry.attempts += 1
+            delay = min(
+                RETRY_BASE_SECONDS * 2 ** (entry.attempts - 1), RETRY_MAX_SECONDS
+            )
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            entry.last_error = str(exc)[:1000]
+        SearchIndexOutbox.objects.bulk_update(
+            entries, ["attempts", "next_attempt_at", "last_error"]
+        )
+        logger.warning("Algolia sync failed for %d entries: %s", len(entries), exc)
+        return 0
+
+    done = Q(pk__in=[])
+    for entry in entries:
+        done |= Q(pk=entry.pk, queued_at=entry.queued_at)
+    pushed = SearchIndexOutbox.objects.filter(done)
+    started = reindex_started()
+    if started is not None:
+        pushed.filter(queued_at__gte=started).update(
+            attempts=0,
+            next_attempt_at=now + timedelta(seconds=REINDEX_HOLD_SECONDS),
+            last_error="",
+        )
+        pushed = pushed.filter(queued_at__lt=started)
+    pushed.delete()
+    return len(entries)
@@ -0,0 +1,59 @@
+# events/signals.py
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .api import LIST_COLUMNS, invalidate_api_cache, invalidate_api_event
+from .cards import bump_availability_version
+from .models import Event, SearchIndexOutbox
+from .search_sync import queue_index_update
+
+
+@receiver(post_save, sender="tickets.TicketInfo")
+@receiver(post_delete, sender="tickets.TicketInfo")
+def ticket_info_changed(sender, instance, **kwargs):
+    """
+    Any inventory change (order placed, order failed/restocked, organizer
+    edit) invalidates the cached card of the affected event.
+    """
+    if instance.event_id:
+        bump_availability_version(instance.event_id)
+
+
+@receiver(post_save, sender="events.Event")
+@receiver(post_delete, sender="events.Event")
+@receiver(post_save, sender="tickets.TicketInfo")
+@receiver(post_delete, sender="tickets.TicketInfo")
+def api_data_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Retire the cached API detail pages of the affected event, and the list
+    pages too unless the save only touched columns lists don't show (e.g.
+    save(update_fields=["availability"]) for an order).
+    """
+    event_id = instance.pk if sender is Event else instance.event_id
+    if event_id:
+        invalidate_api_event(event_id)
+    if update_fields is not None:
+        changed = {sender._meta.get_field(name).name for name in update_fields}
+        if changed.isdisjoint(LIST_COLUMNS[sender._meta.label]):
+            return
+    invalidate_api_cache()
+
+
+@receiver(post_save, sender="events.Event")
+@receiver(post_delete, sender="events.Event")
+def queue_search_index_update(sender, instance, **kwargs):
+    """
+    Queue the Algolia update for every saved or deleted Event, whatever
+    saved it (views, admin, shell, commands). The outbox row is written
+    inside the caller's transaction, so it's recorded if and only if the
+    change is. QuerySet.update() sends no signal; the one in events.images
+    only touches banner fields, which aren't indexed.
+    """
+    if not getattr(settings, "ALGOLIA_ENABLED", True):
+        return
+    if kwargs["signal"] is post_delete:
+        action = SearchIndexOutbox.ACTION_DELETE
+    else:
+        action = SearchIndexOutbox.ACTION_SAVE
+    queue_index_update(instance.pk, action)
@@ -0,0 +1,193 @@
+import json
+import tempfile
+from datetime import date, time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from events import search_sync
+from events.management.commands.reindex_algolia import Command
+from events.models import Event, SearchIndexOutbox
+
+
+class FakeAlgoliaClient:
+    """In-memory stand-in for algoliasearch's SearchClientSync."""
+
+    def __init__(self, fail_after=None):
+        self.indices = {}
+        self.settings = {}
+        self.rules = {}
+        self.calls = []
+        self.fail_after = fail_after
+        self.saves = 0
+
+    def _task(self):
+        return SimpleNamespace(task_id=len(self.calls))
+
+    def set_settings(self, index_name, settings):
+        self.calls.append(("set_settings", index_name))
+        self.settings.setdefault(index_name, {}).update(settings)
+        return self._task()
+
+    def clear_objects(self, index_name):
+        self.calls.append(("clear_objects", index_name))
+        self.indices[index_name] = {}
+        return self._task()
+
+    def save_objects(self, index_name, objects):
+        self.saves += 1
+        if self.fail_after is not None and self.saves > self.fail_after:
+            raise RuntimeError("rate limited")
+        index = self.indices.setdefault(index_name, {})
+        for obj in objects:
+            index[obj["objectID"]] = obj
+
+    def delete_objects(self, index_name, object_ids):
+        index = self.indices.setdefault(index_name, {})
+        for object_id in object_ids:
+            index.pop(int(object_id), None)
+
+    def index_exists(self, index_name):
+        return index_name in self.indices
+
+    def operation_index(self, index_name, params):
+        destination = params["destination"]
+        self.calls.append(("operation_index", index_name, destination))
+        if params["operation"] == "copy":
+            # Only scoped copies are used: settings/rules, no records.
+            self.settings[destination] = dict(self.settings.get(index_name, {}))
+            self.rules[destination] = self.rules.get(index_name)
+        else:
+            self.indices[destination] = self.indices.pop(index_name, {})
+            self.settings[destination] = self.settings.pop(index_name, {})
+            self.rules[destination] = self.rules.pop(index_name, None)
+        return self._task()
+
+    def wait_for_task(self, index_name, task_id):
+        pass
+
+
+class FakeAdapter:
+    index_name = "simpletix_events"
+    tmp_index_name = "simpletix_events_tmp"
+    settings = {"searchableAttributes": ["title"]}
+
+    def get_raw_record(self, instance):
+        return {"objectID": instance.pk, "title": instance.title}
+
+
+class ReindexAlgoliaCommandTests(TestCase):
+    def setUp(self):
+        self.events = [
+            Event.objects.create(
+                title=f"Event {i}", date=date(2030, 1, 1), time=time(12, 0)
+            )
+            for i in range(7)
+        ]
+        self.client_ = FakeAlgoliaClient()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = Path(directory.name) / "checkpoint.json"
+
+    def _run(self, **options):
+        params = {"batch_size": 2, "chunk_size": 3, "workers": 3}
+        params.update(options)
+        with mock.patch.object(
+            search_sync, "_get_index", return_value=(self.client_, FakeAdapter())
+        ):
+            call_command(
+                "reindex_algolia",
+                checkpoint=str(self.checkpoint),
+                stdout=mock.MagicMock(),
+                **params,
+            )
+
+    def test_streams_into_tmp_index_and_moves_it_into_place(self):
+        self._run()
+
+        live = self.client_.indices["simpletix_events"]
+        self.assertEqual(set(live), {e.pk for e in self.events})
+        self.assertNotIn("simpletix_events_tmp", self.client_.indices)
+        self.assertEqual(
+            self.client_.settings["simpletix_events"], FakeAdapter.settings
+        )
+        self.assertEqual(
+            self.client_.calls[-1],
+            ("operation_index", "simpletix_events_tmp", "simpletix_events"),
+        )
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_live_settings_and_rules_survive_the_move(self):
+        self.client_.indices["simpletix_events"] = {}
+        self.client_.settings["simpletix_events"] = {
+            "searchableAttributes": ["description"],
+            "customRanking": ["desc(date)"],
+        }
+        self.client_.rules["simpletix_events"] = ["boost-featured"]
+        self._run()
+
+        self.assertEqual(
+            self.client_.settings["simpletix_events"],
+            {"searchableAttributes": ["title"], "customRanking": ["desc(date)"]},
+        )
+        self.assertEqual(self.client_.rules["simpletix_events"], ["boost-featured"])
+        self.assertEqual(
+            set(self.client_.indices["simpletix_events"]), {e.pk for e in self.events}
+        )
+
+    def test_changes_made_during_the_rebuild_are_replayed(self):
+        renamed, deleted = self.events[0], self.events[1]
+        copy_live_config = Command._copy_live_config
+
+        def sync_meanwhile(command, tmp_index):
+            # The sync worker pushes these to the old index, which the
+            # rebuilt one (streamed before the changes) is about to replace.
+            renamed.title = "Renamed"
+            renamed.save()
+            deleted.delete()
+            search_sync.flush_outbox(index=(self.client_, FakeAdapter()))
+            self.assertEqual(SearchIndexOutbox.objects.count(), 2)
+            self.assertEqual(search_sync.outbox_lag_seconds(), 0)
+            copy_live_config(command, tmp_index)
+
+        with mock.patch.object(Command, "_copy_live_config", sync_meanwhile):
+            self._run()
+
+        live = self.client_.indices["simpletix_events"]
+        self.assertEqual(live[renamed.pk]["title"], "Renamed")
+        self.assertNotIn(deleted.pk, live)
+        self.assertFalse(SearchIndexOutbox.objects.exists())
+        self.assertIsNone(search_sync.reindex_started())
+
+    def test_failure_leaves_resumable_checkpoint(self):
+        self.client_.fail_after = 1
+        with mock.patch("events.management.commands.reindex_algolia.time.sleep"):
+            with self.assertRaises(RuntimeError):
+                self._run(workers=1)
+
+        state = json.loads(self.checkpoint.read_text())
+        self.assertEqual(state["last_id"], self.events[1].pk)
+
+        # Resume: the tmp index isn't cleared, only the remaining events go out.
+        self.client_.fail_after = None
+        self.client_.calls.clear()
+        self._run(resume=True)
+
+        self.assertNotIn("clear_objects", [c[0] for c in self.client_.calls])
+        live = self.client_.indices["simpletix_events"]
+        self.assertEqual(set(live), {e.pk for e in self.events})
+
+    def test_throttle_sleeps_between_batches(self):
+        with mock.patch(
+            "events.management.commands.reindex_algolia.time.sleep"
+        ) as sleep:
+            self._run(max_batches_per_second=1000)
+        self.assertTrue(sleep.called)
+
+    def test_errors_when_algolia_unavailable(self):
+        with mock.patch.object(search_sync, "_get_index", return_value=None):
+            with self.assertRaises(CommandError):
+                call_command("reindex_algolia", stdout=mock.MagicMock())
@@ -0,0 +1,186 @@
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import OrganizerProfile
+from config.metrics import render_metrics
+from events import search_sync
+from events.models import Event, SearchIndexOutbox
+
+
+class FakeAlgoliaClient:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.saved = []
+        self.deleted = []
+
+    def save_objects(self, index_name, objects):
+        if self.fail:
+            raise RuntimeError("algolia down")
+        self.saved.append((index_name, objects))
+
+    def delete_objects(self, index_name, object_ids):
+        if self.fail:
+            raise RuntimeError("algolia down")
+        self.deleted.append((index_name, object_ids))
+
+
+class FakeAdapter:
+    index_name = "test_events"
+
+    def get_raw_record(self, instance):
+        return {"objectID": instance.pk, "title": instance.title}
+
+
+@override_settings(ALGOLIA_ENABLED=True)
+class AlgoliaOutboxTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Outbox Event", date=date(2030, 1, 1), time=time(12, 0)
+        )
+        # Start from an empty outbox (saving the event queued it).
+        SearchIndexOutbox.objects.all().delete()
+        self.client_ = FakeAlgoliaClient()
+        self.index = (self.client_, FakeAdapter())
+
+    def test_repeated_updates_coalesce_into_one_row(self):
+        for _ in range(3):
+            search_sync.queue_index_update(self.event.id, "save")
+        search_sync.queue_index_update(self.event.id, "delete")
+
+        entry = SearchIndexOutbox.objects.get()
+        self.assertEqual(entry.event_id, self.event.id)
+        self.assertEqual(entry.action, "delete")
+
+    def test_flush_pushes_saves_and_deletes_in_batches(self):
+        other = Event.objects.create(
+            title="Other", date=date(2030, 1, 2), time=time(12, 0)
+        )
+        search_sync.queue_index_update(self.event.id, "save")
+        search_sync.queue_index_update(other.id, "save")
+        search_sync.queue_index_update(999999, "delete")
+
+        self.assertEqual(search_sync.flush_outbox(index=self.index), 3)
+
+        self.assertEqual(len(self.client_.saved), 1)
+        index_name, objects = self.client_.saved[0]
+        self.assertEqual(index_name, "test_events")
+        self.assertEqual({o["objectID"] for o in objects}, {self.event.id, other.id})
+        self.assertEqual(self.client_.deleted, [("test_events", ["999999"])])
+        self.assertFalse(SearchIndexOutbox.objects.exists())
+
+    def test_save_for_deleted_event_becomes_delete(self):
+        search_sync.queue_index_update(self.event.id, "save")
+        event_id = self.event.id
+        self.event.delete()
+
+        search_sync.flush_outbox(index=self.index)
+
+        self.assertEqual(self.client_.saved, [])
+        self.assertEqual(self.client_.deleted, [("test_events", [str(event_id)])])
+
+    def test_failure_keeps_entries_and_backs_off(self):
+        search_sync.queue_index_update(self.event.id, "save")
+
+        pushed = search_sync.flush_outbox(
+            index=(FakeAlgoliaClient(fail=True), FakeAdapter())
+        )
+
+        self.assertEqual(pushed, 0)
+        entry = SearchIndexOutbox.objects.get()
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn("algolia down", entry.last_error)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+        # Not due yet, so nothing is retried immediately.
+        self.assertEqual(search_sync.flush_outbox(index=self.index), 0)
+
+    def test_entry_requeued_during_flush_is_kept(self):
+        search_sync.queue_index_update(self.event.id, "save")
+        client = self.client_
+
+        def requeue_then_save(index_name, objects):
+            search_sync.queue_index_update(self.event.id, "save")
+            FakeAlgoliaClient.save_objects(client, index_name, objects)
+
+        client.save_objects = requeue_then_save
+        search_sync.flush_outbox(index=self.index)
+
+        self.assertTrue(
+            SearchIndexOutbox.objects.filter(event_id=self.event.id).exists()
+        )
+
+    def test_lag_metric(self):
+        self.assertEqual(search_sync.outbox_lag_seconds(), 0.0)
+        search_sync.queue_index_update(self.event.id, "save")
+        SearchIndexOutbox.objects.update(
+            queued_at=timezone.now() - timedelta(seconds=30)
+        )
+        self.assertGreaterEqual(search_sync.outbox_lag_seconds(), 30)
+        with self.settings(ALGOLIA={"APPLICATION_ID": "app"}):
+            [sample] = [
+                line
+                for line in render_metrics().splitlines()
+                if line.startswith("algolia_outbox_lag_seconds ")
+            ]
+        self.assertGreaterEqual(float(sample.split()[1]), 30)
+
+    def test_sync_command_drains_outbox(self):
+        search_sync.queue_index_update(self.event.id, "save")
+        with mock.patch.object(search_sync, "_get_index", return_value=self.index):
+            call_command("sync_algolia", stdout=mock.MagicMock())
+        self.assertFalse(SearchIndexOutbox.objects.exists())
+        self.assertEqual(len(self.client_.saved), 1)
+
+    @override_settings(ALGOLIA_ENABLED=False)
+    def test_flush_is_noop_when_algolia_disabled(self):
+        search_sync.queue_index_update(self.event.id, "save")
+        self.assertEqual(search_sync.flush_outbox(index=self.index), 0)
+
+
+@override_settings(ALGOLIA_ENABLED=True)
+class EventViewsQueueIndexUpdatesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="outboxorg", password="pass123")
+        self.organizer = OrganizerProfile.objects.create(user=self.user)
+        self.event = Event.objects.create(
+            title="Queued",
+            date=date(2030, 1, 1),
+            time=time(12, 0),
+            location="Here",
+            organizer=self.organizer,
+        )
+        self.client.login(username="outboxorg", password="pass123")
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+
+    def test_delete_event_queues_delete_without_calling_algolia(self):
+        with mock.patch.object(search_sync, "_push") as push:
+            self.client.post(reverse("events:delete_event", args=[self.event.id]))
+        push.assert_not_called()
+
+        entry = SearchIndexOutbox.objects.get(event_id=self.event.id)
+        self.assertEqual(entry.action, "delete")
+
+    def test_saves_and_deletes_outside_the_views_are_queued(self):
+        SearchIndexOutbox.objects.all().delete()
+        self.event.title = "Edited in the admin"
+        self.event.save()
+        entry = SearchIndexOutbox.objects.get(event_id=self.event.id)
+        self.assertEqual(entry.action, "save")
+
+        event_id = self.event.id
+        self.event.delete()
+        entry = SearchIndexOutbox.objects.get(event_id=event_id)
+        self.assertEqual(entry.action, "delete")
+
+    @override_settings(ALGOLIA_ENABLED=False)
+    def test_nothing_is_queued_when_algolia_disabled(self):
+        SearchIndexOutbox.objects.all().delete()
+        self.client.post(reverse("events:delete_event", args=[self.event.id]))
+        self.assertFalse(SearchIndexOutbox.objects.exists())
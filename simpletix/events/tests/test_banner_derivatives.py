@@ -0,0 +1,147 @@
+import shutil
+import tempfile
+from datetime import date, time
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from events import images
+from events.models import Event
+
+
+def make_image(width=2000, height=1000, fmt="PNG", mode="RGBA"):
+    buffer = BytesIO()
+    Image.new(mode, (width, height), (200, 40, 90, 255)[: len(mode)]).save(buffer, fmt)
+    ext = "png" if fmt == "PNG" else "jpg"
+    return SimpleUploadedFile(f"banner.{ext}", buffer.getvalue())
+
+
+class BannerDerivativeTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": self.media, "base_url": "/media/"},
+                },
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage."
+                    "StaticFilesStorage",
+                },
+            },
+            BANNER_DERIVATIVES_ASYNC=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create_event(self, banner):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(
+                title="Banner Event",
+                date=date(2030, 1, 1),
+                time=time(12, 0),
+                location="Here",
+                banner=banner,
+            )
+        event.refresh_from_db()
+        return event
+
+    def test_upload_builds_derivatives_after_commit(self):
+        event = self.create_event(make_image())
+
+        derivatives = event.banner_derivatives
+        self.assertEqual(derivatives["source"], event.banner.name)
+        self.assertEqual((derivatives["width"], derivatives["height"]), (2000, 1000))
+        for key in ("webp", "jpeg"):
+            self.assertEqual(
+                [width for width, _ in derivatives[key]], list(images.BANNER_WIDTHS)
+            )
+            for width, name in derivatives[key]:
+                self.assertTrue(default_storage.exists(name))
+                with default_storage.open(name) as fh:
+                    self.assertEqual(Image.open(fh).size, (width, width // 2))
+
+    def test_small_banner_is_not_upscaled(self):
+        event = self.create_event(make_image(200, 100, fmt="JPEG", mode="RGB"))
+        self.assertEqual([w for w, _ in event.banner_derivatives["webp"]], [200])
+
+    def test_nothing_is_built_inside_the_request_transaction(self):
+        with patch("events.images.build_banner_derivatives") as build:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                Event.objects.create(
+                    title="Later",
+                    date=date(2030, 1, 1),
+                    time=time(12, 0),
+                    banner=make_image(),
+                )
+            build.assert_not_called()
+            self.assertEqual(len(callbacks), 1)
+
+    @override_settings(BANNER_DERIVATIVES_ASYNC=True)
+    def test_async_mode_submits_to_background_worker(self):
+        with patch.object(images, "_executor") as executor:
+            self.create_event(make_image())
+        executor.submit.assert_called_once()
+        self.assertIs(
+            executor.submit.call_args.args[0], images.build_banner_derivatives
+        )
+
+    def test_card_uses_srcset_once_derivatives_exist(self):
+        event = self.create_event(make_image())
+        html = self.client.get(reverse("events:event_list")).content.decode()
+
+        self.assertIn("<picture>", html)
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(" 320w, ", html)
+        self.assertNotIn(f'src="{event.banner.url}"', html)
+
+    def test_stale_derivatives_are_ignored_and_cleaned_up(self):
+        event = self.create_event(make_image())
+        old_names = [name for _, name in event.banner_derivatives["webp"]]
+
+        event.banner = make_image(1000, 500, fmt="JPEG", mode="RGB")
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            event.save()
+        # Until the rebuild runs, the card falls back to the new original.
+        self.assertIsNone(event.banner_srcset)
+
+        for callback in callbacks:
+            callback()
+        event.refresh_from_db()
+        self.assertEqual(event.banner_derivatives["source"], event.banner.name)
+        self.assertIsNotNone(event.banner_srcset)
+        for name in old_names:
+            self.assertFalse(default_storage.exists(name))
+
+    def test_broken_image_is_logged_not_raised(self):
+        with self.assertLogs("events.images", "ERROR"):
+            event = self.create_event(SimpleUploadedFile("bad.png", b"not a png"))
+        self.assertEqual(event.banner_derivatives, {})
+
+    def test_command_backfills_and_reports(self):
+        with patch("events.models.schedule_banner_derivatives"):
+            event = Event.objects.create(
+                title="Old",
+                date=date(2030, 1, 1),
+                time=time(12, 0),
+                banner=make_image(fmt="JPEG", mode="RGB"),
+            )
+        out = StringIO()
+        call_command("build_banner_derivatives", "--report", stdout=out)
+
+        event.refresh_from_db()
+        self.assertEqual(event.banner_derivatives["source"], event.banner.name)
+        self.assertIn("Built derivatives for 1 events", out.getvalue())
+        self.assertIn("960w WebP", out.getvalue())
+
+        out = StringIO()
+        call_command("build_banner_derivatives", stdout=out)
+        self.assertIn("Built derivatives for 0 events", out.getvalue())
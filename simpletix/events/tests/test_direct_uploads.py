@@ -0,0 +1,428 @@
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import OrganizerProfile
+from events import uploads
+from events.forms import EventForm
+from events.models import Event
+from tickets.models import TicketInfo
+
+PART = uploads.MIN_PART_SIZE
+
+
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": os.path.join(self.tmp, "media")},
+                },
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage."
+                    "StaticFilesStorage",
+                },
+            },
+            DIRECT_UPLOAD_BACKEND="local",
+            DIRECT_UPLOAD_LOCAL_DIR=os.path.join(self.tmp, "uploads"),
+            DIRECT_UPLOAD_PART_SIZE=PART,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(username="uploader", password="pass123")
+        self.organizer = OrganizerProfile.objects.create(user=self.user)
+        self.login(self.user)
+
+    def login(self, user):
+        self.client.force_login(user)
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+
+    def api(self, name, payload):
+        return self.client.post(
+            reverse(f"events:{name}"),
+            json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def start(self, size, field="video", content_type="video/mp4"):
+        response = self.api(
+            "upload_start",
+            {
+                "field": field,
+                "filename": "../My Clip.mp4",
+                "content_type": content_type,
+                "size": size,
+            },
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def put_parts(self, session, data, numbers):
+        urls = self.api(
+            "upload_parts", {"token": session["token"], "parts": numbers}
+        ).json()["urls"]
+        etags = {}
+        for number in numbers:
+            chunk = data[(number - 1) * PART : number * PART]
+            response = self.client.generic("PUT", urls[str(number)], chunk)
+            self.assertEqual(response.status_code, 200)
+            etags[str(number)] = response["ETag"]
+        return etags
+
+    def test_chunked_upload_resumes_and_completes(self):
+        data = os.urandom(PART + 1000)
+        session = self.start(len(data))
+        self.assertEqual(session["part_count"], 2)
+        self.assertTrue(session["key"].startswith("event_videos/"))
+        self.assertTrue(session["key"].endswith("/My_Clip.mp4"))
+
+        # The connection drops after part 1; the client asks what's stored.
+        self.put_parts(session, data, [1])
+        stored = self.api("upload_status", {"token": session["token"]}).json()
+        self.assertEqual(list(stored["parts"]), ["1"])
+
+        etags = {**stored["parts"], **self.put_parts(session, data, [2])}
+        response = self.api(
+            "upload_complete", {"token": session["token"], "parts": etags}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with default_storage.open(session["key"]) as fh:
+            self.assertEqual(fh.read(), data)
+        self.assertEqual(
+            uploads.resolve_upload(response.json()["reference"], "video", self.user),
+            session["key"],
+        )
+
+    def test_event_form_attaches_uploaded_object(self):
+        data = os.urandom(2048)
+        session = self.start(len(data))
+        etags = self.put_parts(session, data, [1])
+        reference = self.api(
+            "upload_complete", {"token": session["token"], "parts": etags}
+        ).json()["reference"]
+
+        response = self.client.post(
+            reverse("events:create_event"),
+            {
+                "title": "Uploaded",
+                "description": "",
+                "date": "2030-05-01",
+                "time": "20:00",
+                "location": "Hall",
+                "video_upload": reference,
+                "ticketInfo-TOTAL_FORMS": "1",
+                "ticketInfo-INITIAL_FORMS": "0",
+                "ticketInfo-MIN_NUM_FORMS": "0",
+                "ticketInfo-MAX_NUM_FORMS": "3",
+                "ticketInfo-0-category": "VIP",
+                "ticketInfo-0-price": "50",
+                "ticketInfo-0-availability": "5",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        event = Event.objects.get(title="Uploaded")
+        self.assertEqual(event.video.name, session["key"])
+        self.assertTrue(TicketInfo.objects.filter(event=event).exists())
+
+    def test_banner_upload_must_be_a_raster_image(self):
+        png = BytesIO()
+        Image.new("RGB", (4, 4), "red").save(png, "PNG")
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script/></svg>'
+        for data, content_type, valid in (
+            (png.getvalue(), "image/png", True),
+            (svg, "image/svg+xml", False),
+            (os.urandom(500), "image/png", False),
+        ):
+            session = self.start(len(data), "banner", content_type)
+            etags = self.put_parts(session, data, [1])
+            reference = self.api(
+                "upload_complete", {"token": session["token"], "parts": etags}
+            ).json()["reference"]
+            form = EventForm(
+                {
+                    "title": "Banner",
+                    "date": "2030-05-01",
+                    "time": "20:00",
+                    "location": "Hall",
+                    "banner_upload": reference,
+                },
+                user=self.user,
+            )
+            self.assertEqual(form.is_valid(), valid, content_type)
+            self.assertEqual(default_storage.exists(session["key"]), valid)
+            if valid:
+                self.assertEqual(form.cleaned_data["banner"], session["key"])
+            else:
+                self.assertIn("JPEG, PNG", form.errors["banner"][0])
+
+    def test_reference_is_bound_to_user_and_field(self):
+        data = os.urandom(100)
+        session = self.start(len(data))
+        etags = self.put_parts(session, data, [1])
+        reference = self.api(
+            "upload_complete", {"token": session["token"], "parts": etags}
+        ).json()["reference"]
+
+        other = User.objects.create_user(username="other", password="pass123")
+        with self.assertRaises(uploads.UploadError):
+            uploads.resolve_upload(reference, "video", other)
+        with self.assertRaises(uploads.UploadError):
+            uploads.resolve_upload(reference, "banner", self.user)
+        with self.assertRaises(uploads.UploadError):
+            uploads.resolve_upload("tampered", "video", self.user)
+
+        # Another organizer can't drive this upload session either.
+        self.login(other)
+        response = self.api("upload_status", {"token": session["token"]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_start_validates_type_and_size(self):
+        for payload in (
+            {"field": "video", "content_type": "text/html", "size": 10},
+            {"field": "banner", "content_type": "image/png", "size": 10**9},
+            {"field": "banner", "content_type": "image/png", "size": "10"},
+            {"field": "other", "content_type": "image/png", "size": 10},
+        ):
+            response = self.api("upload_start", payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn("error", response.json())
+
+    def test_complete_rejects_missing_parts(self):
+        data = os.urandom(PART + 10)
+        session = self.start(len(data))
+        etags = self.put_parts(session, data, [1])
+        response = self.api(
+            "upload_complete", {"token": session["token"], "parts": etags}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("missing", response.json()["error"])
+
+    def test_stored_object_is_checked_not_the_declared_size(self):
+        session = self.start(100)
+        # Nothing stops a client PUTting more than it declared.
+        etags = self.put_parts(session, os.urandom(2000), [1])
+        with self.settings(DIRECT_UPLOAD_MAX_SIZE={"video": 1000}):
+            response = self.api(
+                "upload_complete", {"token": session["token"], "parts": etags}
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too large", response.json()["error"])
+        self.assertFalse(default_storage.exists(session["key"]))
+
+    def test_part_numbers_are_checked(self):
+        session = self.start(100)
+        for parts in ([2], [0], [], "x"):
+            response = self.api(
+                "upload_parts", {"token": session["token"], "parts": parts}
+            )
+            self.assertEqual(response.status_code, 400, parts)
+
+    def test_chunk_larger_than_part_is_rejected(self):
+        session = self.start(100)
+        url = self.api(
+            "upload_parts", {"token": session["token"], "parts": [1]}
+        ).json()["urls"]["1"]
+        response = self.client.generic("PUT", url, b"x" * (PART + 1))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.generic("PUT", url[:-3] + "xx/", b"x")
+        self.assertEqual(response.status_code, 400)
+
+    def test_abort_discards_staged_parts(self):
+        data = os.urandom(100)
+        session = self.start(len(data))
+        self.put_parts(session, data, [1])
+        self.assertEqual(
+            self.api("upload_abort", {"token": session["token"]}).status_code, 200
+        )
+        response = self.api("upload_status", {"token": session["token"]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_taken_key_leaves_no_copy_behind(self):
+        data = os.urandom(100)
+        session = self.start(len(data))
+        etags = self.put_parts(session, data, [1])
+        default_storage.save(session["key"], ContentFile(b"first"))
+        response = self.api(
+            "upload_complete", {"token": session["token"], "parts": etags}
+        )
+        self.assertEqual(response.status_code, 400)
+        directory = posixpath.dirname(session["key"])
+        self.assertEqual(len(default_storage.listdir(directory)[1]), 1)
+
+    def test_stale_uploads_are_purged(self):
+        staging = os.path.join(self.tmp, "uploads")
+        self.put_parts(self.start(100), os.urandom(100), [1])
+        [stale] = os.listdir(staging)
+        day_ago = time.time() - 2 * 24 * 3600
+        os.utime(os.path.join(staging, stale), (day_ago, day_ago))
+        self.start(100)
+
+        out = StringIO()
+        call_command("purge_uploads", stdout=out)
+        self.assertIn("aborted 1 stale uploads", out.getvalue())
+        self.assertNotIn(stale, os.listdir(staging))
+        self.assertEqual(len(os.listdir(staging)), 1)
+
+    def test_endpoints_require_post_json(self):
+        self.assertEqual(
+            self.client.get(reverse("events:upload_start")).status_code, 405
+        )
+        response = self.client.post(
+            reverse("events:upload_start"), "nope", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class S3MultipartBackendTests(TestCase):
+    def setUp(self):
+        self.storage = MagicMock(bucket_name="media-bucket")
+        self.storage._normalize_name.side_effect = lambda name: name
+        self.s3 = self.storage.connection.meta.client
+        self.backend = uploads.S3MultipartBackend(self.storage)
+
+    def test_protocol_maps_onto_s3_multipart_api(self):
+        self.s3.create_multipart_upload.return_value = {"UploadId": "up-1"}
+        self.s3.generate_presigned_url.side_effect = (
+            lambda op, Params, ExpiresIn: f"https://s3/{Params['PartNumber']}"
+        )
+        self.s3.get_paginator.return_value.paginate.return_value = [
+            {"Parts": [{"PartNumber": 1, "ETag": '"a"'}]}
+        ]
+
+        self.assertEqual(self.backend.start("event_videos/x.mp4", "video/mp4"), "up-1")
+        self.assertEqual(
+            self.backend.part_urls("event_videos/x.mp4", "up-1", [1, 2], PART),
+            {1: "https://s3/1", 2: "https://s3/2"},
+        )
+        self.assertEqual(
+            self.backend.uploaded_parts("event_videos/x.mp4", "up-1"), {1: '"a"'}
+        )
+        self.backend.complete("event_videos/x.mp4", "up-1", {2: '"b"', 1: '"a"'})
+        self.s3.complete_multipart_upload.assert_called_once_with(
+            Bucket="media-bucket",
+            Key="event_videos/x.mp4",
+            UploadId="up-1",
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": 1, "ETag": '"a"'},
+                    {"PartNumber": 2, "ETag": '"b"'},
+                ]
+            },
+        )
+
+    def test_stored_object_of_the_wrong_type_is_deleted(self):
+        self.s3.head_object.return_value = {
+            "ContentLength": 10,
+            "ContentType": "image/png",
+        }
+        uploads._check_stored(self.backend, "banners/x.png", "banner")
+        self.s3.delete_object.assert_not_called()
+
+        self.s3.head_object.return_value["ContentType"] = "text/html"
+        with self.assertRaisesMessage(uploads.UploadError, "image/*"):
+            uploads._check_stored(self.backend, "banners/x.png", "banner")
+        self.s3.delete_object.assert_called_once_with(
+            Bucket="media-bucket", Key="banners/x.png"
+        )
+
+        self.s3.head_object.return_value = {
+            "ContentLength": 10**12,
+            "ContentType": "video/mp4",
+        }
+        with self.assertRaisesMessage(uploads.UploadError, "too large"):
+            uploads._check_stored(self.backend, "event_videos/x.mp4", "video")
+
+    def test_purge_aborts_old_multipart_uploads(self):
+        now = timezone.now()
+        self.s3.get_paginator.return_value.paginate.side_effect = lambda **kw: [
+            {
+                "Uploads": [
+                    {
+                        "Key": f"{kw['Prefix']}old",
+                        "UploadId": "old",
+                        "Initiated": now - timedelta(days=2),
+                    },
+                    {"Key": f"{kw['Prefix']}new", "UploadId": "new", "Initiated": now},
+                ]
+            }
+        ]
+        self.assertEqual(self.backend.purge_stale(now - timedelta(days=1)), 2)
+        self.s3.get_paginator.assert_called_with("list_multipart_uploads")
+        self.s3.abort_multipart_upload.assert_any_call(
+            Bucket="media-bucket", Key="banners/old", UploadId="old"
+        )
+        self.assertEqual(self.s3.abort_multipart_upload.call_count, 2)
+
+    def test_purge_skips_uploads_already_aborted_elsewhere(self):
+        now = timezone.now()
+        self.s3.exceptions.ClientError = ClientError
+        self.s3.get_paginator.return_value.paginate.return_value = [
+            {
+                "Uploads": [
+                    {"Key": "banners/a", "UploadId": "gone", "Initiated": now},
+                    {"Key": "banners/b", "UploadId": "old", "Initiated": now},
+                ]
+            }
+        ]
+        self.s3.abort_multipart_upload.side_effect = [
+            ClientError({"Error": {"Code": "NoSuchUpload"}}, "AbortMultipartUpload"),
+            {},
+        ] * len(uploads.UPLOAD_FIELDS)
+        purged = self.backend.purge_stale(now + timedelta(seconds=1))
+        self.assertEqual(purged, len(uploads.UPLOAD_FIELDS))
+
+        self.s3.abort_multipart_upload.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied"}}, "AbortMultipartUpload"
+        )
+        with self.assertRaises(ClientError):
+            self.backend.purge_stale(now + timedelta(seconds=1))
+
+    @override_settings(DIRECT_UPLOAD_BACKEND="s3")
+    def test_local_chunk_endpoint_is_disabled_for_s3(self):
+        response = self.client.generic(
+            "PUT", reverse("events:upload_chunk", args=["token"]), b"x"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_large_files_get_larger_parts(self):
+        size = PART * uploads.MAX_PARTS * 3
+        self.assertLessEqual(-(-size // uploads._part_size(size)), uploads.MAX_PARTS)
+
+
+class DirectUploadTemplateTests(TestCase):
+    def test_create_page_wires_up_direct_upload(self):
+        user = User.objects.create_user(username="tpl", password="pass123")
+        OrganizerProfile.objects.create(user=user)
+        self.client.force_login(user)
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+
+        html = self.client.get(reverse("events:create_event")).content.decode()
+        self.assertIn("direct_upload.js", html)
+        self.assertIn('data-direct-upload="video"', html)
+        self.assertIn('name="video_upload"', html)
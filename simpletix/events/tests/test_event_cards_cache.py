@@ -0,0 +1,82 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import OrganizerProfile
+from events import cards
+from events.models import Event
+from tickets.models import TicketInfo
+
+
+class EventCardCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="cardorg", password="pass123")
+        self.organizer = OrganizerProfile.objects.create(user=self.user)
+        self.event = Event.objects.create(
+            title="Cached Show",
+            date=date(2031, 5, 1),
+            time=time(20, 0),
+            location="Hall",
+            organizer=self.organizer,
+        )
+        self.ticket = TicketInfo.objects.create(
+            event=self.event, category="VIP", price=50, availability=5
+        )
+
+    def _list_html(self):
+        return self.client.get(reverse("events:event_list")).content.decode()
+
+    def test_card_is_rendered_once_then_served_from_cache(self):
+        self.assertIn("5 left", self._list_html())
+
+        with self.assertNumQueries(1):
+            html = self._list_html()
+        self.assertIn("Cached Show", html)
+
+    def test_inventory_change_invalidates_card(self):
+        self.assertIn("5 left", self._list_html())
+
+        self.ticket.availability = 0
+        self.ticket.save()
+
+        html = self._list_html()
+        self.assertNotIn("5 left", html)
+        self.assertIn("Sold out", html)
+
+    def test_edit_event_invalidates_card(self):
+        self.assertIn("Cached Show", self._list_html())
+
+        self.client.login(username="cardorg", password="pass123")
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+        self.client.post(
+            reverse("events:edit_event", args=[self.event.id]),
+            {
+                "title": "Renamed Show",
+                "description": "",
+                "date": "2031-05-01",
+                "time": "20:00",
+                "location": "Hall",
+                "ticketInfo-TOTAL_FORMS": "1",
+                "ticketInfo-INITIAL_FORMS": "1",
+                "ticketInfo-MIN_NUM_FORMS": "0",
+                "ticketInfo-MAX_NUM_FORMS": "3",
+                "ticketInfo-0-id": str(self.ticket.id),
+                "ticketInfo-0-category": "VIP",
+                "ticketInfo-0-price": "50",
+                "ticketInfo-0-availability": "5",
+            },
+        )
+
+        html = self._list_html()
+        self.assertIn("Renamed Show", html)
+        self.assertNotIn("Cached Show", html)
+
+    def test_availability_version_survives_eviction(self):
+        before = cards.availability_versions([self.event.id])[self.event.id]
+        cards.bump_availability_version(self.event.id)
+        after = cards.availability_versions([self.event.id])[self.event.id]
+        self.assertNotEqual(before, after)
@@ -0,0 +1,145 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from accounts.models import OrganizerProfile
+from events.models import Event
+from tickets.models import TicketInfo
+
+
+class EventConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="cgorg", password="pass123")
+        self.organizer = OrganizerProfile.objects.create(user=self.user)
+        self.event = Event.objects.create(
+            title="Conditional Show",
+            date=date(2031, 5, 1),
+            time=time(20, 0),
+            location="Hall",
+            organizer=self.organizer,
+        )
+        self.ticket = TicketInfo.objects.create(
+            event=self.event, category="VIP", price=50, availability=5
+        )
+        self.detail_url = reverse("events:event_detail", args=[self.event.id])
+        self.list_url = reverse("events:event_list")
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_detail_unchanged_is_304_without_rendering(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertIn("private", first["Cache-Control"])
+
+        with self.assertNumQueries(1), self.assertTemplateNotUsed(
+            "events/event_detail.html"
+        ):
+            second = self.revalidate(self.detail_url, first)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+
+    def test_detail_if_modified_since(self):
+        first = self.client.get(self.detail_url)
+        second = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(second.status_code, 304)
+
+        third = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(third.status_code, 200)
+
+    def test_detail_changes_with_event_and_availability(self):
+        first = self.client.get(self.detail_url)
+
+        self.ticket.availability = 4
+        self.ticket.save()
+        second = self.revalidate(self.detail_url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, "4 left")
+
+        self.event.title = "Renamed"
+        self.event.save()
+        third = self.revalidate(self.detail_url, second)
+        self.assertEqual(third.status_code, 200)
+        self.assertContains(third, "Renamed")
+
+    def test_missing_event_still_404s(self):
+        response = self.client.get(reverse("events:event_detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_viewer_is_part_of_the_etag(self):
+        anonymous = self.client.get(self.detail_url)
+
+        self.client.login(username="cgorg", password="pass123")
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+        organizer = self.revalidate(self.detail_url, anonymous)
+        self.assertEqual(organizer.status_code, 200)
+        self.assertContains(organizer, "Edit Event")
+        self.assertNotIn("Last-Modified", organizer)
+
+        self.assertEqual(self.revalidate(self.detail_url, organizer).status_code, 304)
+
+        # Profile changes show in the nav bar, so they invalidate too.
+        self.organizer.full_name = "New Name"
+        self.organizer.save()
+        self.assertEqual(self.revalidate(self.detail_url, organizer).status_code, 200)
+
+    def test_pending_messages_are_never_short_circuited(self):
+        first = self.client.get(self.detail_url)
+
+        storage = CookieStorage(RequestFactory().get("/"))
+        self.client.cookies[storage.cookie_name] = storage._encode(
+            [Message(constants.SUCCESS, "Event updated successfully!")]
+        )
+        response = self.revalidate(self.detail_url, first)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Event updated successfully!")
+
+    def test_list_unchanged_is_304_with_one_query(self):
+        first = self.client.get(self.list_url)
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(1), self.assertTemplateNotUsed(
+            "events/event_list.html"
+        ):
+            second = self.revalidate(self.list_url, first)
+        self.assertEqual(second.status_code, 304)
+
+    def test_list_changes_with_new_events_and_availability(self):
+        first = self.client.get(self.list_url)
+
+        Event.objects.create(title="Another", date=date(2031, 6, 1), time=time(9, 0))
+        second = self.revalidate(self.list_url, first)
+        self.assertEqual(second.status_code, 200)
+
+        self.ticket.availability = 0
+        self.ticket.save()
+        third = self.revalidate(self.list_url, second)
+        self.assertEqual(third.status_code, 200)
+        self.assertContains(third, "Sold out")
+
+    def test_list_filters_are_part_of_the_etag(self):
+        first = self.client.get(self.list_url)
+        filtered = self.client.get(
+            self.list_url, {"from": "2031-05-01"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(filtered.status_code, 200)
+
+    @override_settings(MEDIA_URL_CACHE_BUCKET_SECONDS=1)
+    def test_media_url_bucket_rollover_revalidates(self):
+        first = self.client.get(self.detail_url)
+        with self.settings(MEDIA_URL_CACHE_BUCKET_SECONDS=10**10):
+            second = self.revalidate(self.detail_url, first)
+        self.assertEqual(second.status_code, 200)
@@ -0,0 +1,81 @@
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+
+from events import views
+from events.models import Event
+from events.pagination import decode_cursor, encode_cursor
+from tickets.models import TicketInfo
+
+
+class EventListPaginationTests(TestCase):
+    def setUp(self):
+        self.page_size = views.EVENT_LIST_PAGE_SIZE
+        start = date(2030, 1, 1)
+        # Two events per day at the same time so the id tiebreak matters.
+        for i in range(self.page_size + 5):
+            event = Event.objects.create(
+                title=f"Event {i}",
+                description="x" * 1000,
+                date=start + timedelta(days=i // 2),
+                time=time(19, 0),
+                location="Somewhere",
+            )
+            for category in ("General Admission", "VIP"):
+                TicketInfo.objects.create(
+                    event=event, category=category, price=10, availability=i
+                )
+
+    def test_first_page_is_bounded_and_ordered(self):
+        response = self.client.get(reverse("events:event_list"))
+        events = response.context["events"]
+
+        self.assertEqual(len(events), self.page_size)
+        keys = [(e.starts_at, e.id) for e in events]
+        self.assertEqual(keys, sorted(keys))
+        self.assertIsNotNone(response.context["next_cursor"])
+
+    def test_cursor_walks_to_last_page_without_overlap(self):
+        first = self.client.get(reverse("events:event_list"))
+        second = self.client.get(
+            reverse("events:event_list"), {"cursor": first.context["next_cursor"]}
+        )
+
+        first_ids = {e.id for e in first.context["events"]}
+        second_ids = {e.id for e in second.context["events"]}
+        self.assertEqual(len(second_ids), 5)
+        self.assertFalse(first_ids & second_ids)
+        self.assertIsNone(second.context["next_cursor"])
+
+    def test_query_count_is_constant(self):
+        # cold cache: one query for events + one for the missing cards' badges
+        with self.assertNumQueries(2):
+            self.client.get(reverse("events:event_list"))
+
+        for i in range(10):
+            Event.objects.create(
+                title=f"Extra {i}", date=date(2029, 1, 1), time=time(9, 0)
+            )
+        with self.assertNumQueries(2):
+            self.client.get(reverse("events:event_list"))
+
+        # warm cache: the cards come from the fragment cache
+        with self.assertNumQueries(1):
+            self.client.get(reverse("events:event_list"))
+
+    def test_description_is_deferred(self):
+        response = self.client.get(reverse("events:event_list"))
+        event = response.context["events"][0]
+        self.assertIn("description", event.get_deferred_fields())
+
+    def test_bad_cursor_restarts_from_first_page(self):
+        response = self.client.get(reverse("events:event_list"), {"cursor": "!!"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["events"]), self.page_size)
+
+    def test_cursor_round_trip(self):
+        event = Event.objects.order_by("id").first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(event)), (event.starts_at, event.id)
+        )
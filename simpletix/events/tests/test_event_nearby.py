@@ -0,0 +1,122 @@
+from datetime import date, time
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events import geo
+from events.models import Event
+
+
+def _event(title, lat=None, lng=None):
+    return Event.objects.create(
+        title=title,
+        date=date(2030, 1, 1),
+        time=time(12, 0),
+        location=title,
+        latitude=lat,
+        longitude=lng,
+    )
+
+
+class GeoHelpersTests(TestCase):
+    def test_encode_geohash_known_value(self):
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744), "u4pruydqq")
+
+    def test_save_maintains_geohash(self):
+        event = _event("Somewhere", 40.7128, -74.0060)
+        self.assertEqual(event.geohash, geo.encode_geohash(40.7128, -74.0060))
+
+        event.latitude = event.longitude = None
+        event.save()
+        self.assertEqual(event.geohash, "")
+
+    def test_covering_cells_cover_the_box_with_few_cells(self):
+        box = geo.bounding_box(40.7128, -74.0060, 5)
+        cells = geo.covering_cells(*box)
+        self.assertLessEqual(len(cells), geo.MAX_COVER_CELLS)
+        for lat in (box[0], box[2]):
+            for lng in (box[1], box[3]):
+                point = geo.encode_geohash(lat, lng)
+                self.assertTrue(any(point.startswith(c) for c in cells))
+
+    def test_circle_across_the_antimeridian_is_split(self):
+        box = geo.bounding_box(0.0, 179.99, 20)
+        self.assertGreater(box[3], 180)
+        east, west = geo.split_antimeridian(box)
+        self.assertEqual(east[3], 180.0)
+        self.assertEqual(west[1], -180.0)
+        self.assertAlmostEqual(west[3], box[3] - 360)
+
+        near_east = _event("Fiji side", 0.0, 179.95)
+        near_west = _event("Samoa side", 0.0, -179.95)
+        _event("Far", 0.0, -170.0)
+        found = geo.find_nearby(Event.objects.all(), 0.0, 179.99, radius_km=20)
+        self.assertEqual([i for i, _ in found], [near_east.id, near_west.id])
+
+    def test_rows_outside_the_box_are_not_fetched(self):
+        _event("Inside", 40.7580, -73.9855)
+        # In the same covering cells, but well outside a 1 km box.
+        outside = _event("Outside", 40.7580, -73.9600)
+        with CaptureQueriesContext(connection) as ctx:
+            found = geo.find_nearby(Event.objects.all(), 40.7580, -73.9855, 1)
+        self.assertNotIn(outside.id, [i for i, _ in found])
+        self.assertIn('"latitude" BETWEEN', ctx.captured_queries[0]["sql"])
+
+    def test_haversine(self):
+        # JFK -> LAX is roughly 3983 km
+        km = geo.haversine_km(40.6413, -73.7781, [33.9416], [-118.4085])[0]
+        self.assertAlmostEqual(km, 3983, delta=10)
+
+
+class EventNearbyViewTests(TestCase):
+    def setUp(self):
+        # Times Square, Brooklyn Bridge (~6 km), Newark (~15 km), LA
+        self.times_sq = _event("Times Square", 40.7580, -73.9855)
+        self.bridge = _event("Brooklyn Bridge", 40.7061, -73.9969)
+        self.newark = _event("Newark", 40.7357, -74.1724)
+        self.la = _event("LA", 34.0522, -118.2437)
+        self.nowhere = _event("No location")
+
+    def _get(self, **params):
+        return self.client.get(reverse("events:event_nearby"), params)
+
+    def test_radius_search_sorted_by_distance(self):
+        data = self._get(lat=40.7580, lng=-73.9855, radius_km=20).json()
+        titles = [r["title"] for r in data["results"]]
+        self.assertEqual(titles, ["Times Square", "Brooklyn Bridge", "Newark"])
+        self.assertEqual(data["results"][0]["distance_km"], 0.0)
+        self.assertLess(data["results"][1]["distance_km"], 7)
+
+    def test_small_radius_excludes_far_events(self):
+        data = self._get(lat=40.7580, lng=-73.9855, radius_km=7).json()
+        self.assertEqual(
+            [r["title"] for r in data["results"]], ["Times Square", "Brooklyn Bridge"]
+        )
+
+    def test_bbox_filter(self):
+        data = self._get(bbox="40.70,-74.00,40.72,-73.99").json()
+        self.assertEqual([r["title"] for r in data["results"]], ["Brooklyn Bridge"])
+
+    def test_limit(self):
+        data = self._get(lat=40.7580, lng=-73.9855, radius_km=20, limit=1).json()
+        self.assertEqual(len(data["results"]), 1)
+
+    def test_invalid_params(self):
+        self.assertEqual(self._get().status_code, 400)
+        self.assertEqual(self._get(lat="abc", lng=1).status_code, 400)
+        self.assertEqual(self._get(lat=95, lng=0).status_code, 400)
+        self.assertEqual(self._get(bbox="1,2,3").status_code, 400)
+
+    def test_benchmark_command_runs(self):
+        out = mock.MagicMock()
+        call_command(
+            "benchmark_nearby", events=300, queries=5, compare_naive=True, stdout=out
+        )
+        written = " ".join(str(c) for c in out.write.call_args_list)
+        self.assertIn("geohash + numpy", written)
+        # Benchmark data is rolled back.
+        self.assertEqual(Event.objects.count(), 5)
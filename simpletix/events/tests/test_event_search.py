@@ -0,0 +1,93 @@
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+
+from events.models import Event
+
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        self.jazz = Event.objects.create(
+            title="Jazz Festival",
+            description="Three stages of live music",
+            date=date(2030, 6, 1),
+            time=time(18, 0),
+            location="Central Park",
+        )
+        self.talk = Event.objects.create(
+            title="Startup Talk",
+            description="Founders discuss jazz-age economics",
+            date=date(2030, 6, 2),
+            time=time(10, 0),
+            location="Brooklyn",
+        )
+        self.other = Event.objects.create(
+            title="Pottery Class",
+            description="Hands-on workshop",
+            date=date(2030, 6, 3),
+            time=time(12, 0),
+            location="Queens",
+        )
+
+    def _search(self, **params):
+        response = self.client.get(reverse("events:event_search"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_algolia_shaped_hits_ranked_by_title_first(self):
+        data = self._search(q="jazz")
+        ids = [hit["objectID"] for hit in data["hits"]]
+
+        self.assertEqual(ids, [str(self.jazz.id), str(self.talk.id)])
+        hit = data["hits"][0]
+        self.assertEqual(hit["title"], "Jazz Festival")
+        self.assertEqual(hit["location"], "Central Park")
+        self.assertEqual(hit["description"], "Three stages of live music")
+
+    def test_matches_location_and_description(self):
+        self.assertEqual(
+            [h["objectID"] for h in self._search(q="queens")["hits"]],
+            [str(self.other.id)],
+        )
+        self.assertEqual(
+            [h["objectID"] for h in self._search(q="workshop")["hits"]],
+            [str(self.other.id)],
+        )
+
+    def test_typo_tolerance_via_trigrams(self):
+        data = self._search(q="Jazz Festivel")
+        self.assertEqual(data["hits"][0]["objectID"], str(self.jazz.id))
+
+    def test_search_vector_follows_edits(self):
+        self.other.title = "Ceramics Night"
+        self.other.save()
+        self.assertEqual(
+            [h["objectID"] for h in self._search(q="ceramics")["hits"]],
+            [str(self.other.id)],
+        )
+
+    def test_pagination(self):
+        first = self._search(q="jazz", hitsPerPage=1)
+        second = self._search(q="jazz", hitsPerPage=1, page=1)
+
+        self.assertEqual(len(first["hits"]), 1)
+        self.assertTrue(first["hasMore"])
+        self.assertEqual(second["hits"][0]["objectID"], str(self.talk.id))
+        self.assertFalse(second["hasMore"])
+
+    def test_empty_query_returns_no_hits(self):
+        data = self._search(q="  ")
+        self.assertEqual(data["hits"], [])
+        self.assertFalse(data["hasMore"])
+
+    def test_bad_paging_params_fall_back_to_defaults(self):
+        data = self._search(q="jazz", page="x", hitsPerPage="1000")
+        self.assertEqual(data["page"], 0)
+        self.assertEqual(data["hitsPerPage"], 50)
+
+    def test_nav_uses_server_search_when_algolia_disabled(self):
+        with self.settings(ALGOLIA_ENABLED=False):
+            response = self.client.get(reverse("simpletix:index"))
+        self.assertEqual(response.context["SEARCH_BACKEND"], "server")
+        self.assertContains(response, reverse("events:event_search"))
@@ -0,0 +1,181 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import OrganizerProfile
+from events.models import Event
+from tickets.models import TicketInfo
+
+
+class EventApiTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="apiorg", password="pass123")
+        self.organizer = OrganizerProfile.objects.create(user=user, full_name="API Org")
+        day = timezone.localdate() + timedelta(days=10)
+        self.events = [
+            Event.objects.create(
+                title=f"API Event {i}",
+                description="Long text " * 20,
+                date=day + timedelta(days=i),
+                time=time(19, 0),
+                location="Hall",
+                organizer=self.organizer,
+            )
+            for i in range(3)
+        ]
+        for event in self.events:
+            TicketInfo.objects.create(
+                event=event, category="VIP", price="25.50", availability=7
+            )
+            TicketInfo.objects.create(
+                event=event, category="Early Bird", price=10, availability=3
+            )
+        self.past = Event.objects.create(
+            title="Old", date=date(2000, 1, 1), time=time(9, 0), location="Hall"
+        )
+        self.list_url = reverse("api_v1:event_list")
+
+    def detail_url(self, event):
+        return reverse("api_v1:event_detail", args=[event.id])
+
+    def test_list_returns_upcoming_events_with_tickets(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = response.json()
+
+        self.assertEqual(
+            [item["title"] for item in data["results"]],
+            ["API Event 0", "API Event 1", "API Event 2"],
+        )
+        first = data["results"][0]
+        self.assertNotIn("description", first)
+        self.assertEqual(first["organizer"], "API Org")
+        self.assertIsNone(first["banner"])
+        self.assertEqual(
+            first["tickets"],
+            [
+                {
+                    "id": first["tickets"][0]["id"],
+                    "category": "VIP",
+                    "price": "25.50",
+                    "availability": 7,
+                },
+                {
+                    "id": first["tickets"][1]["id"],
+                    "category": "Early Bird",
+                    "price": "10.00",
+                    "availability": 3,
+                },
+            ],
+        )
+        self.assertIsNone(data["next_cursor"])
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(
+            response.json()["results"][0],
+            {"id": self.events[0].id, "title": "API Event 0"},
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(self.list_url, {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["error"])
+        self.assertNotIn("ETag", response)
+
+    def test_cursor_pagination(self):
+        first = self.client.get(self.list_url, {"limit": 2, "fields": "title"})
+        data = first.json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIn("cursor=", data["next"])
+
+        second = self.client.get(data["next"]).json()
+        self.assertEqual(second["results"], [{"title": "API Event 2"}])
+        self.assertIsNone(second["next"])
+
+    def test_pages_are_cached_until_events_change(self):
+        self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.list_url)
+        self.assertEqual(cached.status_code, 200)
+
+        self.events[0].title = "Renamed"
+        self.events[0].save()
+        self.assertEqual(
+            self.client.get(self.list_url).json()["results"][0]["title"], "Renamed"
+        )
+
+        TicketInfo.objects.filter(event=self.events[1]).first().delete()
+        results = self.client.get(self.list_url).json()["results"]
+        self.assertEqual(len(results[1]["tickets"]), 1)
+
+    def test_ticket_sales_only_retire_the_events_detail_pages(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url(self.events[0]))
+        self.client.get(self.detail_url(self.events[1]))
+
+        ticket = TicketInfo.objects.filter(event=self.events[0]).first()
+        ticket.availability = 1
+        ticket.save(update_fields=["availability"])
+
+        with self.assertNumQueries(0):
+            self.client.get(self.list_url)
+            self.client.get(self.detail_url(self.events[1]))
+        detail = self.client.get(self.detail_url(self.events[0])).json()
+        self.assertEqual(detail["tickets"][0]["availability"], 1)
+
+        ticket.price = 30
+        ticket.save(update_fields=["price"])
+        results = self.client.get(self.list_url).json()["results"]
+        self.assertEqual(results[0]["tickets"][0]["price"], "30.00")
+
+    def test_etag_revalidation(self):
+        first = self.client.get(self.list_url)
+        self.assertIn("public", first["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+
+        ticket = TicketInfo.objects.filter(event=self.events[0]).first()
+        ticket.availability = 0
+        ticket.save()
+        third = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(third.status_code, 200)
+
+    def test_etag_does_not_depend_on_the_viewer(self):
+        first = self.client.get(self.detail_url(self.events[0]))
+        self.client.login(username="apiorg", password="pass123")
+        second = self.client.get(
+            self.detail_url(self.events[0]), HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(second.status_code, 304)
+
+    def test_detail(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url(self.past))
+        data = response.json()
+        self.assertEqual(data["title"], "Old")
+        self.assertEqual(data["starts_at"][:10], "2000-01-01")
+        self.assertEqual(data["tickets"], [])
+        self.assertIn("description", data)
+
+        sparse = self.client.get(
+            self.detail_url(self.events[0]), {"fields": "title,tickets"}
+        ).json()
+        self.assertEqual(set(sparse), {"title", "tickets"})
+
+    def test_detail_not_found(self):
+        response = self.client.get(reverse("api_v1:event_detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Event not found."})
+
+    def test_read_only(self):
+        response = self.client.post(self.list_url)
+        self.assertEqual(response.status_code, 405)
@@ -1,8 +1,12 @@
+from datetime import timedelta
+
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 from events.models import Event
 from accounts.models import OrganizerProfile
+from tickets.models import TicketInfo
 
 
 class SimpleEventViewTests(TestCase):
@@ -57,3 +61,30 @@ class SimpleEventViewTests(TestCase):
         self.login()
         response = self.client.get(reverse("events:delete_event", args=[self.event.id]))
         self.assertIn(response.status_code, [200, 302])
+
+    def test_event_list_has_no_n_plus_one(self):
+        # config.querycheck fails the request if each card costs queries.
+        day = timezone.localdate() + timedelta(days=3)
+        for i in range(6):
+            event = Event.objects.create(
+                title=f"Busy {i}", date=day, time="12:00:00", organizer=self.organizer
+            )
+            TicketInfo.objects.create(event=event, category="VIP", price=10)
+            TicketInfo.objects.create(event=event, category="Early Bird", price=5)
+        response = self.client.get(reverse("events:event_list"))
+        self.assertContains(response, "Busy 5")
+
+    def test_only_the_owner_can_edit(self):
+        User.objects.create_user(username="other", password="pass123")
+        self.client.login(username="other", password="pass123")
+        session = self.client.session
+        session["desired_role"] = "organizer"
+        session.save()
+        response = self.client.get(reverse("events:edit_event", args=[self.event.id]))
+        self.assertEqual(response.status_code, 403)
+
+        ownerless = Event.objects.create(
+            title="Nobody's", date="2025-10-28", time="9:00"
+        )
+        response = self.client.get(reverse("events:edit_event", args=[ownerless.id]))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+
+
+class EventStartsAtTests(TestCase):
+    def test_starts_at_combines_date_and_time(self):
+        event = Event.objects.create(
+            title="Gig", date=date(2030, 5, 1), time=time(19, 30), location="Here"
+        )
+        self.assertEqual(
+            event.starts_at, datetime(2030, 5, 1, 19, 30, tzinfo=dt_timezone.utc)
+        )
+
+    def test_starts_at_accepts_iso_strings(self):
+        event = Event.objects.create(
+            title="Gig", date="2030-05-01", time="08:15:00", location="Here"
+        )
+        self.assertEqual(
+            event.starts_at, datetime(2030, 5, 1, 8, 15, tzinfo=dt_timezone.utc)
+        )
+
+    def test_update_fields_saves_starts_at(self):
+        event = Event.objects.create(
+            title="Gig", date=date(2030, 5, 1), time=time(19, 30), location="Here"
+        )
+        event.date = date(2030, 6, 1)
+        event.save(update_fields=["date"])
+
+        event.refresh_from_db()
+        self.assertEqual(event.starts_at.date(), date(2030, 6, 1))
+
+
+class UpcomingEventListTests(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        self.past = Event.objects.create(
+            title="Past Show", date=today - timedelta(days=3), time=time(12, 0)
+        )
+        self.soon = Event.objects.create(
+            title="Soon Show", date=today + timedelta(days=2), time=time(12, 0)
+        )
+        self.later = Event.objects.create(
+            title="Later Show", date=today + timedelta(days=30), time=time(12, 0)
+        )
+        self.today = today
+
+    def _titles(self, params=None):
+        response = self.client.get(reverse("events:event_list"), params or {})
+        self.assertEqual(response.status_code, 200)
+        return [event.title for event in response.context["events"]]
+
+    def test_defaults_to_upcoming_soonest_first(self):
+        self.assertEqual(self._titles(), ["Soon Show", "Later Show"])
+
+    def test_date_range_filters_are_inclusive(self):
+        day = (self.today + timedelta(days=30)).isoformat()
+        self.assertEqual(self._titles({"from": day, "to": day}), ["Later Show"])
+        self.assertEqual(
+            self._titles({"to": (self.today + timedelta(days=2)).isoformat()}),
+            ["Soon Show"],
+        )
+
+    def test_from_in_the_past_still_excludes_past_events(self):
+        start = (self.today - timedelta(days=10)).isoformat()
+        self.assertNotIn("Past Show", self._titles({"from": start}))
+
+    def test_invalid_dates_are_ignored(self):
+        self.assertEqual(
+            self._titles({"from": "not-a-date", "to": "2030-02-31"}),
+            ["Soon Show", "Later Show"],
+        )
+
+    def test_query_is_bounded_by_starts_at(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("events:event_list"))
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertIn('"events_event"."starts_at" >=', sql)
+        self.assertIn('ORDER BY "events_event"."starts_at" ASC', sql)
+
+    def test_next_page_link_keeps_filters(self):
+        for i in range(30):
+            Event.objects.create(
+                title=f"Bulk {i}",
+                date=self.today + timedelta(days=5),
+                time=time(10, 0),
+            )
+        day = (self.today + timedelta(days=5)).isoformat()
+        response = self.client.get(reverse("events:event_list"), {"from": day})
+        next_url = response.context["next_url"]
+        self.assertIn(f"from={day}", next_url)
+        self.assertIn("cursor=", next_url)
@@ -0,0 +1,469 @@
+# events/uploads.py
+"""
+Direct-to-storage, resumable uploads for event banners and videos.
+
+Large files never stream through a Django worker. Instead:
+
+1. `start_upload` reserves an object key and opens a multipart upload.
+   The client gets a signed session token.
+2. `part_urls` hands out presigned URLs. The client PUTs each chunk
+   straight to storage (several in parallel) and keeps the returned ETags.
+3. `uploaded_parts` lists the chunks storage already has, so an
+   interrupted upload resumes where it stopped.
+4. `complete_upload` stitches the parts together and checks the stored
+   object's size and type (deleting it if they're out of bounds). It
+   returns a signed reference to the final key, which the event form
+   accepts in place of a file (see EventForm).
+
+Uploads that are never completed or aborted are cleaned up by
+`manage.py purge_uploads` (daily from cron; see .ebextensions).
+
+S3 (production/development) uses S3's own multipart API. Locally, a
+filesystem stand-in implements the same protocol: chunks are PUT to
+`events:upload_chunk` and assembled into the default storage.
+"""
+
+import hashlib
+import os
+import posixpath
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from PIL import Image
+
+SESSION_SALT = "events.uploads.session"
+DONE_SALT = "events.uploads.done"
+CHUNK_SALT = "events.uploads.chunk"
+
+# S3 requires every part but the last to be at least 5 MiB.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+MAX_URLS_PER_REQUEST = 100
+
+# field -> (key prefix, allowed content-type prefix)
+UPLOAD_FIELDS = {
+    "banner": ("banners/", "image/"),
+    "video": ("event_videos/", "video/"),
+}
+
+# Raster formats a banner may be in (no SVG: it can carry script).
+BANNER_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+
+
+class UploadError(Exception):
+    """An upload request was invalid; the message is safe to show."""
+
+
+def _setting(name, default):
+    return getattr(settings, f"DIRECT_UPLOAD_{name}", default)
+
+
+def _max_size(field):
+    limits = _setting("MAX_SIZE", {})
+    return limits.get(field, 20 * 1024 * 1024 if field == "banner" else 2 * 1024**3)
+
+
+def _part_size(size):
+    """Smallest part size >= the configured one that keeps under MAX_PARTS."""
+    part_size = max(_setting("PART_SIZE", 8 * 1024 * 1024), MIN_PART_SIZE)
+    while part_size * MAX_PARTS < size:
+        part_size *= 2
+    return part_size
+
+
+# --- Storage backends -------------------------------------------------------
+
+
+class S3MultipartBackend:
+    """S3 multipart uploads through the django-storages bucket."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.client = storage.connection.meta.client
+        self.bucket = storage.bucket_name
+
+    def object_key(self, name):
+        return self.storage._normalize_name(name)
+
+    def start(self, name, content_type):
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=self.object_key(name), ContentType=content_type
+        )
+        return response["UploadId"]
+
+    def part_urls(self, name, upload_id, part_numbers, part_size):
+        expires = _setting("URL_EXPIRY_SECONDS", 3600)
+        return {
+            number: self.client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": self.bucket,
+                    "Key": self.object_key(name),
+                    "UploadId": upload_id,
+                    "PartNumber": number,
+                },
+                ExpiresIn=expires,
+            )
+            for number in part_numbers
+        }
+
+    def uploaded_parts(self, name, upload_id):
+        parts = {}
+        paginator = self.client.get_paginator("list_parts")
+        try:
+            for page in paginator.paginate(
+                Bucket=self.bucket, Key=self.object_key(name), UploadId=upload_id
+            ):
+                for part in page.get("Parts", []):
+                    parts[part["PartNumber"]] = part["ETag"]
+        except self.client.exceptions.NoSuchUpload:
+            raise UploadError("Unknown upload.")
+        return parts
+
+    def complete(self, name, upload_id, parts):
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.object_key(name),
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": number, "ETag": etag}
+                        for number, etag in sorted(parts.items())
+                    ]
+                },
+            )
+        except self.client.exceptions.NoSuchUpload:
+            raise UploadError("Unknown upload.")
+        except self.client.exceptions.ClientError as exc:
+            # InvalidPart / EntityTooSmall etc.: the client has to retry parts.
+            raise UploadError(f"Upload could not be completed: {exc}")
+
+    def abort(self, name, upload_id):
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket, Key=self.object_key(name), UploadId=upload_id
+        )
+
+    def purge_stale(self, before):
+        """Abort multipart uploads started before `before`; returns how many."""
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        purged = 0
+        for prefix, _ in UPLOAD_FIELDS.values():
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=self.object_key(prefix)
+            ):
+                for upload in page.get("Uploads", []):
+                    if upload["Initiated"] >= before:
+                        continue
+                    try:
+                        self.client.abort_multipart_upload(
+                            Bucket=self.bucket,
+                            Key=upload["Key"],
+                            UploadId=upload["UploadId"],
+                        )
+                    except self.client.exceptions.ClientError as exc:
+                        # The purge runs on every instance; another one
+                        # may have aborted (or the client completed) it.
+                        if exc.response["Error"]["Code"] != "NoSuchUpload":
+                            raise
+                        continue
+                    purged += 1
+        return purged
+
+    def stat(self, name):
+        """(size, content type) of the stored object."""
+        head = self.client.head_object(Bucket=self.bucket, Key=self.object_key(name))
+        return head["ContentLength"], head.get("ContentType", "")
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(name))
+
+
+class LocalMultipartBackend:
+    """
+    Filesystem stand-in for S3 multipart uploads (local development, CI).
+    Parts are written to a staging directory and concatenated into the
+    default storage on completion.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.root = _setting(
+            "LOCAL_DIR", os.path.join(settings.BASE_DIR, "media", ".uploads")
+        )
+
+    def _dir(self, upload_id):
+        if not upload_id.isalnum():
+            raise UploadError("Unknown upload.")
+        return os.path.join(self.root, upload_id)
+
+    def _part_path(self, upload_id, number):
+        return os.path.join(self._dir(upload_id), f"{number:05d}.part")
+
+    def start(self, name, content_type):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._dir(upload_id))
+        return upload_id
+
+    def part_urls(self, name, upload_id, part_numbers, part_size):
+        return {
+            number: reverse(
+                "events:upload_chunk",
+                args=[signing.dumps([upload_id, number, part_size], salt=CHUNK_SALT)],
+            )
+            for number in part_numbers
+        }
+
+    def receive_part(self, token, body):
+        """Store one chunk PUT to `events:upload_chunk`; returns its ETag."""
+        max_age = _setting("URL_EXPIRY_SECONDS", 3600)
+        try:
+            upload_id, number, max_bytes = signing.loads(
+                token, salt=CHUNK_SALT, max_age=max_age
+            )
+        except signing.BadSignature:
+            raise UploadError("Upload URL is invalid or has expired.")
+        if not os.path.isdir(self._dir(upload_id)):
+            raise UploadError("Unknown upload.")
+
+        digest = hashlib.md5(usedforsecurity=False)
+        received = 0
+        path = self._part_path(upload_id, number)
+        # Written aside and renamed, so a dropped connection never leaves
+        # a truncated part that looks complete.
+        with open(path + ".tmp", "wb") as fh:
+            for chunk in iter(lambda: body.read(64 * 1024), b""):
+                received += len(chunk)
+                if received > max_bytes:
+                    break
+                digest.update(chunk)
+                fh.write(chunk)
+        if received > max_bytes:
+            os.remove(path + ".tmp")
+            raise UploadError("Chunk is larger than the part size.")
+        os.replace(path + ".tmp", path)
+        return f'"{digest.hexdigest()}"'
+
+    def uploaded_parts(self, name, upload_id):
+        if not os.path.isdir(self._dir(upload_id)):
+            raise UploadError("Unknown upload.")
+        parts = {}
+        for entry in sorted(os.listdir(self._dir(upload_id))):
+            if entry.endswith(".part"):
+                digest = hashlib.md5(usedforsecurity=False)
+                with open(os.path.join(self._dir(upload_id), entry), "rb") as fh:
+                    for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                parts[int(entry[:-5])] = f'"{digest.hexdigest()}"'
+        return parts
+
+    def complete(self, name, upload_id, parts):
+        stored = self.uploaded_parts(name, upload_id)
+        if stored != parts:
+            raise UploadError("Uploaded parts don't match.")
+        assembled = os.path.join(self._dir(upload_id), "assembled")
+        with open(assembled, "wb") as out:
+            for number in sorted(parts):
+                with open(self._part_path(upload_id, number), "rb") as part:
+                    shutil.copyfileobj(part, out)
+        with open(assembled, "rb") as fh:
+            saved = self.storage.save(name, File(fh))
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+        if saved != name:
+            # Storage picked another name; don't leave that copy behind.
+            self.storage.delete(saved)
+            raise UploadError("Upload key is already taken.")
+
+    def abort(self, name, upload_id):
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+
+    def purge_stale(self, before):
+        """Remove staging directories last written before `before`."""
+        if not os.path.isdir(self.root):
+            return 0
+        purged = 0
+        for entry in os.listdir(self.root):
+            path = os.path.join(self.root, entry)
+            try:
+                stale = os.path.getmtime(path) < before.timestamp()
+            except FileNotFoundError:
+                # Removed meanwhile, by its completion or another purge.
+                continue
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
+                purged += 1
+        return purged
+
+    def stat(self, name):
+        # The filesystem keeps no content type; only the size is checked.
+        return self.storage.size(name), None
+
+    def delete(self, name):
+        self.storage.delete(name)
+
+
+def uses_local_backend():
+    return _setting("BACKEND", "local") != "s3"
+
+
+def get_backend():
+    if uses_local_backend():
+        return LocalMultipartBackend(default_storage)
+    return S3MultipartBackend(default_storage)
+
+
+# --- Upload protocol --------------------------------------------------------
+
+
+def start_upload(user, field, filename, content_type, size):
+    """Open a multipart upload; returns the session the client drives."""
+    if field not in UPLOAD_FIELDS:
+        raise UploadError("Unsupported upload field.")
+    prefix, type_prefix = UPLOAD_FIELDS[field]
+    if not content_type.startswith(type_prefix):
+        raise UploadError(f"{field.capitalize()} uploads must be {type_prefix}*.")
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError("File size is required.")
+    if size > _max_size(field):
+        raise UploadError("File is too large.")
+
+    safe_name = get_valid_filename(posixpath.basename(filename or "")) or "upload"
+    key = f"{prefix}{uuid.uuid4().hex}/{safe_name[-100:]}"
+    upload_id = get_backend().start(key, content_type)
+    part_size = _part_size(size)
+    token = signing.dumps(
+        {
+            "key": key,
+            "upload_id": upload_id,
+            "field": field,
+            "user": user.pk,
+            "size": size,
+            "part_size": part_size,
+        },
+        salt=SESSION_SALT,
+        compress=True,
+    )
+    return {
+        "token": token,
+        "key": key,
+        "part_size": part_size,
+        "part_count": -(-size // part_size),
+    }
+
+
+def _session(token, user):
+    max_age = _setting("SESSION_MAX_AGE", 24 * 3600)
+    try:
+        session = signing.loads(token or "", salt=SESSION_SALT, max_age=max_age)
+    except signing.BadSignature:
+        raise UploadError("Upload session is invalid or has expired.")
+    if session["user"] != user.pk:
+        raise UploadError("Upload session is invalid or has expired.")
+    return session
+
+
+def part_urls(user, token, part_numbers):
+    session = _session(token, user)
+    part_count = -(-session["size"] // session["part_size"])
+    numbers = sorted({int(n) for n in part_numbers})
+    if not numbers or len(numbers) > MAX_URLS_PER_REQUEST:
+        raise UploadError(f"Request between 1 and {MAX_URLS_PER_REQUEST} parts.")
+    if numbers[0] < 1 or numbers[-1] > part_count:
+        raise UploadError("Part number out of range.")
+    return get_backend().part_urls(
+        session["key"], session["upload_id"], numbers, session["part_size"]
+    )
+
+
+def uploaded_parts(user, token):
+    session = _session(token, user)
+    return get_backend().uploaded_parts(session["key"], session["upload_id"])
+
+
+def complete_upload(user, token, parts):
+    """
+    Finish the upload from {part_number: etag}; returns a signed reference
+    to the stored object for the event form.
+    """
+    session = _session(token, user)
+    part_count = -(-session["size"] // session["part_size"])
+    parts = {int(number): str(etag) for number, etag in parts.items()}
+    if sorted(parts) != list(range(1, part_count + 1)):
+        raise UploadError("Some parts are missing.")
+    backend = get_backend()
+    backend.complete(session["key"], session["upload_id"], parts)
+    _check_stored(backend, session["key"], session["field"])
+    return signing.dumps(
+        {"key": session["key"], "field": session["field"], "user": user.pk},
+        salt=DONE_SALT,
+    )
+
+
+def _check_stored(backend, key, field):
+    """
+    The size and type declared to start_upload are only the client's word,
+    and presigned part URLs can't limit what is PUT to them. Check the
+    stored object itself, and delete it if it's out of bounds.
+    """
+    _, type_prefix = UPLOAD_FIELDS[field]
+    size, content_type = backend.stat(key)
+    if size > _max_size(field):
+        error = "File is too large."
+    elif content_type is not None and not content_type.startswith(type_prefix):
+        error = f"{field.capitalize()} uploads must be {type_prefix}*."
+    else:
+        return
+    backend.delete(key)
+    raise UploadError(error)
+
+
+def abort_upload(user, token):
+    session = _session(token, user)
+    get_backend().abort(session["key"], session["upload_id"])
+
+
+def purge_stale_uploads(max_age=None):
+    """
+    Abort uploads that were started but never completed or aborted, whose
+    parts would otherwise be stored (and, on S3, billed) indefinitely.
+    By default, those older than an upload session, which can no longer
+    be completed anyway.
+    """
+    if max_age is None:
+        max_age = _setting("SESSION_MAX_AGE", 24 * 3600)
+    before = timezone.now() - timedelta(seconds=max_age)
+    return get_backend().purge_stale(before)
+
+
+def resolve_upload(reference, field, user):
+    """Storage key of a completed upload, checked against field and user."""
+    max_age = _setting("SESSION_MAX_AGE", 24 * 3600)
+    try:
+        done = signing.loads(reference, salt=DONE_SALT, max_age=max_age)
+    except signing.BadSignature:
+        raise UploadError("Upload is invalid or has expired; please upload again.")
+    if done["field"] != field or done["user"] != getattr(user, "pk", None):
+        raise UploadError("Upload is invalid or has expired; please upload again.")
+    return done["key"]
+
+
+def check_banner_image(key):
+    """
+    Like ImageField's validation, for a banner stored by a direct upload:
+    raise UploadError unless the object is an image in BANNER_FORMATS.
+    """
+    try:
+        with default_storage.open(key, "rb") as fh:
+            with Image.open(fh, formats=BANNER_FORMATS) as image:
+                image.verify()
+    except Exception:
+        # Pillow raises many kinds of errors for bad or hostile files.
+        raise UploadError("Banner must be a JPEG, PNG, GIF or WebP image.")
@@ -5,6 +5,14 @@ app_name = "events"
 urlpatterns = [
     path("", views.event_list, name="event_list"),  # this makes /events/ valid
     path("create/", views.create_event, name="create_event"),
+    path("search/", views.event_search, name="event_search"),
+    path("nearby/", views.event_nearby, name="event_nearby"),
+    path("uploads/start/", views.upload_start, name="upload_start"),
+    path("uploads/parts/", views.upload_parts, name="upload_parts"),
+    path("uploads/status/", views.upload_status, name="upload_status"),
+    path("uploads/complete/", views.upload_complete, name="upload_complete"),
+    path("uploads/abort/", views.upload_abort, name="upload_abort"),
+    path("uploads/chunk/<str:token>/", views.upload_chunk, name="upload_chunk"),
     path("<int:event_id>/", views.event_detail, name="event_detail"),
     path("<int:event_id>/edit/", views.edit_event, name="edit_event"),
     path("<int:event_id>/delete/", views.delete_event, name="delete_event"),
@@ -1,57 +1,54 @@
+import json
+import math
+from datetime import datetime, time, timedelta
 from functools import wraps
 from urllib.parse import urlencode
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Left
+from django.http import HttpResponse, HttpResponseNotAllowed, Http404, JsonResponse
 from django.shortcuts import (
     get_object_or_404,
     redirect,
     render,
     resolve_url,
 )
-
-from accounts.models import OrganizerProfile
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+
+from config.conditional import conditional_page, request_cache, versions_last_modified
+from config.querycheck import query_budget
+from config.ratelimit import ratelimit
 from tickets.forms import TicketFormSet
 from tickets.models import TicketInfo
+from . import api as event_api
+from . import uploads
+from .cards import EVENT_CARD_FIELDS, availability_versions, render_event_cards
 from .forms import EventForm
+from .geo import find_nearby
 from .models import Event
+from .pagination import keyset_page
 
-# --- Algolia integration helpers -------------------------------------------
-
-try:
-    from algoliasearch_django import (
-        save_record as _save_record,
-        delete_record as _delete_record,
-    )
-except Exception:
-    # If Algolia isn't installed or is misconfigured, fail gracefully.
-    _save_record = None
-    _delete_record = None
-
+EVENT_LIST_PAGE_SIZE = 24
 
-def algolia_save(instance):
-    """
-    Save an instance to Algolia if Algolia is enabled.
-    In dev/prod this will run normally.
-    In tests/CI you can disable it via settings.ALGOLIA_ENABLED = False.
-    """
-    if not getattr(settings, "ALGOLIA_ENABLED", True):
-        return
-    if _save_record is not None:
-        _save_record(instance)
-
-
-def algolia_delete(instance):
-    """
-    Delete an instance from Algolia if Algolia is enabled.
-    """
-    if not getattr(settings, "ALGOLIA_ENABLED", True):
-        return
-    if _delete_record is not None:
-        _delete_record(instance)
+NEARBY_DEFAULT_RADIUS_KM = 10.0
+NEARBY_MAX_RADIUS_KM = 500.0
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
 
+SEARCH_HITS_PER_PAGE = 20
+SEARCH_MAX_HITS_PER_PAGE = 50
+# Like Algolia's paginationLimitedTo: deep offsets into a ranked result
+# set are never useful and get progressively more expensive.
+SEARCH_MAX_OFFSET = 1000
 
 # --- Auth / role decorators -------------------------------------------------
 
@@ -128,9 +125,13 @@ def organizer_owns_event(view_func):
         if request.session.get("desired_role") != "organizer":
             raise PermissionDenied("You must be an organizer to perform this action.")
 
-        event = get_object_or_404(Event, id=event_id)
-        if event.organizer.user != request.user:
+        event = get_object_or_404(
+            Event.objects.select_related("organizer"), id=event_id
+        )
+        if event.organizer is None or event.organizer.user_id != request.user.id:
             raise PermissionDenied("You are not allowed to modify this event.")
+        # Already fetched (with its organizer); the view reuses it.
+        request.owned_event = event
 
         return view_func(request, *args, **kwargs)
 
@@ -145,17 +146,16 @@ def organizer_owns_event(view_func):
 @organizer_required
 def create_event(request):
     if request.method == "POST":
-        form = EventForm(request.POST, request.FILES)
+        form = EventForm(request.POST, request.FILES, user=request.user)
         formset = TicketFormSet(request.POST)
         if form.is_valid() and formset.is_valid():
-            event = form.save(commit=False)
-            event.organizer = OrganizerProfile.objects.get(user=request.user)
-            event.save()
+            with transaction.atomic():
+                event = form.save(commit=False)
+                event.organizer = request.user.organizerprofile
+                event.save()
 
-            algolia_save(event)
-
-            formset.instance = event
-            formset.save()
+                formset.instance = event
+                formset.save()
             messages.success(request, "Event created successfully!")
             return redirect("events:event_detail", event_id=event.id)
         else:
@@ -181,15 +181,14 @@ def create_event(request):
 @custom_login_required(extra_params={"role": "organizer"})
 @organizer_owns_event
 def edit_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = request.owned_event
     if request.method == "POST":
-        form = EventForm(request.POST, request.FILES, instance=event)
+        form = EventForm(request.POST, request.FILES, instance=event, user=request.user)
         formset = TicketFormSet(request.POST, request.FILES, instance=event)
         if form.is_valid() and formset.is_valid():
-            form.save()
-            algolia_save(event)
-
-            formset.save()
+            with transaction.atomic():
+                form.save()
+                formset.save()
             messages.success(request, "Event updated successfully!")
             return redirect("events:event_detail", event_id=event.id)
         else:
@@ -213,24 +212,510 @@ def edit_event(request, event_id):
 @custom_login_required(extra_params={"role": "organizer"})
 @organizer_owns_event
 def delete_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = request.owned_event
 
     if request.method == "POST":
-        algolia_delete(event)
-
         event.delete()
         messages.success(request, "Event deleted successfully!")
         return redirect("events:event_list")
     return render(request, "events/delete_event.html", {"event": event})
 
 
+def _date_param(request, name):
+    """A YYYY-MM-DD query parameter as a date, or None if missing/invalid."""
+    try:
+        return parse_date(request.GET.get(name) or "")
+    except ValueError:
+        return None
+
+
+def _start_of_day(day):
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_default_timezone()
+    )
+
+
+def _upcoming_events(request):
+    """
+    (queryset, filters): events that haven't started yet, limited to the
+    `?from=` / `?to=` dates (inclusive), and those dates as ISO strings.
+    """
+    date_from = _date_param(request, "from")
+    date_to = _date_param(request, "to")
+
+    lower = timezone.now()
+    if date_from is not None:
+        lower = max(lower, _start_of_day(date_from))
+    upcoming = Event.objects.filter(starts_at__gte=lower)
+    if date_to is not None:
+        upcoming = upcoming.filter(
+            starts_at__lt=_start_of_day(date_to + timedelta(days=1))
+        )
+
+    filters = {}
+    if date_from is not None:
+        filters["from"] = date_from.isoformat()
+    if date_to is not None:
+        filters["to"] = date_to.isoformat()
+    return upcoming, filters
+
+
+def _event_list_page(request):
+    """
+    The upcoming events on the requested page, with the filters applied.
+    Shared (per request) by the list's ETag and the view itself.
+    """
+
+    def compute():
+        upcoming, filters = _upcoming_events(request)
+        events, next_cursor = keyset_page(
+            upcoming.only(*EVENT_CARD_FIELDS, "starts_at"),
+            cursor=request.GET.get("cursor"),
+            page_size=EVENT_LIST_PAGE_SIZE,
+        )
+        return {
+            "events": events,
+            "next_cursor": next_cursor,
+            "filters": filters,
+            "versions": availability_versions([event.id for event in events]),
+        }
+
+    return request_cache(request, "event_list_page", compute)
+
+
+def _event_list_etag(request):
+    page = _event_list_page(request)
+    return "|".join(
+        [
+            request.GET.urlencode(),
+            str(page["next_cursor"]),
+            *(
+                f"{event.id}:{event.updated_at.timestamp()}:"
+                f"{page['versions'][event.id]}"
+                for event in page["events"]
+            ),
+        ]
+    )
+
+
+def _event_list_last_modified(request):
+    page = _event_list_page(request)
+    return versions_last_modified(
+        *(event.updated_at for event in page["events"]),
+        *page["versions"].values(),
+    )
+
+
 # Event List
+@query_budget(4)
+@conditional_page(_event_list_etag, _event_list_last_modified)
 def event_list(request):
-    events = Event.objects.all()
-    return render(request, "events/event_list.html", {"events": events})
+    """
+    One page of upcoming event cards, soonest first, optionally limited to
+    `?from=YYYY-MM-DD` / `?to=YYYY-MM-DD` (inclusive). Past events are
+    excluded by a range on the indexed `starts_at`, so they're never read.
+
+    The cards themselves come from the fragment cache (events.cards); only
+    cache misses touch TicketInfo.
+    """
+    page = _event_list_page(request)
+    events, next_cursor, filters = (
+        page["events"],
+        page["next_cursor"],
+        page["filters"],
+    )
+    next_url = None
+    if next_cursor:
+        next_url = "?" + urlencode({**filters, "cursor": next_cursor})
+
+    return render(
+        request,
+        "events/event_list.html",
+        {
+            "events": events,
+            "cards": render_event_cards(events),
+            "next_cursor": next_cursor,
+            "next_url": next_url,
+            "date_from": filters.get("from", ""),
+            "date_to": filters.get("to", ""),
+        },
+    )
+
+
+def _event_detail_state(request, event_id):
+    """(updated_at, availability version) of the event, or None."""
+
+    def compute():
+        updated_at = (
+            Event.objects.filter(pk=event_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        return updated_at, availability_versions([event_id])[event_id]
+
+    return request_cache(request, ("event_detail", event_id), compute)
+
+
+def _event_detail_etag(request, event_id):
+    state = _event_detail_state(request, event_id)
+    if state is None:
+        return None
+    return f"{state[0].timestamp()}:{state[1]}"
+
+
+def _event_detail_last_modified(request, event_id):
+    state = _event_detail_state(request, event_id)
+    return versions_last_modified(*state) if state else None
 
 
 # Event Detail
+@query_budget(7)
+@conditional_page(_event_detail_etag, _event_detail_last_modified)
 def event_detail(request, event_id):
     event = get_object_or_404(Event, id=event_id)
     return render(request, "events/event_detail.html", {"event": event})
+
+
+def _int_param(request, name, default):
+    try:
+        return int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Event Search
+@query_budget(4)
+@ratelimit("public_json", limit=120, period=60, json=True)
+def event_search(request):
+    """
+    Server-side event search for the nav search box, used when Algolia is
+    disabled (local, CI, or an Algolia outage).
+
+    Full-text matches on the stored `search_vector` are ranked first;
+    titles that are merely similar (pg_trgm) catch typos. The response has
+    the same shape as an Algolia query: {"hits": [{"objectID", "title",
+    "location", "description"}], "page", "hitsPerPage", ...}. Pages are
+    0-based, as in Algolia.
+    """
+    q = (request.GET.get("q") or "").strip()[:200]
+    page = max(_int_param(request, "page", 0), 0)
+    hits_per_page = min(
+        max(_int_param(request, "hitsPerPage", SEARCH_HITS_PER_PAGE), 1),
+        SEARCH_MAX_HITS_PER_PAGE,
+    )
+    offset = page * hits_per_page
+
+    hits = []
+    if q and offset < SEARCH_MAX_OFFSET:
+        query = SearchQuery(q, config="english", search_type="websearch")
+        rows = (
+            Event.objects.filter(Q(search_vector=query) | Q(title__trigram_similar=q))
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                similarity=TrigramSimilarity("title", q),
+            )
+            .order_by("-rank", "-similarity", "id")
+            .values("id", "title", "location", snippet=Left("description", 200))
+        )
+        hits = [
+            {
+                "objectID": str(row["id"]),
+                "title": row["title"],
+                "location": row["location"],
+                "description": row["snippet"],
+            }
+            for row in rows[offset : offset + hits_per_page + 1]
+        ]
+
+    has_more = len(hits) > hits_per_page
+    return JsonResponse(
+        {
+            "hits": hits[:hits_per_page],
+            "query": q,
+            "page": page,
+            "hitsPerPage": hits_per_page,
+            "hasMore": has_more and offset + hits_per_page < SEARCH_MAX_OFFSET,
+        }
+    )
+
+
+def _float_param(request, name):
+    value = request.GET.get(name)
+    if value in (None, ""):
+        return None
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+# Events Near Me
+@query_budget(4)
+@ratelimit("public_json", limit=120, period=60, json=True)
+def event_nearby(request):
+    """
+    Events within `radius_km` of (lat, lng) and/or inside
+    `bbox=min_lat,min_lng,max_lat,max_lng`, nearest first.
+    """
+    try:
+        lat = _float_param(request, "lat")
+        lng = _float_param(request, "lng")
+        radius_km = _float_param(request, "radius_km")
+        bbox = None
+        if request.GET.get("bbox"):
+            bbox = tuple(float(part) for part in request.GET["bbox"].split(","))
+            if len(bbox) != 4 or not all(math.isfinite(v) for v in bbox):
+                raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng")
+    except ValueError:
+        return JsonResponse(
+            {"error": "lat, lng, radius_km and bbox must be numbers"}, status=400
+        )
+
+    if lat is None or lng is None:
+        if bbox is None:
+            return JsonResponse(
+                {"error": "lat and lng (or bbox) are required"}, status=400
+            )
+        # Rank by distance from the middle of the box.
+        lat, lng = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return JsonResponse({"error": "lat/lng out of range"}, status=400)
+    if bbox is None and radius_km is None:
+        radius_km = NEARBY_DEFAULT_RADIUS_KM
+    if radius_km is not None:
+        radius_km = min(max(radius_km, 0.0), NEARBY_MAX_RADIUS_KM)
+
+    limit = min(
+        max(_int_param(request, "limit", NEARBY_DEFAULT_LIMIT), 1), NEARBY_MAX_LIMIT
+    )
+    nearest = find_nearby(
+        Event.objects.all(), lat, lng, radius_km=radius_km, bbox=bbox, limit=limit
+    )
+
+    events = Event.objects.only(
+        "id", "title", "location", "date", "time", "latitude", "longitude"
+    ).in_bulk([event_id for event_id, _ in nearest])
+    results = []
+    for event_id, distance in nearest:
+        event = events.get(event_id)
+        if event is None:
+            continue
+        results.append(
+            {
+                "id": event.id,
+                "title": event.title,
+                "location": event.location,
+                "date": event.date_str,
+                "time": event.time_str,
+                "latitude": event.latitude,
+                "longitude": event.longitude,
+                "distance_km": round(distance, 3),
+            }
+        )
+    return JsonResponse({"results": results})
+
+
+# --- JSON API v1 (events.api) -----------------------------------------------
+
+
+def _api_event_list_entry(request):
+    def compute():
+        try:
+            fields = event_api.parse_fields(
+                request.GET.get("fields"), event_api.LIST_DEFAULT_FIELDS
+            )
+        except ValueError as exc:
+            return event_api.error_response(400, str(exc))
+        limit = min(
+            max(_int_param(request, "limit", event_api.API_PAGE_SIZE), 1),
+            event_api.API_MAX_PAGE_SIZE,
+        )
+        cursor = request.GET.get("cursor") or ""
+        upcoming, filters = _upcoming_events(request)
+
+        def payload():
+            rows, next_cursor = keyset_page(
+                event_api.event_rows(upcoming, fields), cursor=cursor, page_size=limit
+            )
+            next_url = None
+            if next_cursor:
+                params = {**filters, "cursor": next_cursor}
+                if request.GET.get("fields"):
+                    params["fields"] = ",".join(fields)
+                if limit != event_api.API_PAGE_SIZE:
+                    params["limit"] = limit
+                next_url = f"{request.path}?{urlencode(params)}"
+            return {
+                "results": event_api.serialize_events(rows, fields),
+                "next_cursor": next_cursor,
+                "next": next_url,
+            }
+
+        # Past events drop off as time passes; the entry's short lifetime
+        # (EVENT_API_CACHE_SECONDS) takes care of that.
+        key = ("events", fields, limit, cursor, sorted(filters.items()))
+        return event_api.cached_response(key, payload)
+
+    return request_cache(request, "api_event_list", compute)
+
+
+def _api_event_detail_entry(request, event_id):
+    def compute():
+        try:
+            fields = event_api.parse_fields(
+                request.GET.get("fields"), event_api.DETAIL_DEFAULT_FIELDS
+            )
+        except ValueError as exc:
+            return event_api.error_response(400, str(exc))
+
+        def payload():
+            rows = event_api.event_rows(Event.objects.filter(pk=event_id), fields)
+            results = event_api.serialize_events(rows, fields)
+            if not results:
+                raise Http404
+            return results[0]
+
+        try:
+            return event_api.cached_response(
+                ("event", event_id, fields), payload, event_id=event_id
+            )
+        except Http404:
+            return event_api.error_response(404, "Event not found.")
+
+    return request_cache(request, ("api_event_detail", event_id), compute)
+
+
+def _api_response(entry):
+    return HttpResponse(
+        entry["body"], status=entry["status"], content_type="application/json"
+    )
+
+
+def _api_event_list_etag(request):
+    return _api_event_list_entry(request)["etag"]
+
+
+def _api_event_detail_etag(request, event_id):
+    return _api_event_detail_entry(request, event_id)["etag"]
+
+
+@query_budget(2)
+@ratelimit("public_json", limit=120, period=60, json=True)
+@require_GET
+@conditional_page(_api_event_list_etag, per_viewer=False)
+def api_event_list(request):
+    """
+    GET /api/v1/events/: upcoming events, soonest first.
+
+    Query parameters: `cursor` (from the previous page's `next_cursor`),
+    `limit` (1-100, default 24), `from`/`to` (YYYY-MM-DD, inclusive) and
+    `fields` (comma separated; see events.api.ALL_FIELDS). Responds
+    {"results": [...], "next_cursor": ..., "next": ...}.
+    """
+    return _api_response(_api_event_list_entry(request))
+
+
+@query_budget(2)
+@ratelimit("public_json", limit=120, period=60, json=True)
+@require_GET
+@conditional_page(_api_event_detail_etag, per_viewer=False)
+def api_event_detail(request, event_id):
+    """GET /api/v1/events/<id>/: one event (any date), with `fields` as above."""
+    return _api_response(_api_event_detail_entry(request, event_id))
+
+
+# --- Direct uploads (events.uploads) ----------------------------------------
+
+
+def _upload_api(view_func):
+    """POST-only JSON endpoint; UploadError becomes a 400 with its message."""
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+        try:
+            return JsonResponse(view_func(request, data, *args, **kwargs))
+        except (uploads.UploadError, TypeError, ValueError) as exc:
+            message = str(exc) if isinstance(exc, uploads.UploadError) else None
+            return JsonResponse({"error": message or "Invalid request"}, status=400)
+
+    return _wrapped_view
+
+
+@custom_login_required(extra_params={"role": "organizer"})
+@organizer_required
+@_upload_api
+def upload_start(request, data):
+    """Open a direct upload: {field, filename, content_type, size}."""
+    return uploads.start_upload(
+        request.user,
+        data.get("field"),
+        str(data.get("filename") or ""),
+        str(data.get("content_type") or ""),
+        data.get("size"),
+    )
+
+
+@custom_login_required(extra_params={"role": "organizer"})
+@organizer_required
+@_upload_api
+def upload_parts(request, data):
+    """Presigned URLs for {token, parts: [part numbers]}."""
+    urls = uploads.part_urls(request.user, data.get("token"), data.get("parts"))
+    return {"urls": {str(number): url for number, url in urls.items()}}
+
+
+@custom_login_required(extra_params={"role": "organizer"})
+@organizer_required
+@_upload_api
+def upload_status(request, data):
+    """Parts already stored for {token}, so the client can resume."""
+    parts = uploads.uploaded_parts(request.user, data.get("token"))
+    return {"parts": {str(number): etag for number, etag in parts.items()}}
+
+
+@custom_login_required(extra_params={"role": "organizer"})
+@organizer_required
+@_upload_api
+def upload_complete(request, data):
+    """Finish {token, parts: {number: etag}}; returns the form reference."""
+    reference = uploads.complete_upload(
+        request.user, data.get("token"), dict(data.get("parts") or {})
+    )
+    return {"reference": reference}
+
+
+@custom_login_required(extra_params={"role": "organizer"})
+@organizer_required
+@_upload_api
+def upload_abort(request, data):
+    uploads.abort_upload(request.user, data.get("token"))
+    return {"status": "aborted"}
+
+
+@csrf_exempt
+def upload_chunk(request, token):
+    """
+    Local stand-in for an S3 presigned part URL. The signed token in the
+    URL is the authorization, exactly like a presigned URL.
+    """
+    if not uploads.uses_local_backend():
+        raise Http404()
+    if request.method != "PUT":
+        return HttpResponseNotAllowed(["PUT"])
+    try:
+        etag = uploads.get_backend().receive_part(token, request)
+    except uploads.UploadError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    response = HttpResponse(status=200)
+    response["ETag"] = etag
+    return response
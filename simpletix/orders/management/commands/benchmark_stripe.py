@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stripe
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from orders import payments
+from orders.stripe_stub import StripeStub
+
+PATHS = ("global", "client")
+
+PARAMS = {
+    "payment_method_types": ["card"],
+    "line_items": [
+        {
+            "price_data": {
+                "currency": "usd",
+                "product_data": {"name": "Benchmark - General Admission"},
+                "unit_amount": 2500,
+            },
+            "quantity": 2,
+        }
+    ],
+    "mode": "payment",
+    "success_url": "http://testserver/orders/1/success/",
+    "cancel_url": "http://testserver/orders/1/cancel/",
+    "metadata": {"order_id": 1},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time checkout session creation against the local Stripe stub: "
+        "'global' sets stripe.api_key and calls checkout.Session.create, "
+        "as checkout used to; 'client' goes through orders.payments. "
+        "Reports p50/p95 per call."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            choices=PATHS,
+            help="Repeatable; default: both.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Stub response time.",
+        )
+
+    def handle(self, *args, **options):
+        server = StripeStub(("127.0.0.1", 0), latency=options["latency_ms"] / 1000)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for path in options["path"] or PATHS:
+                self._run(path, server.base_url, options)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _run(self, path, base_url, options):
+        saved = stripe.api_key, stripe.api_base
+        if path == "global":
+            stripe.api_base = base_url
+
+            def create():
+                stripe.api_key = "sk_test_benchmark"
+                return stripe.checkout.Session.create(**PARAMS)
+
+        else:
+
+            def create():
+                return payments.create_checkout_session(**PARAMS)
+
+        def timed(_):
+            started = time.perf_counter()
+            create()
+            return (time.perf_counter() - started) * 1000
+
+        stripe_settings = {"STRIPE_SECRET_KEY": "sk_test_benchmark"}
+        try:
+            with override_settings(STRIPE=stripe_settings, STRIPE_API_BASE=base_url):
+                with ThreadPoolExecutor(options["concurrency"]) as pool:
+                    timings = sorted(pool.map(timed, range(options["requests"])))
+        finally:
+            stripe.api_key, stripe.api_base = saved
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        self.stdout.write(
+            f"{path}: {len(timings)} sessions, "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms"
+        )
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.stripe_stub import StripeStub
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the local Stripe stub (orders.stripe_stub) for offline "
+        "checkout and webhook testing. Point the app at it with "
+        "STRIPE_API_BASE=http://<host>:<port>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=12111)
+        parser.add_argument(
+            "--webhook-url",
+            default="http://127.0.0.1:8000/orders/webhook/",
+            help="Where payments post their events ('' to send none).",
+        )
+        parser.add_argument(
+            "--webhook-secret",
+            default=None,
+            help="Signing secret; default: STRIPE_WEBHOOK_SECRET.",
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Delay every API answer, like the real Stripe's.",
+        )
+
+    def handle(self, *args, **options):
+        secret = options["webhook_secret"]
+        if secret is None:
+            secret = settings.STRIPE.get("STRIPE_WEBHOOK_SECRET", "")
+        server = StripeStub(
+            (options["host"], options["port"]),
+            webhook_url=options["webhook_url"],
+            webhook_secret=secret,
+            latency=options["latency_ms"] / 1000,
+        )
+        self.stdout.write(f"Stripe stub on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
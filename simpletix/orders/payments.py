@@ -0,0 +1,69 @@
+# orders/payments.py
+"""
+The Stripe client used for checkout.
+
+One StripeClient per process, instead of setting the global
+`stripe.api_key` on every request:
+
+- its RequestsClient keeps a keep-alive connection pool (per thread), so
+  checkouts after the first skip the TCP + TLS handshake;
+- connects time out after STRIPE_CONNECT_TIMEOUT seconds and responses
+  after STRIPE_READ_TIMEOUT, rather than stripe-python's 80s default, so
+  a slow Stripe can't hold a worker thread for over a minute;
+- connection errors, 409s and 5xx answers (or whatever Stripe marks as
+  retryable) are retried up to STRIPE_MAX_RETRIES times, with backoff.
+  stripe-python sends an idempotency key with every POST, so a retried
+  create can't create twice.
+
+The client is rebuilt when the secret key changes (config.secrets
+rotates it at runtime). STRIPE_API_BASE points it at another server, such
+as the local stub (`manage.py stripe_stub`).
+"""
+
+import threading
+
+import stripe
+from django.conf import settings
+
+from config.timing import external_call
+
+_lock = threading.Lock()
+_client = {"config": None, "client": None}
+
+
+def _client_config():
+    return (
+        settings.STRIPE.get("STRIPE_SECRET_KEY", ""),
+        getattr(settings, "STRIPE_API_BASE", ""),
+        getattr(settings, "STRIPE_CONNECT_TIMEOUT", 3),
+        getattr(settings, "STRIPE_READ_TIMEOUT", 15),
+        getattr(settings, "STRIPE_MAX_RETRIES", 2),
+    )
+
+
+def build_client(api_key, api_base, connect_timeout, read_timeout, max_retries):
+    options = {}
+    if api_base:
+        options["base_addresses"] = {"api": api_base}
+    return stripe.StripeClient(
+        api_key,
+        http_client=stripe.RequestsClient(timeout=(connect_timeout, read_timeout)),
+        max_network_retries=max_retries,
+        **options,
+    )
+
+
+def stripe_client():
+    """The process's StripeClient for the current settings."""
+    config = _client_config()
+    with _lock:
+        if _client["config"] != config:
+            _client["client"] = build_client(*config)
+            _client["config"] = config
+        return _client["client"]
+
+
+def create_checkout_session(**params):
+    """stripe.checkout.Session.create(**params), through the shared client."""
+    with external_call("stripe"):
+        return stripe_client().v1.checkout.sessions.create(params=params)
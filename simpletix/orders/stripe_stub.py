@@ -0,0 +1,217 @@
+# orders/stripe_stub.py
+"""
+A local stand-in for the Stripe API calls checkout makes, so checkout and
+the webhook can be developed, load-tested and benchmarked offline.
+
+Run it with `manage.py stripe_stub` and set STRIPE_API_BASE to its
+address (any STRIPE_SECRET_KEY works). It serves:
+
+POST /v1/checkout/sessions
+    Creates a session and answers like Stripe does. Its `url` is the
+    stub's own payment page.
+GET /v1/checkout/sessions/<id>
+    The session.
+GET /pay/<id>
+    "Pays": posts a signed checkout.session.completed event to the
+    webhook URL, then redirects to the session's success_url. With
+    ?outcome=expire it sends checkout.session.expired and redirects to
+    the cancel_url instead.
+
+Events are signed the way Stripe signs them, so the webhook view accepts
+them when both sides use the same STRIPE_WEBHOOK_SECRET. `latency`
+delays every API answer, to stand in for Stripe's own response time.
+"""
+
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+# Sessions kept for GET /pay and /v1/checkout/sessions/<id>; oldest go first.
+MAX_SESSIONS = 10_000
+
+_LINE_ITEM = re.compile(r"line_items\[(\d+)\]\[(?:price_data\]\[)?(\w+)\]")
+_METADATA = re.compile(r"metadata\[(\w+)\]")
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """The Stripe-Signature header for `payload` (str)."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def checkout_session(params, base_url):
+    """A checkout.session object for the form-encoded create `params`."""
+    session_id = f"cs_test_{secrets.token_hex(12)}"
+    items = {}
+    metadata = {}
+    for key, value in params:
+        match = _LINE_ITEM.fullmatch(key)
+        if match:
+            items.setdefault(match.group(1), {})[match.group(2)] = value
+            continue
+        match = _METADATA.fullmatch(key)
+        if match:
+            metadata[match.group(1)] = value
+    fields = dict(params)
+    return {
+        "id": session_id,
+        "object": "checkout.session",
+        "mode": fields.get("mode", "payment"),
+        "status": "open",
+        "payment_status": "unpaid",
+        "currency": "usd",
+        "amount_total": sum(
+            int(item.get("unit_amount", 0)) * int(item.get("quantity", 1))
+            for item in items.values()
+        ),
+        "metadata": metadata,
+        "success_url": fields.get("success_url"),
+        "cancel_url": fields.get("cancel_url"),
+        "expires_at": int(fields.get("expires_at") or time.time() + 86400),
+        "customer_details": None,
+        "url": f"{base_url}/pay/{session_id}",
+    }
+
+
+class StripeStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, webhook_url="", webhook_secret="", latency=0.0):
+        super().__init__(address, _Handler)
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.latency = latency
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_session(self, session):
+        with self.lock:
+            self.sessions[session["id"]] = session
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+
+    def get_session(self, session_id):
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def send_event(self, event_type, session):
+        """
+        POST a signed event to the webhook URL; its status, or None if
+        there's no URL or it can't be reached.
+        """
+        if not self.webhook_url:
+            return None
+        payload = json.dumps(
+            {
+                "id": f"evt_{secrets.token_hex(12)}",
+                "object": "event",
+                "type": event_type,
+                "created": int(time.time()),
+                "data": {"object": session},
+            }
+        )
+        request = urllib.request.Request(
+            self.webhook_url,
+            data=payload.encode(),
+            headers={
+                "Content-Type": "application/json",
+                "Stripe-Signature": sign_payload(payload, self.webhook_secret),
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+        except (urllib.error.URLError, OSError):
+            # The app is down or the URL is wrong; the payment page still works.
+            return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, as api.stripe.com does; without Nagle, so the headers and
+    # body aren't held back waiting for an ACK.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        self._send_json(
+            404,
+            {
+                "error": {
+                    "type": "invalid_request_error",
+                    "message": f"No such resource: {self.path}",
+                }
+            },
+        )
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode()
+        if urlsplit(self.path).path != "/v1/checkout/sessions":
+            return self._not_found()
+        time.sleep(self.server.latency)
+        session = checkout_session(
+            parse_qsl(body, keep_blank_values=True), self.server.base_url
+        )
+        self.server.add_session(session)
+        self._send_json(200, session)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        match = re.fullmatch(r"/(v1/checkout/sessions|pay)/(\w+)", url.path)
+        session = match and self.server.get_session(match.group(2))
+        if not session:
+            return self._not_found()
+        if match.group(1) != "pay":
+            time.sleep(self.server.latency)
+            return self._send_json(200, session)
+
+        if parse_qs(url.query).get("outcome") == ["expire"]:
+            session.update(status="expired")
+            self.server.send_event("checkout.session.expired", session)
+            location = session["cancel_url"]
+        else:
+            session.update(
+                status="complete",
+                payment_status="paid",
+                customer_details={
+                    "name": "Stub Customer",
+                    "email": "stub@example.com",
+                    "phone": None,
+                },
+            )
+            self.server.send_event("checkout.session.completed", session)
+            location = session["success_url"]
+        self.send_response(303)
+        self.send_header("Location", location or "/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
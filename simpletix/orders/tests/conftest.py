@@ -117,7 +117,11 @@ def pending_order(db, ticket_info_ga, attendee_profile):
 @pytest.fixture
 def mock_stripe():
     """Mocks the stripe API calls."""
-    with patch("orders.views.stripe") as mock_stripe_module:
+    with patch("orders.views.stripe") as mock_stripe_module, patch(
+        # Checkout goes through orders.payments; keep it on the same mock.
+        "orders.payments.create_checkout_session",
+        mock_stripe_module.checkout.Session.create,
+    ):
         # Mock the checkout session
         mock_session = MagicMock()
         mock_session.id = "sess_12345ABC"
@@ -0,0 +1,172 @@
+import http.client
+import json
+import socket
+import threading
+from unittest.mock import MagicMock, patch
+from urllib.parse import urlsplit
+
+import pytest
+import stripe
+from django.test import Client
+from django.urls import reverse
+
+from orders import payments
+from orders.models import Order
+from orders.stripe_stub import StripeStub, sign_payload
+from tickets.models import Ticket
+
+
+pytestmark = pytest.mark.django_db
+
+WEBHOOK_SECRET = "whsec_stub"
+
+
+@pytest.fixture
+def stripe_stub():
+    """The local Stripe stub, serving on a free port."""
+    server = StripeStub(
+        ("127.0.0.1", 0),
+        webhook_url="http://testserver/orders/webhook/",
+        webhook_secret=WEBHOOK_SECRET,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_settings(settings, stripe_stub):
+    settings.STRIPE = {
+        "STRIPE_PUBLISHABLE_KEY": "pk_test_stub",
+        "STRIPE_SECRET_KEY": "sk_test_stub",
+        "STRIPE_WEBHOOK_SECRET": WEBHOOK_SECRET,
+    }
+    settings.STRIPE_API_BASE = stripe_stub.base_url
+    return settings
+
+
+def pay(url):
+    """GET the stub's payment page; its status and redirect."""
+    url = urlsplit(url)
+    connection = http.client.HTTPConnection(url.netloc, timeout=5)
+    connection.request("GET", f"{url.path}?{url.query}")
+    response = connection.getresponse()
+    connection.close()
+    return response.status, response.getheader("Location")
+
+
+def test_client_is_shared_and_rebuilt_when_the_key_changes(settings):
+    settings.STRIPE = {"STRIPE_SECRET_KEY": "sk_test_one"}
+    settings.STRIPE_CONNECT_TIMEOUT = 2
+    settings.STRIPE_READ_TIMEOUT = 9
+    settings.STRIPE_MAX_RETRIES = 4
+
+    client = payments.stripe_client()
+    assert payments.stripe_client() is client
+    requestor = client._requestor
+    assert requestor._options.api_key == "sk_test_one"
+    assert requestor._client._timeout == (2, 9)
+    assert requestor._options.max_network_retries == 4
+
+    settings.STRIPE = {"STRIPE_SECRET_KEY": "sk_test_two"}
+    rotated = payments.stripe_client()
+    assert rotated is not client
+    assert rotated._requestor._options.api_key == "sk_test_two"
+
+
+def test_signed_payload_is_accepted_by_stripe():
+    payload = json.dumps({"id": "evt_1", "object": "event", "type": "x"})
+    header = sign_payload(payload, WEBHOOK_SECRET)
+    event = stripe.Webhook.construct_event(payload, header, WEBHOOK_SECRET)
+    assert event["id"] == "evt_1"
+    with pytest.raises(stripe.SignatureVerificationError):
+        stripe.Webhook.construct_event(payload, header, "whsec_other")
+
+
+def test_checkout_and_webhook_through_the_stub(
+    logged_in_attendee_client, pending_order, stripe_stub, stub_settings, monkeypatch
+):
+    """Checkout against the stub, then "pay" and deliver its webhook."""
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    response = logged_in_attendee_client.get(
+        reverse("orders:process_payment", args=[pending_order.id])
+    )
+
+    pending_order.refresh_from_db()
+    session_id = pending_order.stripe_session_id
+    assert session_id.startswith("cs_test_")
+    assert response.status_code == 302
+    assert response.url == f"{stripe_stub.base_url}/pay/{session_id}"
+    session = stripe_stub.get_session(session_id)
+    assert session["metadata"]["order_id"] == str(pending_order.id)
+    assert session["amount_total"] == (
+        int(pending_order.ticket_info.price * 100) * pending_order.quantity
+    )
+
+    # The stub posts its webhook from its own thread; collect it, and
+    # deliver it here, where the test's transaction is visible.
+    sent = []
+
+    def urlopen(request, timeout):
+        sent.append(request)
+        return MagicMock(status=200)
+
+    with patch("orders.stripe_stub.urllib.request.urlopen", urlopen):
+        status, location = pay(response.url)
+    assert status == 303
+    assert location == "http://testserver" + reverse(
+        "orders:payment_success", args=[pending_order.id]
+    )
+
+    [request] = sent
+    delivered = Client().post(
+        urlsplit(request.full_url).path,
+        request.data,
+        content_type="application/json",
+        HTTP_STRIPE_SIGNATURE=request.get_header("Stripe-signature"),
+    )
+    assert delivered.status_code == 200
+    pending_order.refresh_from_db()
+    assert pending_order.status == "completed"
+    assert pending_order.billing_info.email == "stub@example.com"
+    assert Ticket.objects.filter(order_id=str(pending_order.id)).count() == (
+        pending_order.quantity
+    )
+
+
+def test_expired_payment_goes_to_cancel(stripe_stub, stub_settings):
+    stripe_stub.webhook_url = ""
+    session = payments.create_checkout_session(
+        mode="payment",
+        line_items=[{"price_data": {"unit_amount": 500}, "quantity": 3}],
+        success_url="http://testserver/ok/",
+        cancel_url="http://testserver/cancel/",
+    )
+    assert session.amount_total == 1500
+
+    with patch("orders.stripe_stub.urllib.request.urlopen") as urlopen:
+        assert pay(f"{session.url}?outcome=expire") == (
+            303,
+            "http://testserver/cancel/",
+        )
+    urlopen.assert_not_called()
+    assert stripe_stub.get_session(session.id)["status"] == "expired"
+
+    with pytest.raises(stripe.InvalidRequestError):
+        payments.stripe_client().v1.checkout.sessions.retrieve("cs_test_missing")
+    assert Order.objects.count() == 0
+
+
+def test_unreachable_webhook_does_not_break_payment(stripe_stub, stub_settings):
+    # Nothing listens on a port the OS just handed out and released.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    stripe_stub.webhook_url = f"http://127.0.0.1:{port}/orders/webhook/"
+    session = payments.create_checkout_session(
+        mode="payment", success_url="http://testserver/ok/"
+    )
+    assert stripe_stub.send_event("checkout.session.completed", {}) is None
+    assert pay(session.url) == (303, "http://testserver/ok/")
@@ -9,14 +9,16 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 
-from accounts.models import UserProfile
+from config.ratelimit import ratelimit
 from events.models import Event
 from tickets.models import TicketInfo
 from tickets import services as ticket_services
+from . import payments
 from .forms import OrderForm
 from .models import BillingInfo, Order
 
 
+@ratelimit("order", limit=20, period=600, key=("ip", "user"), methods=("POST",))
 def order(request, event_id):
     event = get_object_or_404(Event, id=event_id)
 
@@ -40,12 +42,12 @@ def order(request, event_id):
                         return redirect("orders:order", event_id=event.id)
 
                     ticket_info.availability -= quantity
-                    ticket_info.save()
+                    ticket_info.save(update_fields=["availability"])
 
                     # Save the form to create the order instance
                     order = form.save(commit=False)
                     if request.session.get("desired_role") == "attendee":
-                        order.attendee = UserProfile.objects.get(user=request.user)
+                        order.attendee = request.user.uprofile
                     order.save()
 
                 return redirect("orders:process_payment", order_id=order.id)
@@ -80,7 +82,7 @@ def order_failed(order):
 
         ticket_info = order.ticket_info
         ticket_info.availability += order.quantity
-        ticket_info.save()
+        ticket_info.save(update_fields=["availability"])
 
 
 # test card:
@@ -100,15 +102,13 @@ def process_payment(request, order_id):
 
     ticket_info = order.ticket_info
 
-    stripe.api_key = settings.STRIPE.get("STRIPE_SECRET_KEY", "")
-
     scheme = request.scheme
     host = request.get_host()
     DOMAIN = f"{scheme}://{host}"
 
     try:
         product_name = f"{ticket_info.event.title} - {ticket_info.category}"
-        session = stripe.checkout.Session.create(
+        session = payments.create_checkout_session(
             payment_method_types=["card"],
             line_items=[
                 {
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class SimpletixConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "simpletix"
+
+    def ready(self):
+        from config.ratelimit import shared_cache_check
+
+        checks.register(shared_cache_check, checks.Tags.caches)
@@ -0,0 +1,111 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from config.middleware.multi_session_middleware import MultiSessionMiddleware
+
+STORES = ("db", "cached_db", "cache")
+
+
+def _view(request):
+    action = request.GET.get("action")
+    if action == "login":
+        request.session.cycle_key()
+        request.session["desired_role"] = "attendee"
+    elif action == "write":
+        request.session["visits"] = request.session.get("visits", 0) + 1
+    else:
+        request.session.get("desired_role")
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare session stores: simulated browsers (half of them using "
+        "?sid= slots) log in once, then browse, changing their session on "
+        "some requests. Reports session SQL statements and time per "
+        "request. Database rows are rolled back; cached sessions are "
+        "deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--store",
+            action="append",
+            choices=STORES,
+            help="Repeatable; default: all of them.",
+        )
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--write-every",
+            type=int,
+            default=5,
+            help="Every Nth request changes the session.",
+        )
+
+    def handle(self, *args, **options):
+        for store in options["store"] or STORES:
+            engine = f"django.contrib.sessions.backends.{store}"
+            with override_settings(SESSION_ENGINE=engine), transaction.atomic():
+                self._run(store, options)
+                transaction.set_rollback(True)
+
+    def _run(self, store, options):
+        handler = MultiSessionMiddleware(SessionMiddleware(_view))
+        factory = RequestFactory()
+        jars = [{} for _ in range(options["clients"])]
+        timings, reads, writes = [], [], []
+        for step in range(options["requests"]):
+            if step == 0:
+                action = "login"
+            elif step % options["write_every"] == 0:
+                action = "write"
+            else:
+                action = "read"
+            for index, jar in enumerate(jars):
+                params = {"action": action}
+                if index % 2:
+                    params["sid"] = f"slot{index % 4}"
+                request = factory.get("/", params)
+                request.COOKIES.update(jar)
+                with CaptureQueriesContext(connections["default"]) as ctx:
+                    started = time.perf_counter()
+                    response = handler(request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                statements = [
+                    q["sql"]
+                    for q in ctx.captured_queries
+                    if "django_session" in q["sql"]
+                ]
+                reads.append(sum(sql.startswith("SELECT") for sql in statements))
+                writes.append(sum(not sql.startswith("SELECT") for sql in statements))
+                for name, morsel in response.cookies.items():
+                    jar[name] = morsel.value
+        self._report(store, timings, reads, writes)
+        self._cleanup(jars)
+
+    def _cleanup(self, jars):
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        for jar in jars:
+            for key in jar.values():
+                if key:
+                    SessionStore(key).delete()
+
+    def _report(self, label, timings, reads, writes):
+        timings = sorted(timings)
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        self.stdout.write(
+            f"{label}: session SQL per request: "
+            f"{statistics.mean(reads):.2f} reads, "
+            f"{statistics.mean(writes):.2f} writes; "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms"
+        )
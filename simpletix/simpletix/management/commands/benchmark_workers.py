@@ -0,0 +1,112 @@
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.gunicorn import WORKER_CLASSES
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with config/gunicorn.py once per worker class and "
+        "load-test the same URLs against each, reporting throughput and "
+        "latency. Uses the configured database; run it against a copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--worker-class",
+            action="append",
+            choices=sorted(WORKER_CLASSES),
+            help="Repeatable; default: sync and gthread.",
+        )
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Repeatable; default: /, /events/ and /health/.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["path"] or ["/", "/events/", "/health/"]
+        base = f"http://127.0.0.1:{options['port']}"
+        for kind in options["worker_class"] or ["sync", "gthread"]:
+            server = self._start(kind, options)
+            try:
+                self._wait_until_up(base + "/health/", server)
+                urls = [base + path for path in paths]
+                for url in urls:
+                    self._fetch(url)  # warm up every worker's first request
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                    results = list(
+                        pool.map(
+                            self._fetch,
+                            (urls[i % len(urls)] for i in range(options["requests"])),
+                        )
+                    )
+                elapsed = time.perf_counter() - started
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=30)
+            self._report(kind, results, elapsed)
+
+    def _start(self, kind, options):
+        env = dict(
+            os.environ,
+            GUNICORN_WORKER_CLASS=kind,
+            GUNICORN_WORKERS=str(options["workers"]),
+            GUNICORN_THREADS=str(options["threads"]),
+            GUNICORN_BIND=f"127.0.0.1:{options['port']}",
+        )
+        return subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "python:config.gunicorn"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _wait_until_up(self, url, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited; try running it directly.")
+            if self._fetch(url)[0] == 200:
+                return
+            time.sleep(0.2)
+        raise CommandError(f"gunicorn did not answer on {url} in {timeout}s.")
+
+    def _fetch(self, url):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        except OSError:
+            status = None
+        return status, (time.perf_counter() - started) * 1000
+
+    def _report(self, label, results, elapsed):
+        timings = sorted(ms for _, ms in results)
+        errors = sum(1 for status, _ in results if status != 200)
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        self.stdout.write(
+            f"{label}: {len(results) / elapsed:.0f} req/s "
+            f"p50={statistics.median(timings):.1f}ms p95={p95:.1f}ms "
+            f"max={timings[-1]:.1f}ms errors={errors}"
+        )
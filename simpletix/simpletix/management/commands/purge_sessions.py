@@ -0,0 +1,42 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the database in small batches, so the "
+        'table is never locked for long (unlike one big "clearsessions" '
+        "DELETE). Nothing to do for the cache-only session store. Meant to "
+        "run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        cutoff = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=cutoff).values_list(
+                    "session_key", flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                break
+            count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            if len(keys) < batch_size:
+                break
+            time.sleep(options["pause"])
+        self.stdout.write(f"deleted {deleted} expired sessions")
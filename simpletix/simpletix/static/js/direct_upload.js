@@ -0,0 +1,138 @@
+// Direct-to-storage, resumable uploads for the event banner/video inputs.
+// The file goes straight to S3 (or the local stand-in) in chunks; the form
+// only submits a signed reference to the stored object (events.uploads).
+(function () {
+  const script = document.currentScript;
+  const urls = script.dataset;
+  const CONCURRENCY = 4;
+  const RETRIES = 3;
+
+  function csrfToken(form) {
+    const input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+    return input ? input.value : "";
+  }
+
+  async function postJSON(form, url, body) {
+    const response = await fetch(url, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": csrfToken(form),
+      },
+      credentials: "same-origin",
+      body: JSON.stringify(body),
+    });
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || "Upload failed");
+    return data;
+  }
+
+  // Sessions are kept per file, so picking the same file again after a
+  // dropped connection resumes instead of starting over.
+  function sessionKey(field, file) {
+    return `direct-upload:${field}:${file.name}:${file.size}:${file.lastModified}`;
+  }
+
+  async function putPart(url, blob) {
+    for (let attempt = 1; ; attempt++) {
+      try {
+        const response = await fetch(url, { method: "PUT", body: blob });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.headers.get("ETag");
+      } catch (err) {
+        if (attempt >= RETRIES) throw err;
+        await new Promise((r) => setTimeout(r, 1000 * 2 ** attempt));
+      }
+    }
+  }
+
+  async function upload(form, input, status) {
+    const field = input.dataset.directUpload;
+    const file = input.files[0];
+    const key = sessionKey(field, file);
+
+    let session = JSON.parse(localStorage.getItem(key) || "null");
+    let done = {};
+    if (session) {
+      try {
+        done = (await postJSON(form, urls.status, { token: session.token })).parts;
+      } catch (err) {
+        session = null;
+      }
+    }
+    if (!session) {
+      session = await postJSON(form, urls.start, {
+        field: field,
+        filename: file.name,
+        content_type: file.type,
+        size: file.size,
+      });
+      localStorage.setItem(key, JSON.stringify(session));
+    }
+
+    const pending = [];
+    for (let n = 1; n <= session.part_count; n++) {
+      if (!done[n]) pending.push(n);
+    }
+    const etags = Object.assign({}, done);
+    let uploaded = session.part_count - pending.length;
+
+    while (pending.length) {
+      const batch = pending.splice(0, 100);
+      const presigned = (
+        await postJSON(form, urls.parts, { token: session.token, parts: batch })
+      ).urls;
+      const queue = batch.slice();
+      const worker = async () => {
+        while (queue.length) {
+          const n = queue.shift();
+          const start = (n - 1) * session.part_size;
+          const blob = file.slice(start, start + session.part_size);
+          etags[n] = await putPart(presigned[n], blob);
+          uploaded += 1;
+          status.textContent = `Uploading… ${Math.round((100 * uploaded) / session.part_count)}%`;
+        }
+      };
+      await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+    }
+
+    const result = await postJSON(form, urls.complete, {
+      token: session.token,
+      parts: etags,
+    });
+    localStorage.removeItem(key);
+    return result.reference;
+  }
+
+  function init() {
+    document.querySelectorAll("input[data-direct-upload]").forEach((input) => {
+      const form = input.form;
+      const hidden = form.querySelector(
+        `input[name="${input.dataset.directUpload}_upload"]`
+      );
+      if (!hidden) return;
+      const status = document.createElement("small");
+      status.className = "text-muted d-block";
+      input.insertAdjacentElement("afterend", status);
+      const submit = form.querySelector('button[type="submit"]');
+
+      input.addEventListener("change", async () => {
+        if (!input.files.length) return;
+        hidden.value = "";
+        if (submit) submit.disabled = true;
+        try {
+          hidden.value = await upload(form, input, status);
+          status.textContent = "Upload complete.";
+          // The file is already stored; don't post it through Django again.
+          input.value = "";
+        } catch (err) {
+          status.textContent = `${err.message}. Choose the file again to resume.`;
+        } finally {
+          if (submit) submit.disabled = false;
+        }
+      });
+    });
+  }
+
+  document.addEventListener("DOMContentLoaded", init);
+})();
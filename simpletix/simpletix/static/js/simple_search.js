@@ -2,9 +2,23 @@ window.addEventListener("load", () => {
   const input = document.getElementById("search-input");
   const resultsBox = document.getElementById("search-results");
 
-  // connect to algolia
-  const client = algoliasearch(window.ALGOLIA_APP_ID, window.ALGOLIA_SEARCH_KEY);
-  const index = client.initIndex(window.ALGOLIA_INDEX);
+  // connect to algolia, or fall back to the server-side search endpoint
+  // (same response shape: { hits: [{ objectID, title, location, description }] })
+  let index;
+  if (window.SEARCH_BACKEND === "algolia") {
+    const client = algoliasearch(window.ALGOLIA_APP_ID, window.ALGOLIA_SEARCH_KEY);
+    index = client.initIndex(window.ALGOLIA_INDEX);
+  } else {
+    index = {
+      search: async (query) => {
+        const res = await fetch(
+          `${window.SEARCH_URL}?q=${encodeURIComponent(query)}`
+        );
+        if (!res.ok) throw new Error(`Search failed: ${res.status}`);
+        return res.json();
+      },
+    };
+  }
 
   input.addEventListener("input", async () => {
     const query = input.value.trim();
@@ -35,7 +49,7 @@ window.addEventListener("load", () => {
       }
       resultsBox.style.display = "block";
     } catch (err) {
-      console.error("Algolia search error:", err);
+      console.error("Search error:", err);
     }
   });
 
@@ -22,4 +22,6 @@ class TicketAdmin(admin.ModelAdmin):
         "issued_at",
     )
     list_filter = ("status", "ticketInfo__event")
+    # The ticketInfo column prints the event title.
+    list_select_related = ("ticketInfo__event",)
     search_fields = ("full_name", "email", "order_id")
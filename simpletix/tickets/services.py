@@ -1,11 +1,22 @@
 # tickets/services.py
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import EmailMessage
+from django.db import close_old_connections
 from django.utils import timezone
 
+from config import ratelimit
+
 from .models import Ticket, TicketInfo
 
+logger = logging.getLogger(__name__)
+
 
 def issue_ticket_for_order(
     *,
@@ -252,3 +263,155 @@ def send_ticket_email(to_email, tickets, pdf_bytes=None):
         msg.attach("tickets.pdf", pdf_bytes, "application/pdf")
 
     msg.send(fail_silently=False)
+
+
+# --- Ticket re-send: coalescing, throttling and PDF reuse -------------------
+
+RESEND_QUEUED = "queued"
+RESEND_COALESCED = "coalesced"
+RESEND_THROTTLED = "throttled"
+
+# One long-lived worker is plenty: re-sends are rare and mostly SMTP-bound.
+_resend_executor = None
+_resend_executor_lock = threading.Lock()
+
+
+def _resend_setting(name, default):
+    return getattr(settings, f"TICKET_RESEND_{name}", default)
+
+
+def tickets_fingerprint(tickets):
+    """
+    Stable hash of everything that ends up in the tickets PDF.
+    If none of it changed, a previously generated PDF can be reused as-is.
+    """
+    parts = []
+    for ticket in tickets:
+        info = ticket.ticketInfo
+        event = info.event if info else None
+        parts.append(
+            "|".join(
+                str(value)
+                for value in (
+                    ticket.id,
+                    ticket.order_id,
+                    ticket.qr_code,
+                    ticket.full_name,
+                    ticket.email,
+                    info.category if info else "",
+                    event.id if event else "",
+                    event.updated_at if event else "",
+                )
+            )
+        )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_or_build_tickets_pdf(tickets):
+    """
+    Return the tickets PDF, reusing the last generated one when the
+    ticket data has not changed since it was built.
+    """
+    if not tickets:
+        return None
+
+    key = f"tickets:pdf:{tickets_fingerprint(tickets)}"
+    pdf_bytes = cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = build_tickets_pdf(tickets)
+        if pdf_bytes:
+            cache.set(key, pdf_bytes, _resend_setting("PDF_CACHE_SECONDS", 86400))
+    return pdf_bytes
+
+
+def resend_tickets(order_id):
+    """
+    Re-send the ticket email (with PDF) for an order.
+    Runs either inline or on the background executor.
+    """
+    try:
+        tickets = list(
+            Ticket.objects.filter(order_id=order_id)
+            .select_related("ticketInfo__event")
+            .order_by("id")
+        )
+        if not tickets or not tickets[0].email:
+            return
+        pdf_bytes = get_or_build_tickets_pdf(tickets)
+        send_ticket_email(tickets[0].email, tickets, pdf_bytes=pdf_bytes)
+    except Exception:
+        # Let the next click retry rather than coalesce into a failed send.
+        cache.delete(_pending_key(order_id))
+        raise
+    finally:
+        if _resend_setting("ASYNC", False):
+            close_old_connections()
+
+
+def _pending_key(order_id):
+    return f"tickets:resend:pending:{order_id}"
+
+
+def _get_resend_executor():
+    global _resend_executor
+    with _resend_executor_lock:
+        if _resend_executor is None:
+            _resend_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="ticket-resend"
+            )
+        return _resend_executor
+
+
+def _log_resend_failure(order_id):
+    def callback(future):
+        exc = future.exception()
+        if exc is not None:
+            logger.error(
+                "Re-sending tickets for order %s failed",
+                order_id,
+                exc_info=(type(exc), exc, exc.__traceback__),
+            )
+
+    return callback
+
+
+def schedule_ticket_resend(order_id, client_ip=None):
+    """
+    Queue a re-send of the tickets for `order_id`.
+
+    - Requests for the same order inside the coalescing window collapse
+      into the one already queued (RESEND_COALESCED).
+    - Per-IP and per-order counters cap how many re-sends can be triggered
+      per throttle period (RESEND_THROTTLED).
+    - Otherwise the re-send is dispatched (RESEND_QUEUED): on a background
+      worker when TICKET_RESEND_ASYNC is on, inline otherwise.
+    """
+    period = _resend_setting("THROTTLE_SECONDS", 3600)
+
+    pending_key = _pending_key(order_id)
+    if not cache.add(pending_key, True, _resend_setting("WINDOW_SECONDS", 60)):
+        # Coalesced clicks don't count against the client's quota.
+        return RESEND_COALESCED
+
+    if (
+        client_ip
+        and ratelimit.hit(
+            f"tickets:resend:ip:{client_ip}",
+            _resend_setting("MAX_PER_IP", 10),
+            period,
+        )
+    ) or ratelimit.hit(
+        f"tickets:resend:order:{order_id}",
+        _resend_setting("MAX_PER_ORDER", 3),
+        period,
+    ):
+        # Nothing was queued, so don't let later clicks coalesce into it.
+        cache.delete(pending_key)
+        return RESEND_THROTTLED
+
+    if _resend_setting("ASYNC", False):
+        future = _get_resend_executor().submit(resend_tickets, order_id)
+        future.add_done_callback(_log_resend_failure(order_id))
+    else:
+        resend_tickets(order_id)
+    return RESEND_QUEUED
@@ -121,6 +121,63 @@ def test_details_view_not_found(logged_in_attendee_client):
     assert response.status_code == 404
 
 
+# --- Views: conditional GET ---
+
+
+def test_details_view_revalidates_with_304(
+    logged_in_attendee_client, details_url, django_assert_num_queries
+):
+    """An unchanged ticket page is answered with 304, skipping rendering."""
+    client = logged_in_attendee_client
+    # The first view assigns the QR code, so only then is the page stable.
+    assert "ETag" not in client.get(details_url)
+    first = client.get(details_url)
+    assert "ETag" in first
+
+    # Session, user and the single ETag query; nothing from the page itself.
+    with django_assert_num_queries(3):
+        second = client.get(details_url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 304
+    assert not second.templates
+
+
+def test_details_view_changes_with_ticket_status(
+    logged_in_attendee_client, details_url, details_ticket
+):
+    """A status change invalidates the cached page."""
+    client = logged_in_attendee_client
+    client.get(details_url)
+    first = client.get(details_url)
+
+    details_ticket.status = "USED"
+    details_ticket.save()
+    second = client.get(details_url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 200
+
+
+def test_thank_you_view_revalidates_with_304(
+    client, details_ticket, django_assert_num_queries
+):
+    """The thank-you page validates on the order's tickets."""
+    details_ticket.order_id = "order-etag"
+    details_ticket.status = "ISSUED"
+    details_ticket.save()
+    url = reverse("tickets:ticket_thank_you", args=["order-etag"])
+
+    client.get(url)
+    first = client.get(url)
+    assert first.status_code == 200
+    # Just the ETag query.
+    with django_assert_num_queries(1):
+        second = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 304
+
+    details_ticket.status = "USED"
+    details_ticket.save()
+    third = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert third.status_code == 200
+
+
 # --- Views:ticket_list ---
 
 
@@ -322,3 +379,20 @@ def test_ticket_list_org_role(
         [ticket1_user1, ticket2_user1, ticket1_user2, ticket_guest], key=lambda t: t.id
     )
     assert list(tickets_in_context.order_by("id")) == expected_tickets
+
+
+def test_ticket_list_has_no_n_plus_one(client, list_url, list_organizer_profile):
+    """config.querycheck fails the request if each ticket costs queries."""
+    for i in range(6):
+        event = Event.objects.create(
+            organizer=list_organizer_profile,
+            title=f"List Event {i}",
+            date=timezone.now().date(),
+            time=timezone.now().time(),
+        )
+        info = TicketInfo.objects.create(event=event, category="VIP", price=10)
+        Ticket.objects.create(ticketInfo=info, full_name=f"Guest {i}")
+
+    response = client.get(list_url)
+    assert response.status_code == 200
+    assert len(response.context["tickets"]) == 6
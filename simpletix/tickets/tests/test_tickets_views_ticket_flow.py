@@ -6,6 +6,7 @@ from django.urls import reverse
 from django.contrib.messages import get_messages
 
 from events.models import Event
+from tickets import services
 from tickets.models import Ticket, TicketInfo
 
 
@@ -222,8 +223,8 @@ def test_ticket_resend_success(monkeypatch, client):
         email_called["tickets"] = tickets
         email_called["pdf_bytes"] = pdf_bytes
 
-    monkeypatch.setattr("tickets.views.build_tickets_pdf", fake_build_tickets_pdf)
-    monkeypatch.setattr("tickets.views.send_ticket_email", fake_send_ticket_email)
+    monkeypatch.setattr("tickets.services.build_tickets_pdf", fake_build_tickets_pdf)
+    monkeypatch.setattr("tickets.services.send_ticket_email", fake_send_ticket_email)
 
     url = reverse("tickets:ticket_resend", kwargs={"order_id": "order-resend"})
     response = client.post(url)
@@ -242,7 +243,7 @@ def test_ticket_resend_success(monkeypatch, client):
 
     # And messages framework was used
     msgs = list(get_messages(response.wsgi_request))
-    assert any("re-sent your tickets" in str(m) for m in msgs)
+    assert any("queued your tickets" in str(m) for m in msgs)
 
 
 @pytest.mark.django_db
@@ -285,3 +286,144 @@ def test_ticket_resend_missing_email_sets_error_message(client):
 
     msgs = list(get_messages(response.wsgi_request))
     assert any("doesn't have an email address saved" in str(m) for m in msgs)
+
+
+@pytest.fixture
+def resend_calls(monkeypatch):
+    """Record PDF builds and emails made by the re-send path."""
+    calls = {"pdf": 0, "email": 0}
+
+    def fake_build_tickets_pdf(tickets):
+        calls["pdf"] += 1
+        return b"PDF"
+
+    def fake_send_ticket_email(email, tickets, pdf_bytes=None):
+        calls["email"] += 1
+
+    monkeypatch.setattr("tickets.services.build_tickets_pdf", fake_build_tickets_pdf)
+    monkeypatch.setattr("tickets.services.send_ticket_email", fake_send_ticket_email)
+    return calls
+
+
+@pytest.mark.django_db
+def test_ticket_resend_coalesces_repeated_clicks(client, resend_calls):
+    ticket_info = _make_ticket_info(_make_event())
+    Ticket.objects.create(
+        ticketInfo=ticket_info, order_id="order-burst", email="burst@example.com"
+    )
+    url = reverse("tickets:ticket_resend", kwargs={"order_id": "order-burst"})
+
+    client.post(url)
+    response = client.post(url)
+
+    assert resend_calls["email"] == 1
+    msgs = list(get_messages(response.wsgi_request))
+    assert any("already on their way" in str(m) for m in msgs)
+
+
+@pytest.mark.django_db
+def test_ticket_resend_reuses_pdf_when_tickets_unchanged(
+    client, resend_calls, settings
+):
+    settings.TICKET_RESEND_WINDOW_SECONDS = 0
+    ticket_info = _make_ticket_info(_make_event())
+    ticket = Ticket.objects.create(
+        ticketInfo=ticket_info, order_id="order-pdf", email="pdf@example.com"
+    )
+    url = reverse("tickets:ticket_resend", kwargs={"order_id": "order-pdf"})
+
+    client.post(url)
+    client.post(url)
+    assert resend_calls == {"pdf": 1, "email": 2}
+
+    # Changing ticket data invalidates the cached attachment.
+    ticket.full_name = "Renamed"
+    ticket.save()
+    client.post(url)
+    assert resend_calls == {"pdf": 2, "email": 3}
+
+
+@pytest.mark.django_db
+def test_ticket_resend_throttled_per_order(client, resend_calls, settings):
+    settings.TICKET_RESEND_WINDOW_SECONDS = 0
+    settings.TICKET_RESEND_MAX_PER_ORDER = 2
+    ticket_info = _make_ticket_info(_make_event())
+    Ticket.objects.create(
+        ticketInfo=ticket_info, order_id="order-cap", email="cap@example.com"
+    )
+    url = reverse("tickets:ticket_resend", kwargs={"order_id": "order-cap"})
+
+    for _ in range(3):
+        response = client.post(url)
+
+    assert resend_calls["email"] == 2
+    msgs = list(get_messages(response.wsgi_request))
+    assert any("too many re-sends" in str(m) for m in msgs)
+
+
+@pytest.mark.django_db
+def test_ticket_resend_throttled_per_ip(client, resend_calls, settings):
+    settings.TICKET_RESEND_MAX_PER_IP = 1
+    ticket_info = _make_ticket_info(_make_event())
+    for order_id in ("order-ip-1", "order-ip-2"):
+        Ticket.objects.create(
+            ticketInfo=ticket_info, order_id=order_id, email="ip@example.com"
+        )
+
+    for order_id in ("order-ip-1", "order-ip-2"):
+        client.post(
+            reverse("tickets:ticket_resend", kwargs={"order_id": order_id}),
+            HTTP_X_FORWARDED_FOR="203.0.113.7, 10.0.0.1",
+        )
+
+    assert resend_calls["email"] == 1
+
+
+@pytest.mark.django_db
+def test_coalesced_clicks_do_not_use_the_ip_quota(client, resend_calls, settings):
+    settings.TICKET_RESEND_MAX_PER_IP = 2
+    ticket_info = _make_ticket_info(_make_event())
+    for order_id in ("order-q-1", "order-q-2"):
+        Ticket.objects.create(
+            ticketInfo=ticket_info, order_id=order_id, email="q@example.com"
+        )
+
+    for order_id in ("order-q-1", "order-q-1", "order-q-2"):
+        client.post(reverse("tickets:ticket_resend", kwargs={"order_id": order_id}))
+
+    assert resend_calls["email"] == 2
+
+
+@pytest.mark.django_db
+def test_failed_resend_can_be_retried_at_once(monkeypatch):
+    ticket_info = _make_ticket_info(_make_event())
+    Ticket.objects.create(
+        ticketInfo=ticket_info, order_id="order-fail", email="fail@example.com"
+    )
+
+    def broken_send(email, tickets, pdf_bytes=None):
+        raise ConnectionError("smtp down")
+
+    monkeypatch.setattr("tickets.services.build_tickets_pdf", lambda tickets: b"")
+    monkeypatch.setattr("tickets.services.send_ticket_email", broken_send)
+    with pytest.raises(ConnectionError):
+        services.schedule_ticket_resend("order-fail")
+    # Not coalesced into the send that failed.
+    monkeypatch.setattr("tickets.services.send_ticket_email", lambda *a, **k: None)
+    assert services.schedule_ticket_resend("order-fail") == services.RESEND_QUEUED
+
+
+def test_background_resend_failures_are_logged(monkeypatch, settings, caplog):
+    settings.TICKET_RESEND_ASYNC = True
+
+    def broken_resend(order_id):
+        raise ConnectionError("smtp down")
+
+    monkeypatch.setattr("tickets.services.resend_tickets", broken_resend)
+    with caplog.at_level("ERROR", logger="tickets.services"):
+        assert services.schedule_ticket_resend("order-bg") == services.RESEND_QUEUED
+        # One worker: once this has run, so has the re-send (and its callback).
+        services._get_resend_executor().submit(lambda: None).result()
+
+    assert "order-bg" in caplog.text
+    assert "smtp down" in caplog.text
@@ -1,7 +1,5 @@
 from django.shortcuts import get_object_or_404, render, redirect
 
-from accounts.models import UserProfile
-from events.models import Event
 from .models import Ticket
 import json
 from django.views.decorators.csrf import csrf_exempt
@@ -15,16 +13,59 @@ import qrcode
 from django.contrib import messages
 from django.http import Http404
 from django.views.decorators.http import require_POST
-from .services import build_tickets_pdf, send_ticket_email
+
+from config.conditional import conditional_page
+from config.querycheck import query_budget
+from config.ratelimit import client_ip, ratelimit
+
+# Everything the ticket pages show, for their ETags.
+TICKET_PAGE_FIELDS = (
+    "id",
+    "full_name",
+    "email",
+    "phone",
+    "order_id",
+    "status",
+    "qr_code",
+    "issued_at",
+    "ticketInfo__category",
+    "ticketInfo__price",
+    "ticketInfo__event_id",
+    "ticketInfo__event__updated_at",
+    "ticketInfo__event__organizer__user__username",
+)
+
+
+def _tickets_etag(tickets):
+    rows = list(tickets.order_by("id").values_list(*TICKET_PAGE_FIELDS))
+    # No ETag while the first ticket has no QR code yet: rendering the page
+    # assigns one, so the page would change right after this response.
+    if not rows or not rows[0][TICKET_PAGE_FIELDS.index("qr_code")]:
+        return None
+    return repr(rows)
+
+
+def _details_etag(request, id):
+    return _tickets_etag(Ticket.objects.filter(id=id))
+
+
+def _thank_you_etag(request, order_id):
+    return _tickets_etag(Ticket.objects.filter(order_id=order_id))
 
 
 def index(request):
     return render(request, "tickets/index.html")
 
 
+@query_budget(5)
+@conditional_page(_details_etag)
 def details(request, id):
-    ticket = get_object_or_404(Ticket, id=id)
-    event = get_object_or_404(Event, id=ticket.ticketInfo.event.id)
+    ticket = get_object_or_404(
+        # The page names the organizer too.
+        Ticket.objects.select_related("ticketInfo__event__organizer__user"),
+        id=id,
+    )
+    event = ticket.ticketInfo.event
 
     # Build a data: URL for the ticket's QR code
     qr_data_url = _qr_data_url_for_ticket(ticket)
@@ -40,14 +81,16 @@ def details(request, id):
     )
 
 
+@query_budget(4)
 def ticket_list(request):
     if request.session.get("desired_role") == "attendee":
-        attendee = UserProfile.objects.get(user=request.user)
-        filtername = str(attendee.user)
+        attendee = request.user.uprofile
+        filtername = str(request.user)
         tickets = Ticket.objects.filter(attendee=attendee)
     else:
         filtername = "all"
         tickets = Ticket.objects.all()
+    tickets = tickets.select_related("ticketInfo__event")
 
     return render(
         request,
@@ -57,6 +100,7 @@ def ticket_list(request):
 
 
 @csrf_exempt
+@ratelimit("payment_confirm", limit=20, period=600, methods=("POST",), json=True)
 def payment_confirm(request):
     """
     Endpoint to be called AFTER payment is confirmed (e.g. by Stripe success handler).
@@ -141,6 +185,8 @@ def _qr_data_url_for_ticket(ticket):
     return f"data:image/png;base64,{encoded}"
 
 
+@query_budget(5)
+@conditional_page(_thank_you_etag)
 def ticket_thank_you(request, order_id):
     """
     Show a modern confirmation page after payment:
@@ -175,29 +221,41 @@ def ticket_thank_you(request, order_id):
 
 
 @require_POST
+@ratelimit("ticket_resend", limit=10, period=60)
 def ticket_resend(request, order_id):
     """
-    Re-send ticket email (with PDF) for this order.
-    Uses the same email + PDF logic as payment_confirm.
+    Queue a re-send of the ticket email (with PDF) for this order.
+    Repeated clicks inside a short window are coalesced into one email,
+    and re-sends are throttled per order and per client IP (hourly, in
+    schedule_ticket_resend). The decorator only stops bursts, such as
+    guessing order ids, before they reach the database.
     """
     tickets = list(
-        Ticket.objects.filter(order_id=order_id).select_related("ticketInfo__event")
+        Ticket.objects.filter(order_id=order_id).order_by("id").only("id", "email")[:1]
     )
 
     if not tickets:
         messages.error(request, "We couldn't find any tickets for that order.")
         return redirect("tickets:ticket_thank_you", order_id=order_id)
 
-    email = tickets[0].email
-    if not email:
+    if not tickets[0].email:
         messages.error(
             request,
             "This order doesn't have an email address saved yet.",
         )
         return redirect("tickets:ticket_thank_you", order_id=order_id)
 
-    pdf_bytes = build_tickets_pdf(tickets)
-    send_ticket_email(email, tickets, pdf_bytes=pdf_bytes)
+    outcome = services.schedule_ticket_resend(order_id, client_ip=client_ip(request))
 
-    messages.success(request, "We just re-sent your tickets to your inbox.")
+    if outcome == services.RESEND_THROTTLED:
+        messages.error(
+            request,
+            "You've requested too many re-sends. Please try again later.",
+        )
+    elif outcome == services.RESEND_COALESCED:
+        messages.info(request, "Your tickets are already on their way to your inbox.")
+    else:
+        messages.success(
+            request, "We've queued your tickets to be re-sent to your inbox."
+        )
     return redirect("tickets:ticket_thank_you", order_id=order_id)